@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from matches.models import Match
+from matches.models import (
+    Calibration,
+    HeadToHead,
+    League,
+    Match,
+    SeasonProjection,
+    Standing,
+    Team,
+    TeamTrend,
+)
 
 
 @admin.register(Match)
@@ -10,3 +19,74 @@ class MatchAdmin(admin.ModelAdmin):
     """
 
     list_display = ("date", "team1", "team2", "score1", "score2")
+    list_select_related = ("team1", "team2")
+
+
+@admin.register(League)
+class LeagueAdmin(admin.ModelAdmin):
+    """
+    League admin
+    """
+
+    search_fields = ("name",)
+
+
+@admin.register(Team)
+class TeamAdmin(admin.ModelAdmin):
+    """
+    Team admin
+    """
+
+    search_fields = ("name",)
+
+
+@admin.register(Calibration)
+class CalibrationAdmin(admin.ModelAdmin):
+    """
+    Calibration admin
+    """
+
+    list_display = ("scope", "league", "season", "team", "matches", "brier", "rps")
+    list_filter = ("scope",)
+    list_select_related = ("league", "team")
+
+
+@admin.register(SeasonProjection)
+class SeasonProjectionAdmin(admin.ModelAdmin):
+    """
+    Season projection admin
+    """
+
+    list_display = ("league", "season", "team", "expected_points", "title")
+    list_select_related = ("league", "team")
+
+
+@admin.register(Standing)
+class StandingAdmin(admin.ModelAdmin):
+    """
+    Standing admin
+    """
+
+    list_display = ("league", "season", "team", "played", "points", "goal_difference")
+    list_select_related = ("league", "team")
+
+
+@admin.register(TeamTrend)
+class TeamTrendAdmin(admin.ModelAdmin):
+    """
+    Team trend admin
+    """
+
+    list_display = ("team", "window", "matches")
+    list_select_related = ("team",)
+    exclude = ("series",)
+
+
+@admin.register(HeadToHead)
+class HeadToHeadAdmin(admin.ModelAdmin):
+    """
+    Head-to-head admin
+    """
+
+    list_display = ("team1", "team2", "matches", "wins1", "draws", "wins2")
+    list_select_related = ("team1", "team2")
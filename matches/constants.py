@@ -40,3 +40,24 @@ class MatchFields:
             cls.SCORE1,
             cls.SCORE2,
         ]
+
+    @classmethod
+    def natural_key(cls) -> list[str]:
+        """
+        Returns the fields that identify a match
+        """
+
+        return [
+            cls.DATE,
+            cls.LEAGUE,
+            cls.TEAM1,
+            cls.TEAM2,
+        ]
+
+    @classmethod
+    def value_list(cls) -> list[str]:
+        """
+        Returns the fields that can change for an identified match
+        """
+
+        return [field for field in cls.field_list() if field not in cls.natural_key()]
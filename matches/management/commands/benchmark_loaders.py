@@ -0,0 +1,112 @@
+import time
+from collections.abc import Callable
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+
+from matches.constants import MatchFields
+from matches.models import Match
+from matches.utils.loaders import (
+    bulk_create_matches,
+    cast_match_types,
+    copy_matches,
+    insert_matches,
+)
+from matches.utils.names import MatchNameResolver
+from matches.utils.partitions import create_season_partitions, is_partitioned
+from matches.utils.synthetic import synthetic_match_df
+
+
+class Command(BaseCommand):
+    help = "Command for benchmarking the loaders of the table `matches`"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds the command arguments
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The command parser
+        """
+
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=100_000,
+            help="The number of synthetic matches to load",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Executes the command
+        """
+
+        rows = options["rows"]
+
+        loaders: dict[str, Callable[[pd.DataFrame], int]] = {
+            "orm": bulk_create_matches,
+            "raw": insert_matches,
+        }
+
+        if connection.vendor == "postgresql":
+            loaders["copy"] = copy_matches
+
+        with transaction.atomic():
+            match_df = MatchNameResolver().resolve(
+                cast_match_types(synthetic_match_df(rows))
+            )
+
+            if is_partitioned():
+                create_season_partitions(match_df[MatchFields.SEASON].unique())
+
+            timings = {
+                name: self._time_loader(loader, match_df)
+                for name, loader in loaders.items()
+            }
+
+            transaction.set_rollback(True)
+
+        baseline = timings["orm"]
+
+        self.stdout.write(
+            f"{'loader':<8}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'speedup':>9}"
+        )
+
+        for name, elapsed in timings.items():
+            self.stdout.write(
+                f"{name:<8}{rows:>10}{elapsed:>10.2f}"
+                f"{rows / max(elapsed, 1e-9):>12.0f}{baseline / max(elapsed, 1e-9):>8.1f}x"
+            )
+
+    @staticmethod
+    def _time_loader(
+        loader: Callable[[pd.DataFrame], int], match_df: pd.DataFrame
+    ) -> float:
+        """
+        Times a loader on an empty table inside a transaction that is rolled back
+
+        Parameters
+        ----------
+        loader : Callable[[pd.DataFrame], int]
+            The loader
+        match_df : pd.DataFrame
+            The projected match DataFrame
+
+        Returns
+        -------
+        float
+            The elapsed seconds
+        """
+
+        with transaction.atomic():
+            Match.objects.all().delete()
+
+            started = time.perf_counter()
+            loader(match_df)
+            elapsed = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+
+        return elapsed
@@ -0,0 +1,143 @@
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from matches.models import Match
+from matches.utils.synthetic import load_synthetic_matches
+
+
+class Command(BaseCommand):
+    help = (
+        "Command for benchmarking the reads of the table `matches` into NumPy "
+        "arrays, through model instances and through `to_arrays`"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds the command arguments
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The command parser
+        """
+
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=200_000,
+            help="The number of synthetic matches to load",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="The number of times every reader is timed",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Executes the command
+        """
+
+        repeat = options["repeat"]
+        fields = [field.name for field in Match._meta.concrete_fields]
+        readers: dict[str, Callable[[], dict[str, np.ndarray]]] = {
+            "instances": lambda: self._read_instances(fields),
+            "to_arrays": lambda: Match.objects.order_by("id").to_arrays(fields),
+        }
+
+        with transaction.atomic():
+            load_synthetic_matches(options["rows"])
+            rows = Match.objects.count()
+            results = {
+                name: self._run_reader(reader, repeat)
+                for name, reader in readers.items()
+            }
+
+            transaction.set_rollback(True)
+
+        baseline = results["instances"][0]
+
+        self.stdout.write(
+            f"{'reader':<12}{'rows':>10}{'seconds':>10}{'rows/s':>12}"
+            f"{'peak MiB':>10}{'speedup':>9}"
+        )
+
+        for name, (elapsed, peak) in results.items():
+            self.stdout.write(
+                f"{name:<12}{rows:>10}{elapsed:>10.2f}"
+                f"{rows / max(elapsed, 1e-9):>12.0f}{peak / 2**20:>10.1f}"
+                f"{baseline / max(elapsed, 1e-9):>8.1f}x"
+            )
+
+    @staticmethod
+    def _read_instances(fields: list[str]) -> dict[str, np.ndarray]:
+        """
+        Reads the matches into arrays by iterating their model instances
+
+        Parameters
+        ----------
+        fields : list[str]
+            The fields to read
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            The array of every field
+        """
+
+        attnames = [Match._meta.get_field(field).attname for field in fields]
+        values: dict[str, list] = {field: [] for field in fields}
+
+        for match in Match.objects.order_by("id"):
+            for field, attname in zip(fields, attnames):
+                values[field].append(getattr(match, attname))
+
+        return {
+            field: np.array([np.nan if value is None else value for value in column])
+            for field, column in values.items()
+        }
+
+    @staticmethod
+    def _run_reader(
+        reader: Callable[[], dict[str, np.ndarray]], repeat: int
+    ) -> tuple[float, int]:
+        """
+        Times a reader, then traces its peak memory in a separate run
+        so that the tracing does not slow down the timed runs
+
+        Parameters
+        ----------
+        reader : Callable[[], dict[str, np.ndarray]]
+            The reader
+        repeat : int
+            The number of times the reader is timed
+
+        Returns
+        -------
+        tuple[float, int]
+            The median elapsed seconds and the peak traced bytes
+        """
+
+        latencies = []
+
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            reader()
+            latencies.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+
+        try:
+            reader()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return statistics.median(latencies), peak
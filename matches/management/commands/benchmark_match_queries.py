@@ -0,0 +1,181 @@
+import statistics
+import time
+from datetime import date
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+
+from matches.constants import MatchFields
+from matches.models import Match
+from matches.utils.synthetic import load_synthetic_matches
+
+
+class Command(BaseCommand):
+    help = (
+        "Command for benchmarking the common queries of the table `matches` "
+        "on synthetic matches, without and with the indexes of the model"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds the command arguments
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The command parser
+        """
+
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=200_000,
+            help="The number of synthetic matches to load",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=10,
+            help="The number of times every query is timed",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Executes the command
+        """
+
+        repeat = options["repeat"]
+
+        with transaction.atomic():
+            match_df = load_synthetic_matches(options["rows"])
+            queries = self._queries(match_df)
+
+            self._execute_index_sql("remove_sql")
+            without_indexes = self._run_queries(queries, repeat)
+
+            self._execute_index_sql("create_sql")
+            with_indexes = self._run_queries(queries, repeat)
+
+            transaction.set_rollback(True)
+
+        for name in queries:
+            self.stdout.write(f"== {name}")
+
+            for label, results in [
+                ("without indexes", without_indexes),
+                ("with indexes", with_indexes),
+            ]:
+                elapsed, plan = results[name]
+                self.stdout.write(f"{label}: {elapsed * 1000:.2f} ms")
+                self.stdout.write(
+                    "\n".join(f"    {line}" for line in plan.splitlines())
+                )
+
+        self.stdout.write(f"{'query':<16}{'without':>12}{'with':>12}{'speedup':>10}")
+
+        for name in queries:
+            before = without_indexes[name][0]
+            after = with_indexes[name][0]
+            self.stdout.write(
+                f"{name:<16}{before * 1000:>9.2f} ms{after * 1000:>9.2f} ms"
+                f"{before / max(after, 1e-9):>9.1f}x"
+            )
+
+    @staticmethod
+    def _queries(match_df: pd.DataFrame) -> dict[str, QuerySet]:
+        """
+        Builds the common queries of the table `matches` for a league,
+        a team and a season of the loaded match data
+
+        Parameters
+        ----------
+        match_df : pd.DataFrame
+            The loaded match DataFrame, with league and team ids
+
+        Returns
+        -------
+        dict[str, QuerySet]
+            The queries by name
+        """
+
+        middle = match_df.iloc[len(match_df) // 2]
+        league = int(middle[MatchFields.LEAGUE])
+        team = int(middle[MatchFields.TEAM1])
+        season = int(middle[MatchFields.SEASON])
+
+        matches = Match.objects.values_list("id", MatchFields.DATE)
+        season_dates = (date(season, 1, 1), date(season, 12, 31))
+        team_matches = Q(team1=team) | Q(team2=team)
+
+        return {
+            "league dates": matches.filter(
+                league=league, date__range=season_dates
+            ).order_by("date"),
+            "home matches": matches.filter(team1=team).order_by("-date")[:20],
+            "away matches": matches.filter(team2=team).order_by("-date")[:20],
+            "team history": matches.filter(team_matches).order_by("-date"),
+            "season league": matches.filter(season=season, league=league),
+            "unplayed": matches.filter(score1__isnull=True).order_by("date")[:50],
+        }
+
+    @staticmethod
+    def _execute_index_sql(method: str) -> None:
+        """
+        Drops or creates the indexes of the match model and refreshes
+        the statistics of the table for the query planner. PostgreSQL
+        does not alter a table with deferred foreign key checks pending,
+        so they are run first
+
+        Parameters
+        ----------
+        method : str
+            The index method that generates the statement,
+            `remove_sql` or `create_sql`
+        """
+
+        schema_editor = connection.schema_editor()
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+            for index in Match._meta.indexes:
+                cursor.execute(str(getattr(index, method)(Match, schema_editor)))
+
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(Match._meta.db_table)}")
+
+    @staticmethod
+    def _run_queries(
+        queries: dict[str, QuerySet], repeat: int
+    ) -> dict[str, tuple[float, str]]:
+        """
+        Times every query and explains its plan
+
+        Parameters
+        ----------
+        queries : dict[str, QuerySet]
+            The queries by name
+        repeat : int
+            The number of times every query is timed
+
+        Returns
+        -------
+        dict[str, tuple[float, str]]
+            The median elapsed seconds and the plan of every query
+        """
+
+        results = {}
+
+        for name, query in queries.items():
+            latencies = []
+
+            for _ in range(max(repeat, 1)):
+                started = time.perf_counter()
+                list(query.all())
+                latencies.append(time.perf_counter() - started)
+
+            results[name] = (statistics.median(latencies), query.explain())
+
+        return results
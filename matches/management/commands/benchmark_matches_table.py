@@ -0,0 +1,136 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+from django.db.models import Q
+
+from matches.constants import MatchFields
+from matches.models import Match, Team
+from matches.utils.synthetic import load_synthetic_matches
+
+
+class Command(BaseCommand):
+    help = (
+        "Command for measuring the size of the table `matches` "
+        "and the latency of a team query on synthetic matches"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds the command arguments
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The command parser
+        """
+
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=200_000,
+            help="The number of synthetic matches to load",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="The number of times the team query is timed",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Executes the command
+        """
+
+        rows = options["rows"]
+        repeat = options["repeat"]
+
+        with transaction.atomic():
+            match_df = load_synthetic_matches(rows)
+            table_bytes, index_bytes = self._table_size()
+            team = match_df[MatchFields.TEAM1].iloc[0]
+            matches, latencies = self._time_team_query(team, repeat)
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'rows':<16}{rows:>14}")
+        self.stdout.write(f"{'table bytes':<16}{table_bytes:>14}")
+        self.stdout.write(f"{'index bytes':<16}{index_bytes:>14}")
+        self.stdout.write(
+            f"{'bytes per row':<16}{(table_bytes + index_bytes) / max(rows, 1):>14.1f}"
+        )
+        self.stdout.write(
+            f"{'team query':<16}{statistics.median(latencies) * 1000:>11.2f} ms "
+            f"(median of {repeat}, {matches} matches)"
+        )
+
+    @staticmethod
+    def _table_size() -> tuple[int, int]:
+        """
+        Measures the bytes of the table `matches` and of its indexes
+
+        Returns
+        -------
+        tuple[int, int]
+            The table bytes and the index bytes
+        """
+
+        table = Match._meta.db_table
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT pg_table_size(%s::regclass), pg_indexes_size(%s::regclass)",
+                    [table, table],
+                )
+
+                return cursor.fetchone()
+
+            cursor.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master WHERE tbl_name = %s) GROUP BY name",
+                [table],
+            )
+            sizes = dict(cursor.fetchall())
+
+        table_bytes = sizes.pop(table)
+
+        return table_bytes, sum(sizes.values())
+
+    @staticmethod
+    def _time_team_query(team: int, repeat: int) -> tuple[int, list[float]]:
+        """
+        Times the query of the home and away matches of a team by name,
+        which looks up the id of the team and filters its foreign keys
+
+        Parameters
+        ----------
+        team : int
+            The id of the team
+        repeat : int
+            The number of times the query is timed
+
+        Returns
+        -------
+        tuple[int, list[float]]
+            The number of matches of the team and the elapsed seconds of every run
+        """
+
+        name = Team.objects.get(id=team).name
+        latencies = []
+
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            team_id = Team.objects.values_list("id", flat=True).get(name=name)
+            matches = list(
+                Match.objects.filter(Q(team1=team_id) | Q(team2=team_id)).values_list(
+                    "id", "date"
+                )
+            )
+            latencies.append(time.perf_counter() - started)
+
+        return len(matches), latencies
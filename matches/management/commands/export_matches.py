@@ -0,0 +1,104 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from matches.utils.export import EXPORT_FORMATS, MatchExportHandler
+
+
+class Command(BaseCommand):
+    help = (
+        "Command for exporting the matches as CSV or NDJSON, optionally "
+        "gzipped, streaming them from the database in chunks"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds the command arguments
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The command parser
+        """
+
+        parser.add_argument(
+            "--format",
+            choices=list(EXPORT_FORMATS),
+            default="csv",
+            help="The format of the export",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compresses the export with gzip",
+        )
+        parser.add_argument(
+            "--league", help="Exports only the matches of the league with this id"
+        )
+        parser.add_argument("--season", help="Exports only the matches of this season")
+        parser.add_argument(
+            "--team", help="Exports only the matches of the team with this id"
+        )
+        parser.add_argument(
+            "--fields",
+            help="The comma-separated match fields to export, defaults to all of them",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="The file the export is written to, defaults to the standard output",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Executes the command
+
+        Raises
+        ------
+        CommandError
+            If the filters or the fields are invalid
+        """
+
+        export_handler = MatchExportHandler(
+            export_format=options.get("format", "csv"),
+            compress=options.get("gzip", False),
+            league=options.get("league"),
+            season=options.get("season"),
+            team=options.get("team"),
+            fields=options.get("fields"),
+        )
+
+        export_handler.validate_data()
+
+        if export_handler.invalid:
+            raise CommandError(" ".join(export_handler.errors))
+
+        output = options.get("output")
+
+        if output is None:
+            # The bytes go to the binary buffer of the standard output, and
+            # are decoded for text streams, such as the ones of `call_command`
+            buffer = getattr(self.stdout, "buffer", None)
+
+            if buffer is None and export_handler.compress:
+                raise CommandError(
+                    "Gzipped exports must be written to a file or a binary output."
+                )
+
+            for chunk in export_handler.stream():
+                if buffer is None:
+                    self.stdout.write(chunk.decode(), ending="")
+                else:
+                    buffer.write(chunk)
+
+            self.stdout.flush()
+
+            return
+
+        with output.open("wb") as file:
+            for chunk in export_handler.stream():
+                file.write(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully exported the matches to {output}")
+        )
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+
+from matches.utils.partitions import is_partitioned, partition_table, unpartition_table
+
+
+class Command(BaseCommand):
+    help = (
+        "Command for partitioning the table `matches` by season on PostgreSQL, "
+        "so that `seed_matches` creates a partition for every new season and "
+        "reseeds seasons by truncating their partitions"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds the command arguments
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The command parser
+        """
+
+        parser.add_argument(
+            "--undo",
+            action="store_true",
+            help="Rebuilds the partitioned table `matches` as a plain table",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Executes the command
+
+        Raises
+        ------
+        CommandError
+            If the database is not PostgreSQL or the table
+            is already in the requested layout
+        """
+
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning the matches requires PostgreSQL")
+
+        if options.get("undo"):
+            if not is_partitioned():
+                raise CommandError("The table `matches` is not partitioned")
+
+            unpartition_table()
+
+            self.stdout.write(
+                self.style.SUCCESS("Successfully rebuilt `matches` as a plain table")
+            )
+
+            return
+
+        if is_partitioned():
+            raise CommandError("The table `matches` is already partitioned")
+
+        partitions = partition_table()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully partitioned `matches` into {len(partitions)} seasons"
+            )
+        )
@@ -1,10 +1,58 @@
+import itertools
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 from django.conf import settings
-from django.core.management.base import BaseCommand, CommandError
-from django.db import connection
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
 
 from matches.constants import MatchFields
 from matches.models import Match
+from matches.utils.arrays import MatchArrayCache
+from matches.utils.calibration import CALIBRATION_FIELDS, refresh_calibrations
+from matches.utils.columnar import current_version, read_match_columns
+from matches.utils.download import MatchDataCache
+from matches.utils.head_to_head import HEAD_TO_HEAD_FIELDS, refresh_head_to_heads
+from matches.utils.loaders import (
+    cast_match_types,
+    copy_matches,
+    drop_sqlite_indexes,
+    insert_matches,
+    match_instances,
+    rebuild_sqlite_indexes,
+    sqlite_bulk_load,
+)
+from matches.utils.names import MatchNameResolver
+from matches.utils.parallel import load_in_parallel
+from matches.utils.partitions import (
+    create_season_partitions,
+    is_partitioned,
+    truncate_season_partitions,
+)
+from matches.utils.profiling import SeedProfiler, StageProfile
+from matches.utils.simulation import clear_projections
+from matches.utils.snapshot import MatchSnapshot
+from matches.utils.standings import rebuild_standings, update_standings
+from matches.utils.swap import (
+    STAGING_TABLE,
+    build_staging_indexes,
+    create_staging_table,
+    restore_previous_table,
+    swap_staging_table,
+)
+from matches.utils.trends import TREND_FIELDS, league_season_teams, refresh_team_trends
+from matches.utils.upsert import MatchUpsertHandler
+from matches.utils.validation import MatchValidator
+
+# The fields of the match arrays read once for the summaries of the matches
+SUMMARY_FIELDS = list(
+    dict.fromkeys([*TREND_FIELDS, *HEAD_TO_HEAD_FIELDS, *CALIBRATION_FIELDS])
+)
 
 SOCCER_MATCHES_URL = (
     "https://projects.fivethirtyeight.com/soccer-api/club/spi_matches.csv"
@@ -16,33 +64,425 @@ class Command(BaseCommand):
 
     _match_df: pd.DataFrame
     _match_instances: list[Match]
+    _loader: str
+    _source = SOCCER_MATCHES_URL
+    _match_data_cache: Optional[MatchDataCache] = None
+    _name_resolver: Optional[MatchNameResolver] = None
+    _seasons: Optional[list[int]] = None
+    _league_seasons: Optional[set[tuple[int, int]]] = None
+    _pairs: Optional[set[tuple[int, int]]] = None
+    _partitioned = False
+    _profiler: SeedProfiler
+    _rejected = 0
+    _seen_keys: Optional[np.ndarray] = None
+    _rejected_file: Path
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initializes the command, with a disabled profiler until the
+        options of `handle` enable it
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self._profiler = SeedProfiler()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds the command arguments
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The command parser
+        """
+
+        mode = parser.add_mutually_exclusive_group()
+
+        mode.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Streams the match data in chunks of this many rows",
+        )
+        mode.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Inserts new matches and updates changed ones instead of reseeding",
+        )
+        mode.add_argument(
+            "--swap",
+            action="store_true",
+            help=(
+                "Loads the matches into a staging table and atomically swaps it "
+                "with the live table, keeping the replaced one for a rollback"
+            ),
+        )
+        mode.add_argument(
+            "--rollback",
+            action="store_true",
+            help="Swaps the table replaced by the last `--swap` seed back in",
+        )
+
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Loads partitions of the matches with this many processes on "
+                "PostgreSQL, through a staging table swap"
+            ),
+        )
+        parser.add_argument(
+            "--season",
+            type=int,
+            action="append",
+            dest="seasons",
+            help=(
+                "Reseeds only this season, which can be repeated, truncating "
+                "its partition if the table is partitioned by season"
+            ),
+        )
+        parser.add_argument(
+            "--source",
+            default=SOCCER_MATCHES_URL,
+            help="The URL or local CSV file, optionally gzipped, of the match data",
+        )
+        parser.add_argument(
+            "--rejected-file",
+            type=Path,
+            help=(
+                "The CSV file where the invalid matches are quarantined with "
+                "their reasons, defaults to `MATCH_DATA_REJECTED_FILE`"
+            ),
+        )
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help=(
+                "Writes a columnar snapshot of the matches, partitioned by "
+                "season and league, to `MATCH_SNAPSHOT_DIR` after seeding"
+            ),
+        )
+        parser.add_argument(
+            "--arrays",
+            action="store_true",
+            help=(
+                "Writes the memory-mapped array cache of the matches, shared by "
+                "the worker processes, to `MATCH_ARRAY_CACHE_DIR` after seeding, "
+                "which every later seed keeps current"
+            ),
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Seeds the matches even if the match data did not change",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help=(
+                "Reports the wall time, CPU time, peak memory, throughput "
+                "and SQL query count of every stage"
+            ),
+        )
+        parser.add_argument(
+            "--profile-dir",
+            type=Path,
+            help="Writes cProfile stats and a JSON report of every stage to this directory",
+        )
+        parser.add_argument(
+            "--loader",
+            choices=["auto", "orm", "raw", "copy", "sqlite"],
+            default="auto",
+            help=(
+                "Loads the matches with the ORM `bulk_create`, with plain tuples "
+                "and no model instances, with PostgreSQL's COPY or with the "
+                "SQLite fast load; `auto` uses the fastest loader of the "
+                "database backend"
+            ),
+        )
 
     def handle(self, *args, **options) -> None:
         """
         Executes the command
         """
 
-        self.stdout.write("Downloading match data...")
-        self._download_match_data()
+        self._loader = self._resolve_loader(options.get("loader", "auto"))
+        chunk_size = options.get("chunk_size")
 
-        self.stdout.write("Extracting columns...")
-        self._extract_columns()
+        workers = options.get("workers", 1)
 
-        self.stdout.write("Generating match instances...")
-        self._generate_match_instances()
+        if chunk_size is not None and chunk_size <= 0:
+            raise CommandError("The chunk size must be a positive integer")
 
-        self.stdout.write("Saving match instances...")
-        self._save_match_instances()
+        if workers <= 0:
+            raise CommandError("The number of workers must be a positive integer")
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Successfully seeded {len(self._match_instances)} matches"
+        if workers > 1 and (chunk_size is not None or options.get("incremental")):
+            raise CommandError(
+                "Multiple workers cannot be combined with chunked or incremental seeding"
+            )
+
+        swapping = options.get("swap") or options.get("rollback") or workers > 1
+        self._seasons = options.get("seasons")
+
+        if self._seasons and swapping:
+            raise CommandError(
+                "Seeding seasons cannot be combined with swapping or multiple workers"
             )
+
+        self._partitioned = is_partitioned()
+
+        if self._partitioned and swapping:
+            raise CommandError(
+                "Swapping and multiple workers are not supported "
+                "on a table partitioned by season"
+            )
+
+        if options.get("snapshot"):
+            try:
+                snapshot = MatchSnapshot()
+            except ImportError as error:
+                raise CommandError(str(error))
+        else:
+            snapshot = None
+
+        array_cache = self._array_cache(options.get("arrays", False))
+
+        if options.get("rollback"):
+            self._rollback_swap()
+
+            return
+
+        self._rejected_file = Path(
+            options.get("rejected_file") or settings.MATCH_DATA_REJECTED_FILE
+        )
+        self._rejected_file.unlink(missing_ok=True)
+        self._rejected = 0
+        self._name_resolver = None
+
+        self._profiler = SeedProfiler(
+            enabled=options.get("profile") or bool(options.get("profile_dir")),
+            output_dir=options.get("profile_dir"),
         )
 
+        with self._stage("fetch", "Fetching match data..."):
+            changed = self._fetch_match_data(options.get("source", SOCCER_MATCHES_URL))
+
+        if not changed and not options.get("force") and Match.objects.exists():
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Match data not modified since the last seed, skipping"
+                )
+            )
+        else:
+            if chunk_size is not None:
+                self._seed_in_chunks(chunk_size)
+            elif options.get("incremental"):
+                self._seed_incrementally()
+            elif options.get("swap") or workers > 1:
+                self._seed_with_swap(workers)
+            else:
+                self._seed()
+
+            if snapshot or array_cache:
+                self._write_columnar(snapshot, array_cache)
+
+            self._refresh_summaries()
+            self._mark_seeded()
+            self._report_rejected()
+
+        self._report_profile()
+
+    @contextmanager
+    def _stage(
+        self, name: str, message: Optional[str] = None
+    ) -> Iterator[StageProfile]:
+        """
+        Runs a seed stage under the profiler
+
+        Parameters
+        ----------
+        name : str
+            The stage name
+        message : Optional[str]
+            The progress message of the stage, if any
+
+        Yields
+        ------
+        StageProfile
+            The profile of the stage
+        """
+
+        if message:
+            self.stdout.write(message)
+
+        with self._profiler.stage(name) as profile:
+            yield profile
+
+    def _report_profile(self) -> None:
+        """
+        Writes the profile summary of the stages and its reports, if profiling
+        """
+
+        if not self._profiler.enabled:
+            return
+
+        self.stdout.write("\n".join(self._profiler.summary()))
+        self._profiler.write_reports()
+
+    def _read_match_data(self) -> None:
+        """
+        Reads the fetched match data and extracts its columns
+        """
+
+        with self._stage("read", "Reading match data...") as stage:
+            self._download_match_data()
+            stage.rows += len(self._match_df)
+
+        with self._stage("extract", "Extracting columns...") as stage:
+            self._extract_columns()
+            stage.rows += len(self._match_df)
+
+        with self._stage("validate", "Validating match data...") as stage:
+            stage.rows += len(self._match_df)
+            self._validate_match_data()
+            self._select_seasons()
+
+        with self._stage("resolve", "Resolving league and team names...") as stage:
+            self._resolve_names()
+            self._create_season_partitions()
+            stage.rows += len(self._match_df)
+
+    def _seed(self) -> None:
+        """
+        Replaces the stored matches with the match data
+        """
+
+        self._read_match_data()
+
+        if self._loader == "orm":
+            with self._stage("generate", "Generating match instances...") as stage:
+                self._generate_match_instances()
+                stage.rows += len(self._match_instances)
+
+            with self._stage("save", "Saving match instances...") as stage:
+                self._save_match_instances()
+                stage.rows += len(self._match_instances)
+
+            seeded = len(self._match_instances)
+        else:
+            with self._stage(
+                "load", f"Loading match data with the {self._loader} loader..."
+            ) as stage, self._bulk_load():
+                seeded = self._save_match_data()
+                stage.rows += seeded
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully seeded {seeded} matches"))
+
+    @staticmethod
+    def _resolve_loader(loader: str) -> str:
+        """
+        Resolves the loader for the database backend
+
+        Parameters
+        ----------
+        loader : str
+            The requested loader
+
+        Returns
+        -------
+        str
+            The loader to use
+
+        Raises
+        ------
+        CommandError
+            If the loader is not available for the database backend
+        """
+
+        is_postgresql = connection.vendor == "postgresql"
+
+        if loader == "copy" and not is_postgresql:
+            raise CommandError("The copy loader requires PostgreSQL")
+
+        if loader == "sqlite" and connection.vendor != "sqlite":
+            raise CommandError("The sqlite loader requires SQLite")
+
+        if loader == "auto":
+            return "copy" if is_postgresql else "sqlite"
+
+        return loader
+
+    def _fetch_match_data(self, source: str) -> bool:
+        """
+        Fetches the match data of the source through the download cache
+
+        Parameters
+        ----------
+        source : str
+            The URL or local path of the match data
+
+        Returns
+        -------
+        bool
+            True if the match data changed since the last seed, False otherwise
+
+        Raises
+        ------
+        CommandError
+            If there is an error downloading the data
+        """
+
+        self._match_data_cache = MatchDataCache(
+            source, settings.MATCH_DATA_CACHE_DIR, database=self._database_key()
+        )
+
+        try:
+            self._match_data_cache.fetch()
+        except Exception:
+            raise CommandError("Error downloading matches data")
+
+        self._source = self._match_data_cache.path
+
+        return self._match_data_cache.changed
+
+    @staticmethod
+    def _database_key() -> str:
+        """
+        Returns the key of the database the matches are seeded into, so that
+        the data seeded into one database does not skip the seed of another
+
+        Returns
+        -------
+        str
+            The backend, host, port and name of the database
+        """
+
+        settings_dict = connection.settings_dict
+
+        return ":".join(
+            str(settings_dict.get(key) or "")
+            for key in ("ENGINE", "HOST", "PORT", "NAME")
+        )
+
+    def _mark_seeded(self) -> None:
+        """
+        Records the fetched match data as seeded. A seed of some seasons
+        forgets the match data seeded into the database instead, as the
+        other seasons of the table no longer come from the fetched data
+        """
+
+        if self._seasons:
+            MatchDataCache.clear_database(
+                settings.MATCH_DATA_CACHE_DIR, self._database_key()
+            )
+        elif self._match_data_cache:
+            self._match_data_cache.mark_seeded()
+
     def _download_match_data(self) -> None:
         """
-        Downloads the match data from the URL
+        Reads the fetched match data
 
         Raises
         ------
@@ -51,10 +491,381 @@ class Command(BaseCommand):
         """
 
         try:
-            self._match_df = pd.read_csv(SOCCER_MATCHES_URL)
+            self._match_df = pd.read_csv(self._source)
         except Exception:
             raise CommandError("Error downloading matches data")
 
+    def _read_match_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Reads the fetched match data in chunks, parsing
+        only the columns of the match model
+
+        Parameters
+        ----------
+        chunk_size : int
+            The number of rows per chunk
+
+        Yields
+        ------
+        pd.DataFrame
+            The next chunk of match data
+
+        Raises
+        ------
+        CommandError
+            If there is an error downloading the data
+        """
+
+        try:
+            yield from pd.read_csv(
+                self._source,
+                usecols=MatchFields.field_list(),
+                chunksize=chunk_size,
+            )
+        except Exception:
+            raise CommandError("Error downloading matches data")
+
+    def _seed_in_chunks(self, chunk_size: int) -> None:
+        """
+        Seeds the matches as a pipeline of chunks, so that only one
+        chunk of rows and match instances is held in memory at a time
+
+        Parameters
+        ----------
+        chunk_size : int
+            The number of rows per chunk
+        """
+
+        self.stdout.write(f"Streaming match data in chunks of {chunk_size} rows...")
+
+        total = 0
+        chunks = self._read_match_chunks(chunk_size)
+        # The keys of the saved chunks, whose copies in later chunks are rejected
+        self._seen_keys = np.empty(0, dtype=np.uint64)
+
+        with self._bulk_load():
+            for number in itertools.count(1):
+                started = time.perf_counter()
+
+                with self._stage("read") as stage:
+                    self._match_df = next(chunks, None)
+
+                    if self._match_df is None:
+                        break
+
+                    stage.rows += len(self._match_df)
+
+                with self._stage("extract") as stage:
+                    self._extract_columns()
+                    stage.rows += len(self._match_df)
+
+                with self._stage("validate") as stage:
+                    stage.rows += len(self._match_df)
+                    self._validate_match_data()
+                    self._select_seasons()
+
+                with self._stage("resolve") as stage:
+                    self._resolve_names()
+                    self._create_season_partitions()
+                    stage.rows += len(self._match_df)
+
+                with self._stage("load") as stage:
+                    rows = self._save_match_data()
+                    stage.rows += rows
+
+                total += rows
+                elapsed = time.perf_counter() - started
+
+                self.stdout.write(
+                    f"Chunk {number}: saved {rows} matches in {elapsed:.2f}s "
+                    f"({rows / max(elapsed, 1e-9):.0f} rows/s)"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully seeded {total} matches"))
+
+    @contextmanager
+    def _bulk_load(self) -> Iterator[None]:
+        """
+        Replaces the stored matches in one transaction, in which the match
+        data is saved. With the sqlite loader, the load runs with relaxed
+        durability and the indexes are rebuilt and analyzed afterwards
+        """
+
+        if self._loader != "sqlite":
+            with transaction.atomic():
+                self._delete_match_instances()
+
+                yield
+
+            return
+
+        with sqlite_bulk_load(), transaction.atomic():
+            self._delete_match_instances()
+            statements = drop_sqlite_indexes()
+
+            yield
+
+            rebuild_sqlite_indexes(statements)
+
+    def _save_match_data(self) -> int:
+        """
+        Saves the current match DataFrame with the resolved loader
+
+        Returns
+        -------
+        int
+            The number of saved matches
+        """
+
+        if self._loader == "copy":
+            return copy_matches(self._match_df)
+
+        if self._loader in ("raw", "sqlite"):
+            return insert_matches(self._match_df)
+
+        self._generate_match_instances()
+        Match.objects.bulk_create(self._match_instances)
+
+        return len(self._match_instances)
+
+    def _seed_incrementally(self) -> None:
+        """
+        Seeds only the matches that are new or whose values changed
+        """
+
+        self._read_match_data()
+
+        with self._stage("diff", "Computing match changes...") as stage:
+            upsert_handler = MatchUpsertHandler(self._match_df)
+            upsert_handler.compute_changes()
+            stage.rows += len(upsert_handler.match_df)
+
+        with self._stage("save", "Saving match changes...") as stage:
+            upsert_handler.save()
+            stage.rows += upsert_handler.inserted + upsert_handler.updated
+
+        self._league_seasons = upsert_handler.league_seasons
+        self._pairs = upsert_handler.pairs
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully seeded matches: {upsert_handler.inserted} inserted, "
+                f"{upsert_handler.updated} updated, "
+                f"{upsert_handler.unchanged} unchanged"
+            )
+        )
+
+    def _seed_with_swap(self, workers: int = 1) -> None:
+        """
+        Seeds the matches into a staging table that is swapped with the
+        live table, so that readers never see an empty or partial table.
+        On PostgreSQL, the staging table can be loaded by several workers
+
+        Parameters
+        ----------
+        workers : int
+            The number of worker processes that load the staging table
+        """
+
+        self._read_match_data()
+
+        if workers > 1 and connection.vendor != "postgresql":
+            self.stdout.write("Parallel loading requires PostgreSQL, loading serially")
+            workers = 1
+
+        with self._stage(
+            "load", f"Loading match data into `{STAGING_TABLE}`..."
+        ) as stage:
+            if workers > 1:
+                with transaction.atomic():
+                    create_staging_table()
+
+                seeded = load_in_parallel(self._match_df, STAGING_TABLE, workers)
+            else:
+                with sqlite_bulk_load(), transaction.atomic():
+                    create_staging_table()
+
+                    if connection.vendor == "postgresql":
+                        seeded = copy_matches(self._match_df, table=STAGING_TABLE)
+                    else:
+                        seeded = insert_matches(self._match_df, table=STAGING_TABLE)
+
+            stage.rows += seeded
+
+        with self._stage("index", "Building indexes...") as stage:
+            build_staging_indexes()
+            stage.rows += seeded
+
+        with self._stage("swap", "Swapping tables..."):
+            swap_staging_table()
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully seeded {seeded} matches"))
+
+    def _rollback_swap(self) -> None:
+        """
+        Swaps the table replaced by the last swap seed back in, rebuilds the
+        summaries of the restored matches and forgets the seeded match data,
+        so that the next seed of any source is not skipped
+
+        Raises
+        ------
+        CommandError
+            If there is no replaced table
+        """
+
+        try:
+            restore_previous_table()
+        except LookupError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(
+            self.style.SUCCESS("Successfully restored the previous matches")
+        )
+
+        self._refresh_summaries()
+        MatchDataCache.clear_database(
+            settings.MATCH_DATA_CACHE_DIR, self._database_key()
+        )
+
+        array_cache = self._array_cache(False)
+
+        if array_cache:
+            self._write_columnar(None, array_cache)
+
+    @staticmethod
+    def _array_cache(requested: bool) -> Optional[MatchArrayCache]:
+        """
+        Returns the match array cache to write, if it is requested or was
+        already written, so that the workers that read it do not read the
+        matches of an earlier seed
+
+        Parameters
+        ----------
+        requested : bool
+            True if the array cache is requested, False otherwise
+
+        Returns
+        -------
+        Optional[MatchArrayCache]
+            The match array cache, None if it is not written
+        """
+
+        array_cache = MatchArrayCache()
+
+        if requested or current_version(array_cache.cache_dir) is not None:
+            return array_cache
+
+        return None
+
+    def _write_columnar(
+        self,
+        snapshot: Optional[MatchSnapshot],
+        array_cache: Optional[MatchArrayCache],
+    ) -> None:
+        """
+        Writes the seeded matches as the current columnar snapshot and
+        array cache, reading them from the database once for both
+
+        Parameters
+        ----------
+        snapshot : Optional[MatchSnapshot]
+            The match snapshot, None if it is not written
+        array_cache : Optional[MatchArrayCache]
+            The match array cache, None if it is not written
+        """
+
+        with self._stage("columns", "Reading match columns...") as stage:
+            match_df = read_match_columns()
+            stage.rows += len(match_df)
+
+        if snapshot:
+            with self._stage("snapshot", "Writing match snapshot..."):
+                version = snapshot.write(match_df)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Successfully wrote match snapshot {version} "
+                    f"to {snapshot.snapshot_dir}"
+                )
+            )
+
+        if array_cache:
+            with self._stage("arrays", "Writing match array cache..."):
+                version = array_cache.write(match_df)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Successfully wrote match array cache {version} "
+                    f"to {array_cache.cache_dir}"
+                )
+            )
+
+    def _refresh_summaries(self) -> None:
+        """
+        Refreshes the summaries of the seeded matches: updates the standings
+        and team trends of the league seasons whose matches changed and the
+        head-to-head records of their pairs of teams, or rebuilds them,
+        refreshes the calibrations of the forecast probabilities and clears
+        the projections. The trends, head-to-head records and calibrations
+        share a single read of the match arrays
+        """
+
+        with self._stage("standings", "Refreshing standings...") as stage:
+            if self._league_seasons is not None:
+                standings = update_standings(self._league_seasons)
+            else:
+                standings = rebuild_standings(self._seasons)
+
+            stage.rows += standings
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully refreshed {standings} standings")
+        )
+
+        with self._stage("summarize", "Reading match arrays...") as stage:
+            arrays = Match.objects.order_by(MatchFields.DATE, "id").to_arrays(
+                SUMMARY_FIELDS
+            )
+            stage.rows += len(arrays[MatchFields.DATE])
+
+        with self._stage("trends", "Refreshing team trends...") as stage:
+            teams = None
+
+            if self._league_seasons is not None:
+                teams = league_season_teams(self._league_seasons)
+
+            trends = refresh_team_trends(teams, arrays)
+            stage.rows += len(arrays[MatchFields.DATE])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully refreshed {trends} team trends")
+        )
+
+        with self._stage("head_to_head", "Refreshing head-to-head records...") as stage:
+            head_to_heads = refresh_head_to_heads(self._pairs, arrays)
+            stage.rows += len(arrays[MatchFields.DATE])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully refreshed {head_to_heads} head-to-head records"
+            )
+        )
+
+        with self._stage("calibrate", "Refreshing forecast calibrations..."):
+            played = ~(
+                np.isnan(arrays[MatchFields.SCORE1])
+                | np.isnan(arrays[MatchFields.SCORE2])
+            )
+            calibrations = refresh_calibrations(
+                {field: arrays[field][played] for field in CALIBRATION_FIELDS}
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully refreshed {calibrations} calibrations")
+        )
+
+        clear_projections()
+
     def _extract_columns(self) -> None:
         """
         Extracts the columns from the match DataFrame
@@ -62,21 +873,100 @@ class Command(BaseCommand):
 
         self._match_df = self._match_df[MatchFields.field_list()]
 
+    def _validate_match_data(self) -> None:
+        """
+        Drops the invalid matches from the match DataFrame, quarantining
+        them with their reasons in the rejected file, and casts the
+        valid ones to the compact types of the match fields
+        """
+
+        validator = MatchValidator(self._match_df, seen_keys=self._seen_keys)
+        validator.validate()
+
+        if validator.rejected:
+            validator.write_rejected(self._rejected_file, append=self._rejected > 0)
+            self._rejected += validator.rejected
+
+        if self._seen_keys is not None:
+            # A stable sort of two sorted runs merges them in linear time
+            self._seen_keys = np.sort(
+                np.concatenate([self._seen_keys, np.sort(validator.valid_keys)]),
+                kind="stable",
+            )
+
+        self._match_df = cast_match_types(validator.valid_df)
+
+    def _select_seasons(self) -> None:
+        """
+        Keeps only the matches of the seeded seasons, if any
+        """
+
+        if self._seasons:
+            self._match_df = self._match_df[
+                self._match_df[MatchFields.SEASON].isin(self._seasons)
+            ]
+
+    def _create_season_partitions(self) -> None:
+        """
+        Creates the partitions of the new seasons of the match DataFrame,
+        if the table is partitioned by season
+        """
+
+        if self._partitioned:
+            create_season_partitions(self._match_df[MatchFields.SEASON].unique())
+
+    def _resolve_names(self) -> None:
+        """
+        Replaces the league and team names of the match DataFrame with their
+        ids, through the name-to-id maps built once per run
+        """
+
+        if self._name_resolver is None:
+            self._name_resolver = MatchNameResolver()
+
+        self._match_df = self._name_resolver.resolve(self._match_df)
+
+    def _report_rejected(self) -> None:
+        """
+        Writes the number of rejected matches and where they are quarantined
+        """
+
+        if self._rejected:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Rejected {self._rejected} invalid matches, "
+                    f"see {self._rejected_file}"
+                )
+            )
+
     def _generate_match_instances(self) -> None:
         """
         Generates the match instances from the match DataFrame
         """
 
-        self._match_instances = [
-            Match(**match) for match in self._match_df.to_dict("records")
-        ]
+        self._match_instances = match_instances(self._match_df)
 
     def _save_match_instances(self) -> None:
         """
         Saves the match instances to the database
         """
 
-        if Match.objects.exists():
+        self._delete_match_instances()
+
+        Match.objects.bulk_create(self._match_instances)
+
+    def _delete_match_instances(self) -> None:
+        """
+        Deletes the existing match instances, or only those of the seeded
+        seasons, from the database. A table partitioned by season is
+        truncated, or only the partitions of the seeded seasons are
+        """
+
+        if self._partitioned:
+            truncate_season_partitions(self._seasons)
+        elif self._seasons:
+            Match.objects.filter(season__in=self._seasons).delete()
+        elif Match.objects.exists():
             Match.objects.all().delete()
 
             if settings.ENVIRONMENT not in ["test"]:
@@ -84,5 +974,3 @@ class Command(BaseCommand):
                     cursor.execute(
                         f"DELETE FROM sqlite_sequence WHERE name='{Match._meta.db_table}';"
                     )
-
-        Match.objects.bulk_create(self._match_instances)
@@ -0,0 +1,90 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from matches.utils.simulation import (
+    SIMULATIONS,
+    project_seasons,
+    remaining_league_seasons,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Command for simulating the remaining fixtures of the league seasons "
+        "and caching their projected final standings until the next seed"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds the command arguments
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The command parser
+        """
+
+        parser.add_argument(
+            "--simulations",
+            type=int,
+            default=SIMULATIONS,
+            help="The number of simulated seasons of every league season",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="The seed of the simulations",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="The number of worker processes, which simulate a league season each",
+        )
+        parser.add_argument(
+            "--league",
+            type=int,
+            action="append",
+            dest="leagues",
+            help="The id of a league to simulate, all of them if omitted",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Executes the command
+
+        Raises
+        ------
+        CommandError
+            If the number of simulations or workers is not positive
+        """
+
+        if options["simulations"] <= 0:
+            raise CommandError("The number of simulations must be a positive integer")
+
+        if options["workers"] <= 0:
+            raise CommandError("The number of workers must be a positive integer")
+
+        league_seasons = [
+            (league_id, season)
+            for league_id, season in remaining_league_seasons()
+            if not options.get("leagues") or league_id in options["leagues"]
+        ]
+
+        started = time.perf_counter()
+        projections = project_seasons(
+            league_seasons,
+            simulations=options["simulations"],
+            seed=options["seed"],
+            workers=options["workers"],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully projected {len(league_seasons)} league seasons "
+                f"({projections} teams) in {elapsed:.2f}s"
+            )
+        )
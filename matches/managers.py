@@ -0,0 +1,136 @@
+import itertools
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from django.db import models
+
+CHUNK_SIZE = 10_000
+
+# The array types of the field types, the nullable integers being read as floats
+FIELD_DTYPES = {
+    "AutoField": np.int32,
+    "BigAutoField": np.int64,
+    "BigIntegerField": np.int64,
+    "BooleanField": np.bool_,
+    "DateField": np.dtype("datetime64[D]"),
+    "DateTimeField": np.dtype("datetime64[us]"),
+    "FloatField": np.float64,
+    "IntegerField": np.int32,
+    "PositiveIntegerField": np.int32,
+    "PositiveSmallIntegerField": np.int16,
+    "SmallAutoField": np.int16,
+    "SmallIntegerField": np.int16,
+}
+INTEGER_DTYPES = {np.dtype(dtype) for dtype in (np.int16, np.int32, np.int64)}
+
+
+class MatchQuerySet(models.QuerySet):
+    """
+    The match QuerySet, which reads the matches straight into NumPy arrays
+
+    Methods
+    -------
+    to_arrays(fields, chunk_size)
+        Returns the values of some fields of the matches as typed arrays
+    to_frame(fields, chunk_size)
+        Returns the values of some fields of the matches as a DataFrame
+    """
+
+    def to_arrays(
+        self, fields: Optional[list[str]] = None, chunk_size: int = CHUNK_SIZE
+    ) -> dict[str, np.ndarray]:
+        """
+        Returns the values of some fields of the matches as typed arrays,
+        preallocated from the count of the matches and filled a chunk of
+        `values_list` rows at a time, without creating model instances.
+        The foreign keys are read as ids and the missing values of the
+        nullable integers, like the scores of the unplayed matches, as NaN
+
+        Parameters
+        ----------
+        fields : Optional[list[str]]
+            The fields to read, the id and all the match fields if None
+        chunk_size : int
+            The number of rows fetched from the database at a time
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            The array of every field, in the order of the QuerySet
+        """
+
+        fields = fields or [field.name for field in self.model._meta.concrete_fields]
+        model_fields = [self.model._meta.get_field(field) for field in fields]
+        dtypes = [self._field_dtype(field) for field in model_fields]
+        rows = self.values_list(*(field.attname for field in model_fields)).iterator(
+            chunk_size=chunk_size
+        )
+        size = self.count()
+        arrays = [np.empty(size, dtype=dtype) for dtype in dtypes]
+        start = 0
+
+        while batch := list(itertools.islice(rows, chunk_size)):
+            end = start + len(batch)
+
+            # Matches inserted since the count grow the arrays
+            if end > size:
+                size = max(end, 2 * size)
+                arrays = [np.resize(array, size) for array in arrays]
+
+            for array, values in zip(arrays, zip(*batch)):
+                array[start:end] = values
+
+            start = end
+
+        return {field: array[:start] for field, array in zip(fields, arrays)}
+
+    def to_frame(
+        self, fields: Optional[list[str]] = None, chunk_size: int = CHUNK_SIZE
+    ) -> pd.DataFrame:
+        """
+        Returns the values of some fields of the matches as a DataFrame,
+        with the columns read by `to_arrays`
+
+        Parameters
+        ----------
+        fields : Optional[list[str]]
+            The fields to read, the id and all the match fields if None
+        chunk_size : int
+            The number of rows fetched from the database at a time
+
+        Returns
+        -------
+        pd.DataFrame
+            The matches, in the order of the QuerySet
+        """
+
+        return pd.DataFrame(self.to_arrays(fields, chunk_size), copy=False)
+
+    @staticmethod
+    def _field_dtype(field: models.Field) -> np.dtype:
+        """
+        Returns the array type of a field, the one of the primary key it refers
+        to for a foreign key, a float for a nullable integer and an object if
+        the field type has no array type
+
+        Parameters
+        ----------
+        field : models.Field
+            The model field
+
+        Returns
+        -------
+        np.dtype
+            The array type
+        """
+
+        internal_type = (
+            field.target_field if field.is_relation else field
+        ).get_internal_type()
+        dtype = np.dtype(FIELD_DTYPES.get(internal_type, object))
+
+        if field.null and dtype in INTEGER_DTYPES:
+            return np.dtype(np.float64)
+
+        return dtype
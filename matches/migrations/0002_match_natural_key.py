@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(fields=('date', 'league', 'team1', 'team2'), name='matches_natural_key'),
+        ),
+    ]
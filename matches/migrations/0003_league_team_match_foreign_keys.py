@@ -0,0 +1,168 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+NAME_FIELDS = {
+    'league': 'League',
+    'team1': 'Team',
+    'team2': 'Team',
+}
+
+
+def resolve_names(apps, schema_editor):
+    """
+    Creates the leagues and teams named by the matches and points the matches at them
+    """
+
+    Match = apps.get_model('matches', 'Match')
+    names = {'League': set(), 'Team': set()}
+
+    for field, model_name in NAME_FIELDS.items():
+        names[model_name].update(Match.objects.values_list(field, flat=True).distinct())
+
+    for model_name, model_names in names.items():
+        model = apps.get_model('matches', model_name)
+        model.objects.bulk_create([model(name=name) for name in sorted(model_names)])
+
+    Match.objects.update(
+        **{
+            f'{field}_ref': Subquery(
+                apps.get_model('matches', model_name)
+                .objects.filter(name=OuterRef(field))
+                .values('id')[:1]
+            )
+            for field, model_name in NAME_FIELDS.items()
+        }
+    )
+
+
+def restore_names(apps, schema_editor):
+    """
+    Copies the league and team names back into the matches
+    """
+
+    Match = apps.get_model('matches', 'Match')
+
+    Match.objects.update(
+        **{
+            field: Subquery(
+                apps.get_model('matches', model_name)
+                .objects.filter(id=OuterRef(f'{field}_ref'))
+                .values('name')[:1]
+            )
+            for field, model_name in NAME_FIELDS.items()
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0002_match_natural_key'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='match',
+            name='matches_natural_key',
+        ),
+        migrations.CreateModel(
+            name='League',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'db_table': 'leagues',
+            },
+        ),
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'db_table': 'teams',
+            },
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='league',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='team1',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='team2',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='league_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='matches.league'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='team1_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='matches.team'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='team2_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='matches.team'),
+        ),
+        migrations.RunPython(resolve_names, restore_names),
+        migrations.RemoveField(
+            model_name='match',
+            name='league',
+        ),
+        migrations.RemoveField(
+            model_name='match',
+            name='team1',
+        ),
+        migrations.RemoveField(
+            model_name='match',
+            name='team2',
+        ),
+        migrations.RenameField(
+            model_name='match',
+            old_name='league_ref',
+            new_name='league',
+        ),
+        migrations.RenameField(
+            model_name='match',
+            old_name='team1_ref',
+            new_name='team1',
+        ),
+        migrations.RenameField(
+            model_name='match',
+            old_name='team2_ref',
+            new_name='team2',
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='league',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='matches.league'),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='team1',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='home_matches', to='matches.team'),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='team2',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='away_matches', to='matches.team'),
+        ),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(fields=('date', 'league', 'team1', 'team2'), name='matches_natural_key'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0003_league_team_match_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='match',
+            name='score1',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='score2',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='season',
+            field=models.PositiveSmallIntegerField(),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0004_compact_season_scores'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='match',
+            name='league',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='matches.league'),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='team1',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='home_matches', to='matches.team'),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='team2',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='away_matches', to='matches.team'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['league', 'date'], name='matches_league_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['team1', 'date'], name='matches_team1_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['team2', 'date'], name='matches_team2_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['season', 'league'], name='matches_season_league_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(condition=models.Q(('score1__isnull', True)), fields=['date'], name='matches_unplayed_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0005_match_access_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Calibration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("all", "All matches"),
+                            ("league", "League"),
+                            ("season", "Season"),
+                            ("team", "Team"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("season", models.PositiveSmallIntegerField(null=True)),
+                ("matches", models.PositiveIntegerField()),
+                ("brier", models.FloatField()),
+                ("log_loss", models.FloatField()),
+                ("rps", models.FloatField()),
+                ("reliability", models.JSONField()),
+                (
+                    "league",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="calibrations",
+                        to="matches.league",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="calibrations",
+                        to="matches.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "calibrations",
+                "indexes": [
+                    models.Index(
+                        fields=["scope", "season"], name="calibrations_scope_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0006_calibration"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeasonProjection",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("season", models.PositiveSmallIntegerField()),
+                ("simulations", models.PositiveIntegerField()),
+                ("points", models.PositiveSmallIntegerField()),
+                ("expected_points", models.FloatField()),
+                ("expected_position", models.FloatField()),
+                ("title", models.FloatField()),
+                ("relegation", models.FloatField()),
+                (
+                    "league",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="projections",
+                        to="matches.league",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="projections",
+                        to="matches.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "season_projections",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="seasonprojection",
+            constraint=models.UniqueConstraint(
+                fields=("league", "season", "team"), name="season_projections_team_key"
+            ),
+        ),
+    ]
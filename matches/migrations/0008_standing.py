@@ -0,0 +1,75 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0007_season_projection"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Standing",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("season", models.PositiveSmallIntegerField()),
+                ("played", models.PositiveSmallIntegerField()),
+                ("wins", models.PositiveSmallIntegerField()),
+                ("draws", models.PositiveSmallIntegerField()),
+                ("losses", models.PositiveSmallIntegerField()),
+                ("goals_for", models.PositiveSmallIntegerField()),
+                ("goals_against", models.PositiveSmallIntegerField()),
+                ("goal_difference", models.SmallIntegerField()),
+                ("points", models.PositiveSmallIntegerField()),
+                (
+                    "league",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="standings",
+                        to="matches.league",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="standings",
+                        to="matches.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "standings",
+                "indexes": [
+                    models.Index(
+                        fields=[
+                            "league",
+                            "season",
+                            "-points",
+                            "-goal_difference",
+                            "-goals_for",
+                        ],
+                        name="standings_table_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="standing",
+            constraint=models.UniqueConstraint(
+                fields=("league", "season", "team"), name="standings_team_key"
+            ),
+        ),
+    ]
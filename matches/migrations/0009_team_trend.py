@@ -0,0 +1,55 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def store_series_uncompressed(apps, schema_editor):
+    """
+    Stores the series of the team trends out of line without compression on
+    PostgreSQL, whose compression of their float arrays costs more than it saves
+    """
+
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE team_trends ALTER COLUMN series SET STORAGE EXTERNAL"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0008_standing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamTrend",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("window", models.PositiveSmallIntegerField()),
+                ("matches", models.PositiveIntegerField()),
+                ("series", models.BinaryField()),
+                (
+                    "team",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trend",
+                        to="matches.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "team_trends",
+            },
+        ),
+        migrations.RunPython(store_series_uncompressed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0009_team_trend"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HeadToHead",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("matches", models.PositiveIntegerField()),
+                ("wins1", models.PositiveIntegerField()),
+                ("draws", models.PositiveIntegerField()),
+                ("wins2", models.PositiveIntegerField()),
+                ("goals1", models.PositiveIntegerField()),
+                ("goals2", models.PositiveIntegerField()),
+                ("prob1", models.FloatField()),
+                ("probtie", models.FloatField()),
+                ("prob2", models.FloatField()),
+                ("last_meetings", models.JSONField()),
+                (
+                    "team1",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="first_head_to_heads",
+                        to="matches.team",
+                    ),
+                ),
+                (
+                    "team2",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="second_head_to_heads",
+                        to="matches.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "head_to_heads",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="headtohead",
+            constraint=models.UniqueConstraint(
+                fields=("team1", "team2"), name="head_to_heads_pair_key"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="headtohead",
+            constraint=models.CheckConstraint(
+                check=models.Q(("team1__lt", models.F("team2"))),
+                name="head_to_heads_pair_order",
+            ),
+        ),
+    ]
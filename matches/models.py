@@ -1,16 +1,71 @@
 from django.db import models
 
+from matches.constants import MatchFields
+from matches.managers import MatchQuerySet
+
+
+class League(models.Model):
+    """
+    League model
+    """
+
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        """
+        Returns the string representation of the league
+        """
+
+        return self.name
+
+    class Meta:
+        """
+        Metadata options
+        """
+
+        db_table = "leagues"
+
+
+class Team(models.Model):
+    """
+    Team model
+    """
+
+    id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        """
+        Returns the string representation of the team
+        """
+
+        return self.name
+
+    class Meta:
+        """
+        Metadata options
+        """
+
+        db_table = "teams"
+
 
 class Match(models.Model):
     """
     Match model
     """
 
-    season = models.CharField(max_length=50)
+    season = models.PositiveSmallIntegerField()
     date = models.DateField()
-    league = models.CharField(max_length=50)
-    team1 = models.CharField(max_length=50)
-    team2 = models.CharField(max_length=50)
+    league = models.ForeignKey(
+        League, on_delete=models.CASCADE, related_name="matches", db_index=False
+    )
+    team1 = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="home_matches", db_index=False
+    )
+    team2 = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="away_matches", db_index=False
+    )
     spi1 = models.FloatField()
     spi2 = models.FloatField()
     prob1 = models.FloatField()
@@ -18,8 +73,10 @@ class Match(models.Model):
     probtie = models.FloatField()
     proj_score1 = models.FloatField()
     proj_score2 = models.FloatField()
-    score1 = models.FloatField(null=True, blank=True)
-    score2 = models.FloatField(null=True, blank=True)
+    score1 = models.PositiveSmallIntegerField(null=True, blank=True)
+    score2 = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    objects = MatchQuerySet.as_manager()
 
     def __str__(self):
         """
@@ -35,3 +92,232 @@ class Match(models.Model):
 
         db_table = "matches"
         verbose_name_plural = "Matches"
+        constraints = [
+            models.UniqueConstraint(
+                fields=MatchFields.natural_key(), name="matches_natural_key"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["league", "date"], name="matches_league_date_idx"),
+            models.Index(fields=["team1", "date"], name="matches_team1_date_idx"),
+            models.Index(fields=["team2", "date"], name="matches_team2_date_idx"),
+            models.Index(fields=["season", "league"], name="matches_season_league_idx"),
+            models.Index(
+                fields=["date"],
+                condition=models.Q(score1__isnull=True),
+                name="matches_unplayed_idx",
+            ),
+        ]
+
+
+class Calibration(models.Model):
+    """
+    Calibration model, the accuracy of the forecast probabilities of
+    the played matches of a league, a season, a team or all of them
+    """
+
+    SCOPES = [
+        ("all", "All matches"),
+        ("league", "League"),
+        ("season", "Season"),
+        ("team", "Team"),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPES)
+    league = models.ForeignKey(
+        League, on_delete=models.CASCADE, related_name="calibrations", null=True
+    )
+    season = models.PositiveSmallIntegerField(null=True)
+    team = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="calibrations", null=True
+    )
+    matches = models.PositiveIntegerField()
+    brier = models.FloatField()
+    log_loss = models.FloatField()
+    rps = models.FloatField()
+    reliability = models.JSONField()
+
+    def __str__(self):
+        """
+        Returns the string representation of the calibration
+        """
+
+        return f"{self.scope} calibration of {self.matches} matches"
+
+    class Meta:
+        """
+        Metadata options
+        """
+
+        db_table = "calibrations"
+        indexes = [
+            models.Index(fields=["scope", "season"], name="calibrations_scope_idx"),
+        ]
+
+
+class SeasonProjection(models.Model):
+    """
+    Season projection model, the simulated final standing of a team
+    in a league season, cached until the matches are seeded again
+    """
+
+    league = models.ForeignKey(
+        League, on_delete=models.CASCADE, related_name="projections"
+    )
+    season = models.PositiveSmallIntegerField()
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="projections")
+    simulations = models.PositiveIntegerField()
+    points = models.PositiveSmallIntegerField()
+    expected_points = models.FloatField()
+    expected_position = models.FloatField()
+    title = models.FloatField()
+    relegation = models.FloatField()
+
+    def __str__(self):
+        """
+        Returns the string representation of the season projection
+        """
+
+        return f"{self.team} in {self.league} {self.season}"
+
+    class Meta:
+        """
+        Metadata options
+        """
+
+        db_table = "season_projections"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["league", "season", "team"],
+                name="season_projections_team_key",
+            ),
+        ]
+
+
+class Standing(models.Model):
+    """
+    Standing model, the league table row of a team in a league season,
+    materialized from the matches when they are seeded
+    """
+
+    league = models.ForeignKey(
+        League, on_delete=models.CASCADE, related_name="standings", db_index=False
+    )
+    season = models.PositiveSmallIntegerField()
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="standings")
+    played = models.PositiveSmallIntegerField()
+    wins = models.PositiveSmallIntegerField()
+    draws = models.PositiveSmallIntegerField()
+    losses = models.PositiveSmallIntegerField()
+    goals_for = models.PositiveSmallIntegerField()
+    goals_against = models.PositiveSmallIntegerField()
+    goal_difference = models.SmallIntegerField()
+    points = models.PositiveSmallIntegerField()
+
+    def __str__(self):
+        """
+        Returns the string representation of the standing
+        """
+
+        return f"{self.team} in {self.league} {self.season}: {self.points} points"
+
+    class Meta:
+        """
+        Metadata options
+        """
+
+        db_table = "standings"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["league", "season", "team"], name="standings_team_key"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=[
+                    "league",
+                    "season",
+                    "-points",
+                    "-goal_difference",
+                    "-goals_for",
+                ],
+                name="standings_table_idx",
+            ),
+        ]
+
+
+class TeamTrend(models.Model):
+    """
+    Team trend model, the dated SPI series of a team with its rolling
+    form, precomputed from its home and away matches when they are seeded
+    and stored as the compact arrays of an uncompressed NumPy archive
+    """
+
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name="trend")
+    window = models.PositiveSmallIntegerField()
+    matches = models.PositiveIntegerField()
+    series = models.BinaryField()
+
+    def __str__(self):
+        """
+        Returns the string representation of the team trend
+        """
+
+        return f"{self.team} trend of {self.matches} matches"
+
+    class Meta:
+        """
+        Metadata options
+        """
+
+        db_table = "team_trends"
+
+
+class HeadToHead(models.Model):
+    """
+    Head-to-head model, the record of the played meetings of a pair of
+    teams, keyed by the pair ordered by team id
+    """
+
+    team1 = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        related_name="first_head_to_heads",
+        db_index=False,
+    )
+    team2 = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="second_head_to_heads"
+    )
+    matches = models.PositiveIntegerField()
+    wins1 = models.PositiveIntegerField()
+    draws = models.PositiveIntegerField()
+    wins2 = models.PositiveIntegerField()
+    goals1 = models.PositiveIntegerField()
+    goals2 = models.PositiveIntegerField()
+    prob1 = models.FloatField()
+    probtie = models.FloatField()
+    prob2 = models.FloatField()
+    last_meetings = models.JSONField()
+
+    def __str__(self):
+        """
+        Returns the string representation of the head-to-head
+        """
+
+        return f"{self.team1} vs {self.team2}: {self.matches} meetings"
+
+    class Meta:
+        """
+        Metadata options
+        """
+
+        db_table = "head_to_heads"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team1", "team2"], name="head_to_heads_pair_key"
+            ),
+            models.CheckConstraint(
+                check=models.Q(team1__lt=models.F("team2")),
+                name="head_to_heads_pair_order",
+            ),
+        ]
@@ -0,0 +1,39 @@
+from django.urls import path
+
+from matches.views import (
+    calibrations,
+    export_matches,
+    head_to_head,
+    league_projections,
+    league_standings,
+    match_scorelines,
+    team_matches,
+    team_trend,
+)
+
+urlpatterns = [
+    path("matches/calibrations", calibrations, name="calibrations"),
+    path("matches/export", export_matches, name="export-matches"),
+    path(
+        "matches/<int:match_id>/scorelines",
+        match_scorelines,
+        name="match-scorelines",
+    ),
+    path(
+        "leagues/<int:league_id>/projections",
+        league_projections,
+        name="league-projections",
+    ),
+    path(
+        "leagues/<int:league_id>/standings",
+        league_standings,
+        name="league-standings",
+    ),
+    path("teams/<int:team_id>/matches", team_matches, name="team-matches"),
+    path("teams/<int:team_id>/trend", team_trend, name="team-trend"),
+    path(
+        "teams/<int:team_id>/head-to-head/<int:opponent_id>",
+        head_to_head,
+        name="head-to-head",
+    ),
+]
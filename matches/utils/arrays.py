@@ -0,0 +1,406 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from matches.constants import MatchFields
+from matches.utils.columnar import (
+    CURRENT_FILE,
+    MATCH_COLUMNS,
+    content_version,
+    current_version,
+    publish_version,
+    read_match_columns,
+)
+
+MANIFEST_FILE = "manifest.json"
+MISSING_SCORE = -1
+FLOAT_COLUMNS = [
+    MatchFields.SPI1,
+    MatchFields.SPI2,
+    MatchFields.PROB1,
+    MatchFields.PROB2,
+    MatchFields.PROBTIE,
+    MatchFields.PROJ_SCORE1,
+    MatchFields.PROJ_SCORE2,
+]
+
+
+class MatchArrays:
+    """
+    A generation of the match array cache, with one read-only memory-mapped
+    array per column, so that every process that opens it shares the same
+    physical pages. The league and team names are stored as integer codes
+    into the `leagues` and `teams` lists, and the missing scores as -1
+
+    Attributes
+    ----------
+    version : str
+        The version of the generation
+    leagues : list[str]
+        The league names, by code
+    teams : list[str]
+        The team names, by code, for both `team1` and `team2`
+
+    Properties
+    ----------
+    played : np.ndarray
+        The mask of the matches that have been played
+
+    Methods
+    -------
+    league_code(name)
+        Returns the code of a league
+    team_code(name)
+        Returns the code of a team
+    match(match_id)
+        Returns the decoded columns of a match
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Opens a generation of the match array cache
+
+        Parameters
+        ----------
+        directory : Path
+            The directory of the generation
+        """
+
+        manifest = json.loads((directory / MANIFEST_FILE).read_text())
+
+        self.version = directory.name
+        self.leagues: list[str] = manifest["leagues"]
+        self.teams: list[str] = manifest["teams"]
+        self._columns: dict[str, np.ndarray] = {
+            column: np.load(directory / f"{column}.npy", mmap_mode="r")
+            for column in manifest["columns"]
+        }
+        self._league_codes = {name: code for code, name in enumerate(self.leagues)}
+        self._team_codes = {name: code for code, name in enumerate(self.teams)}
+        self._id_order: Optional[np.ndarray] = None
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """
+        Returns the array of a column
+
+        Parameters
+        ----------
+        column : str
+            The column
+
+        Returns
+        -------
+        np.ndarray
+            The read-only array of the column
+        """
+
+        return self._columns[column]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of matches
+        """
+
+        return len(self._columns["id"])
+
+    @property
+    def played(self) -> np.ndarray:
+        """
+        The mask of the matches that have been played
+        """
+
+        return self._columns[MatchFields.SCORE1] != MISSING_SCORE
+
+    def league_code(self, name: str) -> int:
+        """
+        Returns the code of a league
+
+        Parameters
+        ----------
+        name : str
+            The league name
+
+        Returns
+        -------
+        int
+            The code of the league in the `league` column
+
+        Raises
+        ------
+        KeyError
+            If there is no match of the league
+        """
+
+        return self._league_codes[name]
+
+    def team_code(self, name: str) -> int:
+        """
+        Returns the code of a team
+
+        Parameters
+        ----------
+        name : str
+            The team name
+
+        Returns
+        -------
+        int
+            The code of the team in the `team1` and `team2` columns
+
+        Raises
+        ------
+        KeyError
+            If there is no match of the team
+        """
+
+        return self._team_codes[name]
+
+    def match(self, match_id: int) -> Optional[dict[str, Any]]:
+        """
+        Returns the decoded columns of a match, found by binary search in
+        the ids sorted once per generation
+
+        Parameters
+        ----------
+        match_id : int
+            The id of the match
+
+        Returns
+        -------
+        Optional[dict[str, Any]]
+            The columns of the match, with its names, a date and None for
+            the missing values, None if it is not in the generation
+        """
+
+        ids = self._columns["id"]
+
+        if self._id_order is None:
+            self._id_order = np.argsort(ids, kind="stable")
+
+        position = np.searchsorted(ids, match_id, sorter=self._id_order)
+
+        if position == len(ids) or ids[self._id_order[position]] != match_id:
+            return None
+
+        row = int(self._id_order[position])
+        match: dict[str, Any] = {
+            column: self._columns[column][row].item() for column in MATCH_COLUMNS
+        }
+        match[MatchFields.LEAGUE] = self.leagues[match[MatchFields.LEAGUE]]
+
+        for column in (MatchFields.TEAM1, MatchFields.TEAM2):
+            match[column] = self.teams[match[column]]
+
+        for column in FLOAT_COLUMNS:
+            if np.isnan(match[column]):
+                match[column] = None
+
+        for column in (MatchFields.SCORE1, MatchFields.SCORE2):
+            if match[column] == MISSING_SCORE:
+                match[column] = None
+
+        return match
+
+
+class MatchArrayCache:
+    """
+    The match array cache, a read-only columnar copy of the table `matches`
+    as memory-mapped NumPy arrays, written in generations versioned by the
+    hash of their content. Readers reopen the cache when the file `CURRENT`
+    is replaced, so they pick up a new generation without restarting
+
+    Attributes
+    ----------
+    cache_dir : Path
+        The directory of the generations
+
+    Methods
+    -------
+    write(match_df)
+        Writes the stored matches as the current generation
+    open()
+        Returns the current generation, reopened if it was replaced
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
+        """
+        Initializes the match array cache
+
+        Parameters
+        ----------
+        cache_dir : Optional[Path]
+            The directory of the generations, defaults to `MATCH_ARRAY_CACHE_DIR`
+        """
+
+        self.cache_dir = Path(cache_dir or settings.MATCH_ARRAY_CACHE_DIR)
+        self._arrays: Optional[MatchArrays] = None
+        self._stamp: Optional[tuple[int, int]] = None
+
+    def write(self, match_df: Optional[pd.DataFrame] = None) -> str:
+        """
+        Writes the stored matches as the current generation, into a
+        temporary directory that is renamed into place. An unchanged
+        content keeps its version, and only the current and the previous
+        generations are kept for the readers of the latter
+
+        Parameters
+        ----------
+        match_df : Optional[pd.DataFrame]
+            The matches read by `read_match_columns`, read if None
+
+        Returns
+        -------
+        str
+            The version of the generation
+        """
+
+        if match_df is None:
+            match_df = read_match_columns()
+
+        version = content_version(match_df)
+        version_dir = self.cache_dir / version
+
+        if not version_dir.exists():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            staging_dir = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix="."))
+            leagues, teams, columns = self._encode(match_df)
+
+            for column, values in columns.items():
+                np.save(staging_dir / f"{column}.npy", values)
+
+            manifest = {
+                "rows": len(match_df),
+                "columns": list(columns),
+                "leagues": leagues,
+                "teams": teams,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            (staging_dir / MANIFEST_FILE).write_text(json.dumps(manifest))
+
+            os.replace(staging_dir, version_dir)
+
+        publish_version(self.cache_dir, version)
+
+        return version
+
+    def open(self) -> MatchArrays:
+        """
+        Returns the current generation, which is only reopened if the
+        file `CURRENT` was replaced since it was last opened
+
+        Returns
+        -------
+        MatchArrays
+            The current generation
+
+        Raises
+        ------
+        LookupError
+            If there is no generation
+        """
+
+        try:
+            stat = os.stat(self.cache_dir / CURRENT_FILE)
+        except FileNotFoundError:
+            raise LookupError(f"There is no match array cache in {self.cache_dir}")
+
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+
+        if stamp != self._stamp:
+            version = current_version(self.cache_dir)
+
+            if self._arrays is None or self._arrays.version != version:
+                self._arrays = MatchArrays(self.cache_dir / version)
+
+            self._stamp = stamp
+
+        return self._arrays
+
+    @staticmethod
+    def _encode(
+        match_df: pd.DataFrame,
+    ) -> tuple[list[str], list[str], dict[str, np.ndarray]]:
+        """
+        Encodes the matches as arrays, with the names as codes
+
+        Parameters
+        ----------
+        match_df : pd.DataFrame
+            The matches read by `read_match_columns`
+
+        Returns
+        -------
+        tuple[list[str], list[str], dict[str, np.ndarray]]
+            The league names, the team names and the array of every column
+
+        Raises
+        ------
+        ValueError
+            If the columns are not the ones of `MATCH_COLUMNS`
+        """
+
+        leagues = match_df[MatchFields.LEAGUE].cat.categories.tolist()
+        teams = sorted(
+            set(match_df[MatchFields.TEAM1].cat.categories)
+            | set(match_df[MatchFields.TEAM2].cat.categories)
+        )
+        columns = {
+            "id": match_df["id"].to_numpy(np.int64),
+            MatchFields.SEASON: match_df[MatchFields.SEASON].to_numpy(np.int16),
+            MatchFields.DATE: match_df[MatchFields.DATE].to_numpy("datetime64[D]"),
+            MatchFields.LEAGUE: match_df[MatchFields.LEAGUE].cat.codes.to_numpy(),
+        }
+
+        for column in (MatchFields.TEAM1, MatchFields.TEAM2):
+            columns[column] = pd.Categorical(match_df[column], categories=teams).codes
+
+        for column in FLOAT_COLUMNS:
+            columns[column] = match_df[column].to_numpy(np.float64)
+
+        for column in (MatchFields.SCORE1, MatchFields.SCORE2):
+            columns[column] = match_df[column].fillna(MISSING_SCORE).to_numpy(np.int16)
+
+        if list(columns) != MATCH_COLUMNS:
+            raise ValueError(
+                f"The encoded columns {list(columns)} are not {MATCH_COLUMNS}."
+            )
+
+        return leagues, teams, columns
+
+
+_match_array_cache: Optional[MatchArrayCache] = None
+
+
+def match_arrays() -> MatchArrays:
+    """
+    Returns the current generation of the match array cache of this
+    process, opening the cache lazily on first use, so that every
+    worker process maps the same files and picks up a new generation
+    when the file `CURRENT` is replaced
+
+    Returns
+    -------
+    MatchArrays
+        The current generation
+
+    Raises
+    ------
+    LookupError
+        If there is no generation
+    """
+
+    global _match_array_cache
+
+    cache_dir = Path(settings.MATCH_ARRAY_CACHE_DIR)
+
+    if _match_array_cache is None or _match_array_cache.cache_dir != cache_dir:
+        _match_array_cache = MatchArrayCache(cache_dir)
+
+    return _match_array_cache.open()
@@ -0,0 +1,474 @@
+import functools
+from typing import Any, Optional
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from matches.constants import MatchFields
+from matches.models import Calibration, Match
+
+RELIABILITY_BINS = 10
+EPSILON = 1e-15
+CALIBRATION_FIELDS = [
+    MatchFields.SEASON,
+    MatchFields.LEAGUE,
+    MatchFields.TEAM1,
+    MatchFields.TEAM2,
+    MatchFields.PROB1,
+    MatchFields.PROBTIE,
+    MatchFields.PROB2,
+    MatchFields.SCORE1,
+    MatchFields.SCORE2,
+]
+SCOPES = [scope for scope, _ in Calibration.SCOPES]
+
+# The columns of a calibration row, named after the keys of the response
+CALIBRATION_VALUES = {
+    "scope": "scope",
+    "league_id": "league_id",
+    MatchFields.LEAGUE: "league__name",
+    MatchFields.SEASON: MatchFields.SEASON,
+    "team_id": "team_id",
+    "team": "team__name",
+    "matches": "matches",
+    "brier": "brier",
+    "log_loss": "log_loss",
+    "rps": "rps",
+    "reliability": "reliability",
+}
+
+
+def match_outcomes(arrays: dict[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the forecast probabilities and the one-hot results of the
+    played matches, both ordered as home win, draw and away win, with
+    an outcome per row so that the sums over the outcomes are contiguous
+
+    Parameters
+    ----------
+    arrays : dict[str, np.ndarray]
+        The arrays of the calibration fields of the played matches
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The forecasts and the outcomes, of shape (3, matches)
+    """
+
+    forecasts = np.stack(
+        [
+            arrays[MatchFields.PROB1],
+            arrays[MatchFields.PROBTIE],
+            arrays[MatchFields.PROB2],
+        ]
+    ).astype(np.float64, copy=False)
+    results = np.sign(arrays[MatchFields.SCORE2] - arrays[MatchFields.SCORE1]) + 1
+    outcomes = (np.arange(3)[:, None] == results).astype(np.float64)
+
+    return forecasts, outcomes
+
+
+def match_scores(forecasts: np.ndarray, outcomes: np.ndarray) -> np.ndarray:
+    """
+    Returns the Brier score, the log-loss and the ranked probability
+    score of every match, the last one treating the outcomes as ordered
+
+    Parameters
+    ----------
+    forecasts : np.ndarray
+        The forecast probabilities, of shape (3, matches)
+    outcomes : np.ndarray
+        The one-hot results, of shape (3, matches)
+
+    Returns
+    -------
+    np.ndarray
+        The scores, of shape (3, matches)
+    """
+
+    errors = forecasts - outcomes
+    brier = np.square(errors).sum(axis=0)
+    log_loss = -np.log(np.clip((forecasts * outcomes).sum(axis=0), EPSILON, 1))
+    rps = np.square(np.cumsum(errors, axis=0)[:-1]).sum(axis=0) / (len(errors) - 1)
+
+    return np.stack([brier, log_loss, rps])
+
+
+def group_codes(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the distinct values of non-negative integer keys, like ids and
+    seasons, and the group of every value, with a bincount lookup instead
+    of the sort of `np.unique`
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The keys
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The sorted distinct keys and the group of every value
+    """
+
+    values = values.astype(np.intp, copy=False)
+    keys = np.flatnonzero(np.bincount(values))
+    lookup = np.zeros(keys[-1] + 1 if len(keys) else 0, dtype=np.intp)
+    lookup[keys] = np.arange(len(keys))
+
+    return keys, lookup[values]
+
+
+def aggregate_scores(
+    codes: list[np.ndarray],
+    size: int,
+    scores: np.ndarray,
+    bins: np.ndarray,
+    forecasts: np.ndarray,
+    observed_bins: np.ndarray,
+) -> np.ndarray:
+    """
+    Sums the scores and the reliability bins of the matches by group, with
+    a weighted bincount per sum instead of a loop over the groups. A match
+    counts once for every array of groups, like the home and the away teams,
+    and its three outcome probabilities are binned one against the rest
+
+    Parameters
+    ----------
+    codes : list[np.ndarray]
+        The arrays of the group of every match, from 0 to `size` - 1
+    size : int
+        The number of groups
+    scores : np.ndarray
+        The scores of every match, of shape (3, matches)
+    bins : np.ndarray
+        The reliability bin of every forecast, of shape (3, matches)
+    forecasts : np.ndarray
+        The forecast probabilities, of shape (3, matches)
+    observed_bins : np.ndarray
+        The reliability bin of the forecast of the result of every match
+
+    Returns
+    -------
+    np.ndarray
+        The totals of every group, of shape (groups, 4 + 3 * bins): the match
+        count, the score sums and the forecast counts, forecast sums and
+        outcome sums of the reliability bins
+    """
+
+    length = size * RELIABILITY_BINS
+    totals = np.zeros((4, size))
+    reliability = np.zeros((3, length))
+
+    for group_codes in codes:
+        offsets = group_codes * RELIABILITY_BINS
+        bin_codes = (offsets + bins).ravel()
+        totals[0] += np.bincount(group_codes, minlength=size)
+
+        for index, weights in enumerate(scores, start=1):
+            totals[index] += np.bincount(group_codes, weights=weights, minlength=size)
+
+        # The results are one-hot, so their sums are the counts of the bins
+        # of the forecasts of the results
+        reliability[0] += np.bincount(bin_codes, minlength=length)
+        reliability[1] += np.bincount(
+            bin_codes, weights=forecasts.ravel(), minlength=length
+        )
+        reliability[2] += np.bincount(offsets + observed_bins, minlength=length)
+
+    return np.hstack(
+        [
+            totals.T,
+            reliability.reshape(3, size, RELIABILITY_BINS)
+            .transpose(1, 0, 2)
+            .reshape(size, -1),
+        ]
+    )
+
+
+def roll_up(codes: np.ndarray, size: int, totals: np.ndarray) -> np.ndarray:
+    """
+    Sums the totals of groups into coarser groups
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        The coarser group of every group, from 0 to `size` - 1
+    size : int
+        The number of coarser groups
+    totals : np.ndarray
+        The totals of the groups, returned by `aggregate_scores`
+
+    Returns
+    -------
+    np.ndarray
+        The totals of the coarser groups
+    """
+
+    rolled = np.zeros((size, totals.shape[1]))
+    np.add.at(rolled, codes, totals)
+
+    return rolled
+
+
+def compute_calibrations(arrays: dict[str, np.ndarray]) -> list[Calibration]:
+    """
+    Computes the calibration of all the played matches and of every
+    league, season and team, a team counting its home and away matches.
+    The scores and reliability bins of the matches are computed once and
+    summed in a pass by league and season and a pass by team, the totals
+    of the leagues, the seasons and all the matches being rolled up from
+    the ones of the league seasons
+
+    Parameters
+    ----------
+    arrays : dict[str, np.ndarray]
+        The arrays of the calibration fields of the played matches
+
+    Returns
+    -------
+    list[Calibration]
+        The unsaved calibrations
+    """
+
+    forecasts, outcomes = match_outcomes(arrays)
+    scores = match_scores(forecasts, outcomes)
+    bins = np.minimum(
+        (forecasts * RELIABILITY_BINS).astype(np.intp), RELIABILITY_BINS - 1
+    )
+    observed_bins = bins[outcomes.argmax(axis=0), np.arange(len(scores[0]))]
+    aggregate = functools.partial(
+        aggregate_scores,
+        scores=scores,
+        bins=bins,
+        forecasts=forecasts,
+        observed_bins=observed_bins,
+    )
+
+    leagues, league_codes = group_codes(arrays[MatchFields.LEAGUE])
+    seasons, season_codes = group_codes(arrays[MatchFields.SEASON])
+    league_seasons, codes = group_codes(league_codes * len(seasons) + season_codes)
+    league_season_totals = aggregate([codes], len(league_seasons))
+
+    teams, codes = group_codes(
+        np.concatenate([arrays[MatchFields.TEAM1], arrays[MatchFields.TEAM2]])
+    )
+    team_totals = aggregate(np.split(codes, 2), len(teams))
+
+    groups = [
+        ("all", None, [None], league_season_totals.sum(axis=0, keepdims=True)),
+        (
+            "league",
+            "league_id",
+            leagues,
+            roll_up(league_seasons // len(seasons), len(leagues), league_season_totals),
+        ),
+        (
+            MatchFields.SEASON,
+            MatchFields.SEASON,
+            seasons,
+            roll_up(league_seasons % len(seasons), len(seasons), league_season_totals),
+        ),
+        ("team", "team_id", teams, team_totals),
+    ]
+    calibrations = []
+
+    for scope, key_field, keys, totals in groups:
+        counts = totals[:, 0]
+        means = totals[:, 1:4] / np.maximum(counts, 1)[:, None]
+        reliability = totals[:, 4:].reshape(len(totals), 3, RELIABILITY_BINS)
+
+        for code, key in enumerate(list(keys)):
+            calibrations.append(
+                Calibration(
+                    scope=scope,
+                    matches=int(counts[code]),
+                    brier=float(means[code, 0]),
+                    log_loss=float(means[code, 1]),
+                    rps=float(means[code, 2]),
+                    reliability=_reliability_bins(reliability[code]),
+                    **({key_field: int(key)} if key_field else {}),
+                )
+            )
+
+    return calibrations
+
+
+def refresh_calibrations(arrays: Optional[dict[str, np.ndarray]] = None) -> int:
+    """
+    Replaces the stored calibrations with the ones of the played matches
+
+    Parameters
+    ----------
+    arrays : Optional[dict[str, np.ndarray]]
+        The arrays of the calibration fields of the played matches,
+        read with `to_arrays` if None
+
+    Returns
+    -------
+    int
+        The number of calibrations
+    """
+
+    if arrays is None:
+        arrays = Match.objects.filter(
+            score1__isnull=False, score2__isnull=False
+        ).to_arrays(CALIBRATION_FIELDS)
+
+    calibrations = (
+        compute_calibrations(arrays) if len(arrays[MatchFields.SEASON]) else []
+    )
+
+    with transaction.atomic():
+        Calibration.objects.all().delete()
+        Calibration.objects.bulk_create(calibrations, batch_size=1000)
+
+    return len(calibrations)
+
+
+def _reliability_bins(reliability: np.ndarray) -> list[dict[str, Any]]:
+    """
+    Returns the reliability bins of a group, with the mean forecast
+    probability and the observed frequency of every non-empty bin
+
+    Parameters
+    ----------
+    reliability : np.ndarray
+        The forecast counts, forecast sums and outcome sums
+        of the bins of the group, of shape (3, bins)
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The bins, from the lowest probabilities
+    """
+
+    return [
+        {
+            "lower": index / RELIABILITY_BINS,
+            "upper": (index + 1) / RELIABILITY_BINS,
+            "forecasts": int(count),
+            "forecast": forecast_sum / count if count else None,
+            "observed": outcome_sum / count if count else None,
+        }
+        for index, (count, forecast_sum, outcome_sum) in enumerate(
+            reliability.T.tolist()
+        )
+    ]
+
+
+class CalibrationHandler:
+    """
+    The calibration handler, which reads the precomputed calibrations
+    of the forecast probabilities, filtered by scope, league, season or team
+
+    Attributes
+    ----------
+    scope : Optional[str]
+        `all`, `league`, `season` or `team` to filter by
+    league : Optional[str]
+        The id of the league to filter by
+    season : Optional[str]
+        The season to filter by
+    team : Optional[str]
+        The id of the team to filter by
+    errors : list[str]
+        The list of errors
+    calibrations : list[dict[str, Any]]
+        The calibrations
+
+    Properties
+    ----------
+    invalid : bool
+        True if there are errors, False otherwise
+
+    Methods
+    -------
+    validate_data()
+        Validates the filters
+    fetch()
+        Fetches the calibrations
+    """
+
+    def __init__(
+        self,
+        scope: Optional[str] = None,
+        league: Optional[str] = None,
+        season: Optional[str] = None,
+        team: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes the calibration handler
+
+        Parameters
+        ----------
+        scope : Optional[str]
+            `all`, `league`, `season` or `team` to filter by
+        league : Optional[str]
+            The id of the league to filter by
+        season : Optional[str]
+            The season to filter by
+        team : Optional[str]
+            The id of the team to filter by
+        """
+
+        self.scope = scope
+        self.league = league
+        self.season = season
+        self.team = team
+        self.errors: list[str] = []
+        self.calibrations: list[dict[str, Any]] = []
+        self._filters = Q()
+
+    @property
+    def invalid(self) -> bool:
+        """
+        True if there are errors, False otherwise
+        """
+
+        return len(self.errors) > 0
+
+    def validate_data(self) -> None:
+        """
+        Validates the filters
+        """
+
+        if self.scope:
+            if self.scope in SCOPES:
+                self._filters &= Q(scope=self.scope)
+            else:
+                self.errors.append(f"Scope must be one of {', '.join(SCOPES)}.")
+
+        if self.league:
+            if self.league.isdigit():
+                self._filters &= Q(league_id=int(self.league))
+            else:
+                self.errors.append("League must be an id.")
+
+        if self.season:
+            if self.season.isdigit():
+                self._filters &= Q(season=int(self.season))
+            else:
+                self.errors.append("Season must be a year.")
+
+        if self.team:
+            if self.team.isdigit():
+                self._filters &= Q(team_id=int(self.team))
+            else:
+                self.errors.append("Team must be an id.")
+
+    def fetch(self) -> None:
+        """
+        Fetches the calibrations, ordered by scope, league, season and team
+        """
+
+        rows = (
+            Calibration.objects.filter(self._filters)
+            .order_by("scope", "league__name", MatchFields.SEASON, "team__name")
+            .values(*CALIBRATION_VALUES.values())
+        )
+        self.calibrations = [
+            {key: row[value] for key, value in CALIBRATION_VALUES.items()}
+            for row in rows
+        ]
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from matches.constants import MatchFields
+from matches.models import League, Match, Team
+from matches.utils.loaders import cast_match_types
+
+CHUNK_SIZE = 10_000
+CURRENT_FILE = "CURRENT"
+MATCH_COLUMNS = ["id", *MatchFields.field_list()]
+
+
+def read_match_columns() -> pd.DataFrame:
+    """
+    Reads the stored matches, sorted by season, league and date, with the
+    names of their league and teams, for the columnar copies of the table
+
+    Returns
+    -------
+    pd.DataFrame
+        The matches with compact types and categorical names
+    """
+
+    match_df = cast_match_types(
+        Match.objects.order_by(
+            MatchFields.SEASON, MatchFields.LEAGUE, MatchFields.DATE, "id"
+        ).to_frame(MATCH_COLUMNS, chunk_size=CHUNK_SIZE)
+    )
+    league_names = dict(League.objects.values_list("id", "name"))
+    team_names = dict(Team.objects.values_list("id", "name"))
+
+    return match_df.assign(
+        **{
+            MatchFields.DATE: pd.to_datetime(match_df[MatchFields.DATE]),
+            MatchFields.LEAGUE: match_df[MatchFields.LEAGUE]
+            .map(league_names)
+            .astype("category"),
+            MatchFields.TEAM1: match_df[MatchFields.TEAM1]
+            .map(team_names)
+            .astype("category"),
+            MatchFields.TEAM2: match_df[MatchFields.TEAM2]
+            .map(team_names)
+            .astype("category"),
+        }
+    )
+
+
+def content_version(match_df: pd.DataFrame) -> str:
+    """
+    Returns the version of a columnar copy of the matches, which
+    is the hash of their content, so that an unchanged seed keeps it
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The matches read by `read_match_columns`
+
+    Returns
+    -------
+    str
+        The hexadecimal version
+    """
+
+    return hashlib.sha256(
+        pd.util.hash_pandas_object(match_df, index=False).values.tobytes()
+    ).hexdigest()[:16]
+
+
+def current_version(directory: Path) -> Optional[str]:
+    """
+    Returns the current version of a directory of columnar copies
+
+    Parameters
+    ----------
+    directory : Path
+        The directory of the versions
+
+    Returns
+    -------
+    Optional[str]
+        The current version, None if there is none
+    """
+
+    try:
+        return (directory / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_version(directory: Path, version: str) -> None:
+    """
+    Makes a version of a directory of columnar copies the current one by
+    atomically replacing the file `CURRENT`, and removes the versions
+    other than the current and the previous ones, which readers that
+    have not picked up the new version yet may still be reading
+
+    Parameters
+    ----------
+    directory : Path
+        The directory of the versions
+    version : str
+        The version, already written to its subdirectory
+    """
+
+    previous = current_version(directory)
+
+    with tempfile.NamedTemporaryFile("w", dir=directory, delete=False) as current:
+        current.write(version)
+
+    os.replace(current.name, directory / CURRENT_FILE)
+
+    for path in directory.iterdir():
+        if path.is_dir() and path.name not in (version, previous):
+            shutil.rmtree(path)
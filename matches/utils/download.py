@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import tempfile
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+READ_SIZE = 1024 * 1024
+TIMEOUT = 60
+
+
+class MatchDataCache:
+    """
+    The match data cache, keyed by source, which downloads remote
+    sources with conditional requests and remembers the content
+    hash of the last data seeded into every database
+
+    Attributes
+    ----------
+    source : str
+        The URL or local path of the match data
+    cache_dir : Path
+        The directory of the cached downloads
+    database : str
+        The key of the database the match data is seeded into
+    path : Optional[Path]
+        The local file with the match data, set by `fetch`
+    sha256 : Optional[str]
+        The content hash of the match data, set by `fetch`
+    metadata : dict
+        The cached validators and hashes of the source
+
+    Properties
+    ----------
+    changed : bool
+        True if the match data differs from the last data seeded into
+        the database, False otherwise
+    is_remote : bool
+        True if the source is a URL, False otherwise
+
+    Methods
+    -------
+    fetch()
+        Makes the match data of the source available in a local file
+    mark_seeded()
+        Records the fetched match data as seeded into the database
+    clear_seeded()
+        Forgets the match data seeded into the database
+    clear_database(cache_dir, database)
+        Forgets the match data of every source seeded into a database
+    """
+
+    def __init__(self, source: str, cache_dir: Path, database: str = "default") -> None:
+        """
+        Initializes the match data cache
+
+        Parameters
+        ----------
+        source : str
+            The URL or local path of the match data
+        cache_dir : Path
+            The directory of the cached downloads
+        database : str
+            The key of the database the match data is seeded into
+        """
+
+        self.source = source
+        self.cache_dir = Path(cache_dir)
+        self.database = database
+        self.path: Optional[Path] = None
+        self.sha256: Optional[str] = None
+
+        key = hashlib.sha256(source.encode()).hexdigest()[:16]
+        suffixes = "".join(Path(urlparse(source).path).suffixes) or ".csv"
+        self._metadata_path = self.cache_dir / f"{key}.json"
+        self._body_path = self.cache_dir / f"{key}{suffixes}"
+        self.metadata: dict = self._read_metadata()
+
+    @property
+    def changed(self) -> bool:
+        """
+        True if the match data differs from the last data seeded
+        into the database, False otherwise
+        """
+
+        return self.sha256 != self.metadata.get("seeded_sha256", {}).get(self.database)
+
+    @property
+    def is_remote(self) -> bool:
+        """
+        True if the source is a URL, False otherwise
+        """
+
+        return self.source.startswith(("http://", "https://"))
+
+    def fetch(self) -> None:
+        """
+        Makes the match data of the source available in a local file,
+        downloading it only if it changed since the cached copy
+
+        Raises
+        ------
+        FileNotFoundError
+            If the source is a local path that does not exist
+        urllib.error.URLError
+            If the source cannot be downloaded
+        """
+
+        if not self.is_remote:
+            self.path = Path(self.source)
+            self.sha256 = _file_sha256(self.path)
+        elif not self._download(conditional=self._cached_body_is_valid()):
+            self.path = self._body_path
+            self.sha256 = self.metadata["sha256"]
+
+        self.metadata["sha256"] = self.sha256
+        self._write_metadata()
+
+    def mark_seeded(self) -> None:
+        """
+        Records the fetched match data as seeded into the database
+        """
+
+        self.metadata["seeded_sha256"] = {
+            **self.metadata.get("seeded_sha256", {}),
+            self.database: self.sha256,
+        }
+        self._write_metadata()
+
+    def clear_seeded(self) -> None:
+        """
+        Forgets the match data seeded into the database, so that the next
+        seed of the source is not skipped
+        """
+
+        self.metadata.get("seeded_sha256", {}).pop(self.database, None)
+        self._write_metadata()
+
+    @classmethod
+    def clear_database(cls, cache_dir: Path, database: str) -> None:
+        """
+        Forgets the match data of every cached source seeded into a
+        database, whose matches no longer come from any of them
+
+        Parameters
+        ----------
+        cache_dir : Path
+            The directory of the cached downloads
+        database : str
+            The key of the database
+        """
+
+        for metadata_path in Path(cache_dir).glob("*.json"):
+            try:
+                metadata = json.loads(metadata_path.read_text())
+            except json.JSONDecodeError:
+                continue
+
+            seeded = metadata.get("seeded_sha256", {})
+
+            if database in seeded:
+                del seeded[database]
+                metadata_path.write_text(json.dumps(metadata, indent=2))
+
+    def _download(self, conditional: bool) -> bool:
+        """
+        Downloads the source into the cache
+
+        Parameters
+        ----------
+        conditional : bool
+            True to send the cached validators, False otherwise
+
+        Returns
+        -------
+        bool
+            True if the source was downloaded, False if it was not modified
+        """
+
+        headers = {}
+
+        if conditional and self.metadata.get("etag"):
+            headers["If-None-Match"] = self.metadata["etag"]
+
+        if conditional and self.metadata.get("last_modified"):
+            headers["If-Modified-Since"] = self.metadata["last_modified"]
+
+        request = urllib.request.Request(self.source, headers=headers)
+
+        try:
+            response = urllib.request.urlopen(request, timeout=TIMEOUT)
+        except urllib.error.HTTPError as error:
+            if error.code == 304 and conditional:
+                return False
+
+            raise
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+
+        with response, tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, delete=False
+        ) as body:
+            while chunk := response.read(READ_SIZE):
+                digest.update(chunk)
+                body.write(chunk)
+
+        os.replace(body.name, self._body_path)
+
+        self.path = self._body_path
+        self.sha256 = digest.hexdigest()
+        self.metadata["etag"] = response.headers.get("ETag")
+        self.metadata["last_modified"] = response.headers.get("Last-Modified")
+
+        return True
+
+    def _cached_body_is_valid(self) -> bool:
+        """
+        True if the cached copy exists and matches its recorded hash, False otherwise
+        """
+
+        return self._body_path.exists() and _file_sha256(
+            self._body_path
+        ) == self.metadata.get("sha256")
+
+    def _read_metadata(self) -> dict:
+        """
+        Reads the cached metadata of the source
+
+        Returns
+        -------
+        dict
+            The cached metadata, empty if there is none
+        """
+
+        try:
+            return json.loads(self._metadata_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_metadata(self) -> None:
+        """
+        Writes the metadata of the source to the cache
+        """
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._metadata_path.write_text(json.dumps(self.metadata, indent=2))
+
+
+def _file_sha256(path: Path) -> str:
+    """
+    Computes the content hash of a file
+
+    Parameters
+    ----------
+    path : Path
+        The file
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 digest
+    """
+
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        while chunk := file.read(READ_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
@@ -0,0 +1,302 @@
+import csv
+import io
+import itertools
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional
+
+from django.db.models import Q, QuerySet
+
+from matches.constants import MatchFields
+from matches.models import Match
+
+CHUNK_SIZE = 2000
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# The related names of the foreign keys, exported like in the match data
+NAME_LOOKUPS = {
+    MatchFields.LEAGUE: "league__name",
+    MatchFields.TEAM1: "team1__name",
+    MatchFields.TEAM2: "team2__name",
+}
+
+
+class MatchExportHandler:
+    """
+    The match export handler, which streams the filtered matches as CSV or
+    NDJSON, optionally gzipped, reading them through a database iterator
+    in chunks so that the memory use does not grow with the export size
+
+    Attributes
+    ----------
+    export_format : str
+        `csv` or `ndjson`
+    compress : bool
+        Whether the export is gzipped
+    league : Optional[str]
+        The id of the league to filter by
+    season : Optional[str]
+        The season to filter by
+    team : Optional[str]
+        The id of the team to filter by, on either side
+    fields : Optional[str]
+        The comma-separated match fields to export, all of them if None
+    errors : list[str]
+        The list of errors
+    columns : list[str]
+        The exported match fields
+
+    Properties
+    ----------
+    invalid : bool
+        True if there are errors, False otherwise
+    content_type : str
+        The content type of the export
+    filename : str
+        The file name of the export
+
+    Methods
+    -------
+    validate_data()
+        Validates the format, the filters and the fields
+    queryset()
+        Returns the rows of the filtered matches
+    stream()
+        Streams the export in chunks of bytes
+    """
+
+    def __init__(
+        self,
+        export_format: str = "csv",
+        compress: bool = False,
+        league: Optional[str] = None,
+        season: Optional[str] = None,
+        team: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes the match export handler
+
+        Parameters
+        ----------
+        export_format : str
+            `csv` or `ndjson`
+        compress : bool
+            Whether the export is gzipped
+        league : Optional[str]
+            The id of the league to filter by
+        season : Optional[str]
+            The season to filter by
+        team : Optional[str]
+            The id of the team to filter by, on either side
+        fields : Optional[str]
+            The comma-separated match fields to export, all of them if None
+        """
+
+        self.export_format = export_format
+        self.compress = compress
+        self.league = league
+        self.season = season
+        self.team = team
+        self.fields = fields
+        self.errors: list[str] = []
+        self.columns: list[str] = MatchFields.field_list()
+        self._filters = Q()
+
+    @property
+    def invalid(self) -> bool:
+        """
+        True if there are errors, False otherwise
+        """
+
+        return len(self.errors) > 0
+
+    @property
+    def content_type(self) -> str:
+        """
+        The content type of the export
+        """
+
+        return (
+            "application/gzip" if self.compress else EXPORT_FORMATS[self.export_format]
+        )
+
+    @property
+    def filename(self) -> str:
+        """
+        The file name of the export
+        """
+
+        return f"matches.{self.export_format}" + (".gz" if self.compress else "")
+
+    def validate_data(self) -> None:
+        """
+        Validates the format, the filters and the fields
+        """
+
+        if self.export_format not in EXPORT_FORMATS:
+            self.errors.append("Format must be csv or ndjson.")
+
+        if self.league:
+            if self.league.isdigit():
+                self._filters &= Q(league_id=int(self.league))
+            else:
+                self.errors.append("League must be an id.")
+
+        if self.season:
+            if self.season.isdigit():
+                self._filters &= Q(season=int(self.season))
+            else:
+                self.errors.append("Season must be a year.")
+
+        if self.team:
+            if self.team.isdigit():
+                self._filters &= Q(team1_id=int(self.team)) | Q(team2_id=int(self.team))
+            else:
+                self.errors.append("Team must be an id.")
+
+        if self.fields:
+            columns = [field.strip() for field in self.fields.split(",")]
+            unknown = [
+                field for field in columns if field not in MatchFields.field_list()
+            ]
+
+            if unknown:
+                self.errors.append(f"Unknown fields: {', '.join(unknown)}.")
+            else:
+                self.columns = columns
+
+    def queryset(self) -> QuerySet:
+        """
+        Returns the rows of the filtered matches, with the names of their
+        league and teams, in the order of their ids
+
+        Returns
+        -------
+        QuerySet
+            The tuples of the exported columns
+        """
+
+        return (
+            Match.objects.filter(self._filters)
+            .order_by("id")
+            .values_list(*(NAME_LOOKUPS.get(field, field) for field in self.columns))
+        )
+
+    def stream(self) -> Iterator[bytes]:
+        """
+        Streams the export in chunks of bytes, one per chunk of rows read
+        from the database. On PostgreSQL, the rows are read through a
+        server-side cursor
+
+        Yields
+        ------
+        bytes
+            The next chunk of the export
+        """
+
+        rows = self.queryset().iterator(chunk_size=CHUNK_SIZE)
+        encode = (
+            self._encode_csv if self.export_format == "csv" else self._encode_ndjson
+        )
+        chunks = encode(rows)
+
+        yield from self._gzip(chunks) if self.compress else chunks
+
+    def _encode_csv(self, rows: Iterable[tuple[Any, ...]]) -> Iterator[bytes]:
+        """
+        Encodes the rows as CSV with a header, a chunk of rows at a time
+
+        Parameters
+        ----------
+        rows : Iterable[tuple[Any, ...]]
+            The rows of the exported columns
+
+        Yields
+        ------
+        bytes
+            The next CSV chunk
+        """
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns)
+
+        for batch in self._batches(rows):
+            writer.writerows(batch)
+            yield buffer.getvalue().encode()
+
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    def _encode_ndjson(self, rows: Iterable[tuple[Any, ...]]) -> Iterator[bytes]:
+        """
+        Encodes the rows as newline-delimited JSON objects, a chunk of rows at a time
+
+        Parameters
+        ----------
+        rows : Iterable[tuple[Any, ...]]
+            The rows of the exported columns
+
+        Yields
+        ------
+        bytes
+            The next NDJSON chunk
+        """
+
+        for batch in self._batches(rows):
+            yield "".join(
+                json.dumps(dict(zip(self.columns, row)), default=str) + "\n"
+                for row in batch
+            ).encode()
+
+    @staticmethod
+    def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Compresses the chunks into a gzip stream
+
+        Parameters
+        ----------
+        chunks : Iterable[bytes]
+            The uncompressed chunks
+
+        Yields
+        ------
+        bytes
+            The next compressed chunk
+        """
+
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+
+            if compressed:
+                yield compressed
+
+        yield compressor.flush()
+
+    @staticmethod
+    def _batches(rows: Iterable[tuple[Any, ...]]) -> Iterator[list[tuple[Any, ...]]]:
+        """
+        Groups the rows in batches of the database chunk size
+
+        Parameters
+        ----------
+        rows : Iterable[tuple[Any, ...]]
+            The rows
+
+        Yields
+        ------
+        list[tuple[Any, ...]]
+            The next batch of rows
+        """
+
+        rows = iter(rows)
+
+        while batch := list(itertools.islice(rows, CHUNK_SIZE)):
+            yield batch
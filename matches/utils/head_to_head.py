@@ -0,0 +1,331 @@
+from collections.abc import Iterable
+from typing import Any, Optional
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from matches.constants import MatchFields
+from matches.models import HeadToHead, Match
+
+LAST_MEETINGS = 5
+PAIR_CHUNK_SIZE = 500
+HEAD_TO_HEAD_FIELDS = [
+    MatchFields.DATE,
+    MatchFields.TEAM1,
+    MatchFields.TEAM2,
+    MatchFields.PROB1,
+    MatchFields.PROBTIE,
+    MatchFields.PROB2,
+    MatchFields.SCORE1,
+    MatchFields.SCORE2,
+]
+
+# The sums of the meetings of a pair, by head-to-head field
+RECORD_FIELDS = [
+    "matches",
+    "wins1",
+    "draws",
+    "wins2",
+    "goals1",
+    "goals2",
+    "prob1",
+    "probtie",
+    "prob2",
+]
+
+MEETING_FIELDS = ["team1_id", "team2_id", "score1", "score2"]
+
+
+def pair_keys(team1: np.ndarray, team2: np.ndarray) -> np.ndarray:
+    """
+    Returns the keys of the pairs of teams, which do not depend on which
+    team is at home
+
+    Parameters
+    ----------
+    team1 : np.ndarray
+        The ids of the home teams
+    team2 : np.ndarray
+        The ids of the away teams
+
+    Returns
+    -------
+    np.ndarray
+        The key of every pair, from its lower and its higher team id
+    """
+
+    return (np.minimum(team1, team2).astype(np.int64) << 32) | np.maximum(
+        team1, team2
+    ).astype(np.int64)
+
+
+def compute_head_to_heads(
+    arrays: dict[str, np.ndarray], last_meetings: int = LAST_MEETINGS
+) -> list[HeadToHead]:
+    """
+    Computes the head-to-head records of every pair of teams of the played
+    matches, from the point of view of the team with the lower id. The
+    matches are sorted by pair, keeping their order within a pair, and
+    the records are summed over the slices of the pairs at once
+
+    Parameters
+    ----------
+    arrays : dict[str, np.ndarray]
+        The arrays of the head-to-head fields of the played matches,
+        ordered by date and id
+    last_meetings : int
+        The number of latest meetings of a record
+
+    Returns
+    -------
+    list[HeadToHead]
+        The head-to-head records
+    """
+
+    team1 = arrays[MatchFields.TEAM1]
+    team2 = arrays[MatchFields.TEAM2]
+    score1 = arrays[MatchFields.SCORE1]
+    score2 = arrays[MatchFields.SCORE2]
+    swapped = team1 > team2
+    goals1 = np.where(swapped, score2, score1)
+    goals2 = np.where(swapped, score1, score2)
+    values = np.stack(
+        [
+            np.ones(len(team1)),
+            goals1 > goals2,
+            goals1 == goals2,
+            goals1 < goals2,
+            goals1,
+            goals2,
+            np.where(swapped, arrays[MatchFields.PROB2], arrays[MatchFields.PROB1]),
+            arrays[MatchFields.PROBTIE],
+            np.where(swapped, arrays[MatchFields.PROB1], arrays[MatchFields.PROB2]),
+        ]
+    )
+
+    keys = pair_keys(team1, team2)
+    order = np.argsort(keys, kind="stable")
+
+    if not len(order):
+        return []
+
+    pairs, starts = np.unique(keys[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+    sums = np.add.reduceat(values[:, order], starts, axis=1)
+    # The forecast probabilities are averaged, the results and goals counted
+    sums[6:] /= sums[0]
+    records = [
+        dict(zip(RECORD_FIELDS, [*map(int, record[:6]), *record[6:]]))
+        for record in sums.T.tolist()
+    ]
+
+    # The rows of the latest meetings of every pair, from the last one,
+    # the matches of a pair being by date
+    latest = ends[:, None] - 1 - np.arange(last_meetings)
+    latest = np.where(latest >= starts[:, None], order[np.maximum(latest, 0)], -1)
+    rows = latest[latest >= 0]
+    dates = np.datetime_as_string(arrays[MatchFields.DATE][rows], unit="D").tolist()
+    meetings = [
+        {"date": date, **dict(zip(MEETING_FIELDS, meeting))}
+        for date, meeting in zip(
+            dates,
+            np.column_stack([team1, team2, score1, score2])[rows].astype(int).tolist(),
+        )
+    ]
+    counts = np.cumsum(np.append(0, (latest >= 0).sum(axis=1))).tolist()
+    return [
+        HeadToHead(
+            team1_id=pair >> 32,
+            team2_id=pair & 0xFFFFFFFF,
+            last_meetings=meetings[counts[index] : counts[index + 1]],
+            **record,
+        )
+        for index, (pair, record) in enumerate(zip(pairs.tolist(), records))
+    ]
+
+
+def _pair_condition(pairs: list[tuple[int, int]]) -> Q:
+    """
+    Returns the condition on the head-to-head records of pairs of teams
+
+    Parameters
+    ----------
+    pairs : list[tuple[int, int]]
+        The lower and higher team ids of the pairs
+
+    Returns
+    -------
+    Q
+        The condition
+    """
+
+    condition = Q(pk__in=[])
+
+    for team1_id, team2_id in pairs:
+        condition |= Q(team1_id=team1_id, team2_id=team2_id)
+
+    return condition
+
+
+def refresh_head_to_heads(
+    pairs: Optional[Iterable[tuple[int, int]]] = None,
+    arrays: Optional[dict[str, np.ndarray]] = None,
+) -> int:
+    """
+    Replaces the stored head-to-head records of all the pairs of teams,
+    or of some pairs, with the ones of their played matches
+
+    Parameters
+    ----------
+    pairs : Optional[Iterable[tuple[int, int]]]
+        The ids of the teams of the pairs to refresh, all of them if None
+    arrays : Optional[dict[str, np.ndarray]]
+        The arrays of the head-to-head fields of the matches, ordered by
+        date and id, read with `to_arrays` if None
+
+    Returns
+    -------
+    int
+        The number of refreshed head-to-head records
+    """
+
+    if pairs is not None:
+        pairs = sorted({(min(pair), max(pair)) for pair in pairs})
+
+        if not pairs:
+            return 0
+
+    if arrays is None:
+        matches = Match.objects.order_by(MatchFields.DATE, "id")
+
+        if pairs is not None:
+            # The matches of the teams, narrowed down to their pairs below
+            teams = {team_id for pair in pairs for team_id in pair}
+            matches = matches.filter(Q(team1_id__in=teams) | Q(team2_id__in=teams))
+
+        arrays = matches.to_arrays(HEAD_TO_HEAD_FIELDS)
+
+    rows = ~(
+        np.isnan(arrays[MatchFields.SCORE1]) | np.isnan(arrays[MatchFields.SCORE2])
+    )
+
+    if pairs is not None:
+        rows &= np.isin(
+            pair_keys(arrays[MatchFields.TEAM1], arrays[MatchFields.TEAM2]),
+            pair_keys(*np.array(pairs, dtype=np.int64).T),
+        )
+
+    head_to_heads = compute_head_to_heads(
+        {field: arrays[field][rows] for field in HEAD_TO_HEAD_FIELDS}
+    )
+
+    with transaction.atomic():
+        if pairs is None:
+            HeadToHead.objects.all().delete()
+        else:
+            # In chunks, as SQLite limits the depth of the conditions
+            for start in range(0, len(pairs), PAIR_CHUNK_SIZE):
+                HeadToHead.objects.filter(
+                    _pair_condition(pairs[start : start + PAIR_CHUNK_SIZE])
+                ).delete()
+
+        HeadToHead.objects.bulk_create(head_to_heads, batch_size=1000)
+
+    return len(head_to_heads)
+
+
+class HeadToHeadHandler:
+    """
+    The head-to-head handler, which reads the record of a team against an
+    opponent from the stored record of their pair, with a single lookup of
+    its unique key
+
+    Attributes
+    ----------
+    team_id : int
+        The id of the team
+    opponent_id : int
+        The id of the opponent
+    errors : list[str]
+        The list of errors
+    head_to_head : Optional[dict[str, Any]]
+        The record of the team against the opponent, None if they never met
+
+    Properties
+    ----------
+    invalid : bool
+        True if there are errors, False otherwise
+
+    Methods
+    -------
+    validate_data()
+        Validates the pair of teams
+    fetch()
+        Fetches the record
+    """
+
+    def __init__(self, team_id: int, opponent_id: int) -> None:
+        """
+        Initializes the head-to-head handler
+
+        Parameters
+        ----------
+        team_id : int
+            The id of the team
+        opponent_id : int
+            The id of the opponent
+        """
+
+        self.team_id = team_id
+        self.opponent_id = opponent_id
+        self.errors: list[str] = []
+        self.head_to_head: Optional[dict[str, Any]] = None
+
+    @property
+    def invalid(self) -> bool:
+        """
+        True if there are errors, False otherwise
+        """
+
+        return len(self.errors) > 0
+
+    def validate_data(self) -> None:
+        """
+        Validates the pair of teams
+        """
+
+        if self.team_id == self.opponent_id:
+            self.errors.append("The opponent must be another team.")
+
+    def fetch(self) -> None:
+        """
+        Fetches the record of the pair, from the point of view of the team
+        """
+
+        record = (
+            HeadToHead.objects.filter(
+                team1_id=min(self.team_id, self.opponent_id),
+                team2_id=max(self.team_id, self.opponent_id),
+            )
+            .values(*RECORD_FIELDS, "last_meetings")
+            .first()
+        )
+
+        if record is None:
+            return
+
+        first, second = ("1", "2") if self.team_id < self.opponent_id else ("2", "1")
+
+        self.head_to_head = {
+            "matches": record["matches"],
+            "wins": record[f"wins{first}"],
+            "draws": record["draws"],
+            "losses": record[f"wins{second}"],
+            "goals_for": record[f"goals{first}"],
+            "goals_against": record[f"goals{second}"],
+            "prob_win": record[f"prob{first}"],
+            "prob_tie": record["probtie"],
+            "prob_loss": record[f"prob{second}"],
+            "last_meetings": record["last_meetings"],
+        }
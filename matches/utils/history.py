@@ -0,0 +1,271 @@
+import base64
+import binascii
+import heapq
+import itertools
+from datetime import date
+from typing import Any, Optional
+
+from django.db.models import Q, QuerySet
+
+from matches.constants import MatchFields
+from matches.models import Match
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+SIDES = ("home", "away")
+
+# The columns of a history row, named after the keys of the response
+HISTORY_VALUES = {
+    "id": "id",
+    MatchFields.SEASON: MatchFields.SEASON,
+    MatchFields.DATE: MatchFields.DATE,
+    "league_id": "league_id",
+    MatchFields.LEAGUE: "league__name",
+    "team1_id": "team1_id",
+    MatchFields.TEAM1: "team1__name",
+    "team2_id": "team2_id",
+    MatchFields.TEAM2: "team2__name",
+    MatchFields.PROB1: MatchFields.PROB1,
+    MatchFields.PROB2: MatchFields.PROB2,
+    MatchFields.PROBTIE: MatchFields.PROBTIE,
+    MatchFields.SCORE1: MatchFields.SCORE1,
+    MatchFields.SCORE2: MatchFields.SCORE2,
+}
+
+
+class TeamMatchHistoryHandler:
+    """
+    The team match history handler, which pages through the matches of a
+    team from the latest with a (date, id) cursor instead of an offset,
+    so that every page costs the same however deep it is
+
+    Attributes
+    ----------
+    team_id : int
+        The id of the team
+    league : Optional[str]
+        The id of the league to filter by
+    season : Optional[str]
+        The season to filter by
+    side : Optional[str]
+        `home` or `away` to filter by the side of the team
+    cursor : Optional[str]
+        The cursor of the page, the first page if None
+    limit : Optional[str]
+        The number of matches of the page
+    errors : list[str]
+        The list of errors
+    matches : list[dict[str, Any]]
+        The matches of the page, from the latest
+    next_cursor : Optional[str]
+        The cursor of the next page, None if this page is the last one
+
+    Properties
+    ----------
+    invalid : bool
+        True if there are errors, False otherwise
+
+    Methods
+    -------
+    validate_data()
+        Validates the filters, the cursor and the limit
+    fetch()
+        Fetches the matches of the page
+    encode_cursor(match_date, match_id)
+        Encodes the cursor after a match
+    decode_cursor(cursor)
+        Decodes the date and id of a cursor
+    """
+
+    def __init__(
+        self,
+        team_id: int,
+        league: Optional[str] = None,
+        season: Optional[str] = None,
+        side: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes the team match history handler
+
+        Parameters
+        ----------
+        team_id : int
+            The id of the team
+        league : Optional[str]
+            The id of the league to filter by
+        season : Optional[str]
+            The season to filter by
+        side : Optional[str]
+            `home` or `away` to filter by the side of the team
+        cursor : Optional[str]
+            The cursor of the page, the first page if None
+        limit : Optional[str]
+            The number of matches of the page
+        """
+
+        self.team_id = team_id
+        self.league = league
+        self.season = season
+        self.side = side
+        self.cursor = cursor
+        self.limit = limit
+        self.errors: list[str] = []
+        self.matches: list[dict[str, Any]] = []
+        self.next_cursor: Optional[str] = None
+        self._filters = Q()
+        self._after: Optional[tuple[date, int]] = None
+        self._page_size = PAGE_SIZE
+
+    @property
+    def invalid(self) -> bool:
+        """
+        True if there are errors, False otherwise
+        """
+
+        return len(self.errors) > 0
+
+    def validate_data(self) -> None:
+        """
+        Validates the filters, the cursor and the limit
+        """
+
+        if self.league:
+            if self.league.isdigit():
+                self._filters &= Q(league_id=int(self.league))
+            else:
+                self.errors.append("League must be an id.")
+
+        if self.season:
+            if self.season.isdigit():
+                self._filters &= Q(season=int(self.season))
+            else:
+                self.errors.append("Season must be a year.")
+
+        if self.side and self.side not in SIDES:
+            self.errors.append("Side must be home or away.")
+
+        if self.limit:
+            if self.limit.isdigit() and 0 < int(self.limit) <= MAX_PAGE_SIZE:
+                self._page_size = int(self.limit)
+            else:
+                self.errors.append(f"Limit must be between 1 and {MAX_PAGE_SIZE}.")
+
+        if self.cursor:
+            try:
+                self._after = self.decode_cursor(self.cursor)
+            except ValueError:
+                self.errors.append("Invalid cursor.")
+
+    def fetch(self) -> None:
+        """
+        Fetches the matches of the page, plus one to know if there is a next
+        page. The home and away matches are read separately in the order of
+        the indexes on (team1, date) and (team2, date) and merged, so a page
+        reads at most twice its size however many matches the team has
+        """
+
+        branches = [
+            self._side_matches(team_field)
+            for side, team_field in zip(SIDES, (MatchFields.TEAM1, MatchFields.TEAM2))
+            if self.side in (None, "", side)
+        ]
+        rows = list(
+            itertools.islice(
+                heapq.merge(
+                    *branches,
+                    key=lambda row: (row[MatchFields.DATE], row["id"]),
+                    reverse=True,
+                ),
+                self._page_size + 1,
+            )
+        )
+        self.matches = [
+            {key: row[value] for key, value in HISTORY_VALUES.items()}
+            for row in rows[: self._page_size]
+        ]
+
+        if len(rows) > self._page_size:
+            last = self.matches[-1]
+            self.next_cursor = self.encode_cursor(last[MatchFields.DATE], last["id"])
+
+    @staticmethod
+    def encode_cursor(match_date: date, match_id: int) -> str:
+        """
+        Encodes the cursor after a match
+
+        Parameters
+        ----------
+        match_date : date
+            The date of the match
+        match_id : int
+            The id of the match
+
+        Returns
+        -------
+        str
+            The URL-safe cursor
+        """
+
+        return base64.urlsafe_b64encode(
+            f"{match_date.isoformat()}_{match_id}".encode()
+        ).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[date, int]:
+        """
+        Decodes the date and id of a cursor
+
+        Parameters
+        ----------
+        cursor : str
+            The URL-safe cursor
+
+        Returns
+        -------
+        tuple[date, int]
+            The date and id of the match the page starts after
+
+        Raises
+        ------
+        ValueError
+            If the cursor is malformed
+        """
+
+        try:
+            match_date, match_id = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("_")
+            )
+        except (binascii.Error, UnicodeDecodeError) as error:
+            raise ValueError(f"Invalid cursor {cursor!r}") from error
+
+        return date.fromisoformat(match_date), int(match_id)
+
+    def _side_matches(self, team_field: str) -> QuerySet:
+        """
+        Returns the page of the matches where the team plays on one side
+
+        Parameters
+        ----------
+        team_field : str
+            `team1` for the home matches, `team2` for the away ones
+
+        Returns
+        -------
+        QuerySet
+            The values of the matches after the cursor, from the latest
+        """
+
+        matches = Match.objects.filter(self._filters, **{team_field: self.team_id})
+
+        if self._after:
+            after_date, after_id = self._after
+            # The bound on the date alone lets the index be scanned from the cursor
+            matches = matches.filter(
+                Q(date__lt=after_date) | Q(id__lt=after_id), date__lte=after_date
+            )
+
+        return matches.values(*HISTORY_VALUES.values()).order_by("-date", "-id")[
+            : self._page_size + 1
+        ]
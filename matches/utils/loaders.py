@@ -0,0 +1,359 @@
+import functools
+import io
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import pandas as pd
+from django.db import connection
+from psycopg2.extras import execute_values
+
+from matches.constants import MatchFields
+from matches.models import Match
+
+COPY_CHUNK_SIZE = 50_000
+EXECUTE_VALUES_PAGE_SIZE = 5_000
+COMPACT_TYPES = {
+    MatchFields.SEASON: "int16",
+    MatchFields.SCORE1: "Int16",
+    MatchFields.SCORE2: "Int16",
+}
+
+
+def _quoted_columns() -> str:
+    """
+    Returns the quoted columns of the match fields, in the field order
+
+    Returns
+    -------
+    str
+        The comma-separated columns
+    """
+
+    return ", ".join(
+        connection.ops.quote_name(Match._meta.get_field(field).column)
+        for field in MatchFields.field_list()
+    )
+
+
+def _execute_raw(
+    cursor: Any, sql: str, params: Any, execute: Callable[[str, Any], None]
+) -> None:
+    """
+    Runs a statement on the database driver cursor through the execute
+    wrappers of the connection, which only wrap the statements of the
+    Django cursor, so that they also see `copy_expert` and `execute_values`
+
+    Parameters
+    ----------
+    cursor : Any
+        The Django cursor
+    sql : str
+        The statement
+    params : Any
+        The parameters of the statement
+    execute : Callable[[str, Any], None]
+        Runs the statement on the driver cursor
+    """
+
+    def run(sql: str, params: Any, many: bool, context: dict[str, Any]) -> None:
+        execute(sql, params)
+
+    for wrapper in reversed(connection.execute_wrappers):
+        run = functools.partial(wrapper, run)
+
+    run(sql, params, False, {"connection": connection, "cursor": cursor})
+
+
+def copy_matches(match_df: pd.DataFrame, table: str = Match._meta.db_table) -> int:
+    """
+    Streams the projected match DataFrame into a table with
+    PostgreSQL's `COPY ... FROM STDIN`, one in-memory CSV buffer per chunk
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+    table : str
+        The table to copy the matches into
+
+    Returns
+    -------
+    int
+        The number of copied matches
+    """
+
+    fields = MatchFields.field_list()
+    statement = (
+        f"COPY {connection.ops.quote_name(table)} ({_quoted_columns()}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(match_df), COPY_CHUNK_SIZE):
+            buffer = io.StringIO()
+            match_df[fields].iloc[start : start + COPY_CHUNK_SIZE].to_csv(
+                buffer, index=False, header=False
+            )
+            buffer.seek(0)
+
+            _execute_raw(cursor, statement, buffer, cursor.cursor.copy_expert)
+
+    return len(match_df)
+
+
+def cast_match_types(match_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Casts the columns of the validated match DataFrame to the compact
+    types of the match fields: seasons to small integers and scores to
+    nullable small integers
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The validated match DataFrame
+
+    Returns
+    -------
+    pd.DataFrame
+        The match DataFrame with compact types
+    """
+
+    return match_df.assign(
+        **{
+            field: pd.to_numeric(match_df[field]).astype(dtype)
+            for field, dtype in COMPACT_TYPES.items()
+        }
+    )
+
+
+def match_columns(match_df: pd.DataFrame) -> list[list]:
+    """
+    Converts the projected match DataFrame column by column into the
+    values the match fields save: dates as dates and missing values as None
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+
+    Returns
+    -------
+    list[list]
+        The values of every field, in the field order
+    """
+
+    columns = []
+
+    for field in MatchFields.field_list():
+        column = match_df[field]
+
+        if field == MatchFields.DATE:
+            values = pd.to_datetime(column).dt.date.to_numpy(dtype=object)
+        else:
+            values = column.to_numpy(dtype=object)
+
+        missing = column.isna().to_numpy()
+
+        if missing.any():
+            values[missing] = None
+
+        columns.append(values.tolist())
+
+    return columns
+
+
+def match_rows(match_df: pd.DataFrame) -> list[tuple]:
+    """
+    Converts the projected match DataFrame into plain
+    tuples in the field order, with missing values as None
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+
+    Returns
+    -------
+    list[tuple]
+        The match rows
+    """
+
+    return list(zip(*match_columns(match_df)))
+
+
+def insert_matches(match_df: pd.DataFrame, table: str = Match._meta.db_table) -> int:
+    """
+    Inserts the projected match DataFrame into a table over plain tuples,
+    without generating match instances, with `execute_values` on
+    PostgreSQL and `executemany` on other database backends
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+    table : str
+        The table to insert the matches into
+
+    Returns
+    -------
+    int
+        The number of inserted matches
+    """
+
+    fields = MatchFields.field_list()
+    statement = (
+        f"INSERT INTO {connection.ops.quote_name(table)} ({_quoted_columns()}) VALUES "
+    )
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            rows = match_rows(match_df)
+
+            # A page at a time, as `execute_values` runs a statement per page
+            for start in range(0, len(rows), EXECUTE_VALUES_PAGE_SIZE):
+                _execute_raw(
+                    cursor,
+                    f"{statement} %s",
+                    rows[start : start + EXECUTE_VALUES_PAGE_SIZE],
+                    lambda sql, page: execute_values(
+                        cursor.cursor, sql, page, page_size=len(page)
+                    ),
+                )
+        else:
+            cursor.executemany(
+                f"{statement} ({', '.join(['%s'] * len(fields))})",
+                match_rows(match_df),
+            )
+
+    return len(match_df)
+
+
+@contextmanager
+def sqlite_bulk_load() -> Iterator[None]:
+    """
+    Switches SQLite to `journal_mode=WAL` and `synchronous=OFF`
+    for the duration of a bulk load, restoring the previous settings
+    afterwards. SQLite does not allow changing them inside a
+    transaction, so they are left untouched in that case, as
+    they are on other database backends
+    """
+
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        yield
+
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        journal_mode = cursor.fetchone()[0]
+        cursor.execute("PRAGMA synchronous")
+        synchronous = cursor.fetchone()[0]
+
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+
+        try:
+            yield
+        finally:
+            cursor.execute(f"PRAGMA synchronous={int(synchronous)}")
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+
+
+def drop_sqlite_indexes(table: str = Match._meta.db_table) -> list[str]:
+    """
+    Drops the secondary indexes of a SQLite table so
+    that a bulk load does not maintain them row by row
+
+    Parameters
+    ----------
+    table : str
+        The table whose indexes are dropped
+
+    Returns
+    -------
+    list[str]
+        The statements that recreate the dropped indexes
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL",
+            [table],
+        )
+        indexes = cursor.fetchall()
+
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+    return [sql for _, sql in indexes]
+
+
+def rebuild_sqlite_indexes(
+    statements: list[str], table: str = Match._meta.db_table
+) -> None:
+    """
+    Recreates the indexes dropped for a bulk load and
+    refreshes the statistics of the table for the query planner
+
+    Parameters
+    ----------
+    statements : list[str]
+        The statements that recreate the indexes
+    table : str
+        The table whose indexes are rebuilt
+    """
+
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+        cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+
+
+def match_instances(match_df: pd.DataFrame) -> list[Match]:
+    """
+    Generates the match instances of the projected match DataFrame,
+    assigning the league and team ids to the foreign key columns
+    and storing missing values as NULL
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+
+    Returns
+    -------
+    list[Match]
+        The match instances
+    """
+
+    attnames = {
+        field: Match._meta.get_field(field).attname
+        for field in MatchFields.field_list()
+    }
+
+    return [
+        Match(**match) for match in match_df.rename(columns=attnames).to_dict("records")
+    ]
+
+
+def bulk_create_matches(match_df: pd.DataFrame) -> int:
+    """
+    Saves the projected match DataFrame with the ORM `bulk_create`
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+
+    Returns
+    -------
+    int
+        The number of created matches
+    """
+
+    matches = Match.objects.bulk_create(match_instances(match_df))
+
+    return len(matches)
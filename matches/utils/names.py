@@ -0,0 +1,95 @@
+import pandas as pd
+from django.db import models
+
+from matches.constants import MatchFields
+from matches.models import League, Team
+
+
+class MatchNameResolver:
+    """
+    The match name resolver, which replaces the league and team names of
+    the match data with their ids through in-memory maps that are built
+    once and extended with the leagues and teams created on the way
+
+    Attributes
+    ----------
+    league_ids : dict[str, int]
+        The id of every league by name
+    team_ids : dict[str, int]
+        The id of every team by name
+
+    Methods
+    -------
+    resolve(match_df)
+        Replaces the league and team names of the match data with their ids
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the match name resolver with the stored leagues and teams
+        """
+
+        self.league_ids: dict[str, int] = dict(League.objects.values_list("name", "id"))
+        self.team_ids: dict[str, int] = dict(Team.objects.values_list("name", "id"))
+
+    def resolve(self, match_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Replaces the league and team names of the match data with
+        their ids, creating the leagues and teams that are not stored
+
+        Parameters
+        ----------
+        match_df : pd.DataFrame
+            The validated match DataFrame
+
+        Returns
+        -------
+        pd.DataFrame
+            The match DataFrame with league and team ids
+        """
+
+        teams = pd.concat([match_df[MatchFields.TEAM1], match_df[MatchFields.TEAM2]])
+
+        self._create_missing(League, self.league_ids, match_df[MatchFields.LEAGUE])
+        self._create_missing(Team, self.team_ids, teams)
+
+        return match_df.assign(
+            **{
+                MatchFields.LEAGUE: match_df[MatchFields.LEAGUE].map(self.league_ids),
+                MatchFields.TEAM1: match_df[MatchFields.TEAM1].map(self.team_ids),
+                MatchFields.TEAM2: match_df[MatchFields.TEAM2].map(self.team_ids),
+            }
+        ).astype(
+            {
+                MatchFields.LEAGUE: "int64",
+                MatchFields.TEAM1: "int64",
+                MatchFields.TEAM2: "int64",
+            }
+        )
+
+    @staticmethod
+    def _create_missing(
+        model: type[models.Model], ids: dict[str, int], names: pd.Series
+    ) -> None:
+        """
+        Creates the named rows of a model that are not in the map and adds their ids
+
+        Parameters
+        ----------
+        model : type[models.Model]
+            The league or team model
+        ids : dict[str, int]
+            The map of ids by name
+        names : pd.Series
+            The names the match data refers to
+        """
+
+        missing = sorted(set(names.unique()) - ids.keys())
+
+        if not missing:
+            return
+
+        model.objects.bulk_create(
+            [model(name=name) for name in missing], ignore_conflicts=True
+        )
+        ids.update(model.objects.filter(name__in=missing).values_list("name", "id"))
@@ -0,0 +1,113 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from django.db import connection, connections, transaction
+
+from matches.constants import MatchFields
+from matches.utils.loaders import copy_matches, insert_matches
+
+
+def partition_matches(match_df: pd.DataFrame, partitions: int) -> list[pd.DataFrame]:
+    """
+    Splits the projected match DataFrame into balanced partitions
+    of whole seasons and leagues, packing the largest groups first
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+    partitions : int
+        The maximum number of partitions
+
+    Returns
+    -------
+    list[pd.DataFrame]
+        The non-empty partitions
+    """
+
+    groups = sorted(
+        (
+            group
+            for _, group in match_df.groupby(
+                [MatchFields.SEASON, MatchFields.LEAGUE], sort=False, dropna=False
+            )
+        ),
+        key=len,
+        reverse=True,
+    )
+
+    bins: list[list[pd.DataFrame]] = [[] for _ in range(partitions)]
+    sizes = [0] * partitions
+
+    for group in groups:
+        smallest = sizes.index(min(sizes))
+        bins[smallest].append(group)
+        sizes[smallest] += len(group)
+
+    return [pd.concat(groups) for groups in bins if groups]
+
+
+def load_partition(match_df: pd.DataFrame, table: str) -> int:
+    """
+    Loads a partition of the projected match DataFrame into a table in
+    its own transaction, on the database connection of the worker process
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The partition of the projected match DataFrame
+    table : str
+        The table to load the partition into
+
+    Returns
+    -------
+    int
+        The number of loaded matches
+    """
+
+    try:
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                return copy_matches(match_df, table=table)
+
+            return insert_matches(match_df, table=table)
+    finally:
+        connection.close()
+
+
+def load_in_parallel(match_df: pd.DataFrame, table: str, workers: int) -> int:
+    """
+    Loads the projected match DataFrame into a table with a pool of
+    worker processes, one partition per worker. The connections of the
+    current process are closed first, so that the forked workers open
+    their own instead of sharing its sockets
+
+    Parameters
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+    table : str
+        The table to load the matches into
+    workers : int
+        The number of worker processes
+
+    Returns
+    -------
+    int
+        The number of loaded matches
+    """
+
+    partitions = partition_matches(match_df, workers)
+
+    if not partitions:
+        return 0
+
+    connections.close_all()
+
+    with ProcessPoolExecutor(
+        max_workers=len(partitions), mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        loaded = executor.map(load_partition, partitions, [table] * len(partitions))
+
+        return sum(loaded)
@@ -0,0 +1,300 @@
+from collections.abc import Iterable
+from typing import Optional
+
+from django.db import connection, models, transaction
+
+from matches.constants import MatchFields
+from matches.models import Match
+
+TABLE = Match._meta.db_table
+CONVERTED_TABLE = f"{TABLE}_converted"
+PARTITION_KEY = Match._meta.get_field(MatchFields.SEASON).column
+
+
+def is_partitioned() -> bool:
+    """
+    Checks whether the table `matches` is partitioned by season,
+    which is only possible on PostgreSQL
+
+    Returns
+    -------
+    bool
+        True if the table is partitioned, False otherwise
+    """
+
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE]
+        )
+        row = cursor.fetchone()
+
+    return row is not None and row[0] == "p"
+
+
+def season_partition(season: int) -> str:
+    """
+    Returns the name of the partition of a season
+
+    Parameters
+    ----------
+    season : int
+        The season
+
+    Returns
+    -------
+    str
+        The partition name
+    """
+
+    return f"{TABLE}_{int(season)}"
+
+
+def season_partitions() -> list[str]:
+    """
+    Returns the names of the season partitions of the table `matches`
+
+    Returns
+    -------
+    list[str]
+        The partition names
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = %s::regclass ORDER BY 1",
+            [TABLE],
+        )
+
+        return [name for (name,) in cursor.fetchall()]
+
+
+def create_season_partitions(seasons: Iterable[int]) -> list[str]:
+    """
+    Creates the partitions of the seasons that have none yet
+
+    Parameters
+    ----------
+    seasons : Iterable[int]
+        The seasons about to be loaded
+
+    Returns
+    -------
+    list[str]
+        The names of the created partitions
+    """
+
+    quote = connection.ops.quote_name
+    existing = set(season_partitions())
+    created = []
+
+    with connection.cursor() as cursor:
+        for season in sorted({int(season) for season in seasons}):
+            name = season_partition(season)
+
+            if name in existing:
+                continue
+
+            cursor.execute(
+                f"CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} "
+                f"FOR VALUES IN ({season})"
+            )
+            created.append(name)
+
+    return created
+
+
+def truncate_season_partitions(seasons: Optional[Iterable[int]] = None) -> None:
+    """
+    Empties the partitions of some seasons, or the whole partitioned
+    table, without scanning or vacuuming the other seasons
+
+    Parameters
+    ----------
+    seasons : Optional[Iterable[int]]
+        The seasons to empty, all of them if None
+    """
+
+    quote = connection.ops.quote_name
+
+    if seasons is None:
+        names = [TABLE]
+    else:
+        existing = set(season_partitions())
+        names = [
+            name
+            for name in map(season_partition, sorted(set(seasons)))
+            if name in existing
+        ]
+
+    if names:
+        with connection.cursor() as cursor:
+            # PostgreSQL does not truncate a table with deferred foreign key checks pending
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(f"TRUNCATE {', '.join(map(quote, names))}")
+
+
+def partition_table() -> list[str]:
+    """
+    Rebuilds the table `matches` as a table partitioned by season, with
+    one partition per stored season. PostgreSQL requires the partition
+    key in every unique constraint, so it is added to the primary key
+    and the natural key
+
+    Returns
+    -------
+    list[str]
+        The names of the created partitions
+    """
+
+    with transaction.atomic():
+        _rebuild_table(partitioned=True)
+
+        return season_partitions()
+
+
+def unpartition_table() -> None:
+    """
+    Rebuilds the partitioned table `matches` as a plain table
+    """
+
+    with transaction.atomic():
+        _rebuild_table(partitioned=False)
+
+
+def _rebuild_table(partitioned: bool) -> None:
+    """
+    Copies the table `matches` into a new table with or without
+    season partitions and rebuilds its constraints and indexes
+
+    Parameters
+    ----------
+    partitioned : bool
+        Whether the new table is partitioned by season
+    """
+
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in Match._meta.concrete_fields)
+    key = [PARTITION_KEY] if partitioned else []
+
+    with connection.cursor() as cursor:
+        # PostgreSQL does not alter a table with deferred foreign key checks pending
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass ORDER BY contype = 'f'",
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = %s::regclass AND indexrelid NOT IN "
+            "(SELECT conindid FROM pg_constraint WHERE conrelid = %s::regclass)",
+            [TABLE, TABLE],
+        )
+        indexes = [definition for (definition,) in cursor.fetchall()]
+
+        cursor.execute(f"ALTER TABLE {quote(TABLE)} RENAME TO {quote(CONVERTED_TABLE)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(TABLE)} (LIKE {quote(CONVERTED_TABLE)} "
+            "INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING GENERATED)"
+            + (f" PARTITION BY LIST ({quote(PARTITION_KEY)})" if partitioned else "")
+        )
+
+        if partitioned:
+            cursor.execute(
+                f"SELECT DISTINCT {quote(PARTITION_KEY)} FROM {quote(CONVERTED_TABLE)}"
+            )
+            create_season_partitions(season for (season,) in cursor.fetchall())
+
+        cursor.execute(
+            f"INSERT INTO {quote(TABLE)} ({columns}) "
+            f"SELECT {columns} FROM {quote(CONVERTED_TABLE)}"
+        )
+        cursor.execute(f"DROP TABLE {quote(CONVERTED_TABLE)}")
+
+        # The identity sequence of the copy is named after the dropped table's one
+        cursor.execute(
+            "SELECT pg_get_serial_sequence(%s, %s)", [TABLE, Match._meta.pk.column]
+        )
+        sequence = cursor.fetchone()[0]
+        sequence_name = f"{TABLE}_{Match._meta.pk.column}_seq"
+
+        if sequence.rsplit(".", 1)[-1].strip('"') != sequence_name:
+            cursor.execute(
+                f"ALTER SEQUENCE {sequence} RENAME TO {quote(sequence_name)}"
+            )
+
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, %s), "
+            f"COALESCE(MAX({quote(Match._meta.pk.column)}), 0) + 1, false) "
+            f"FROM {quote(TABLE)}",
+            [TABLE, Match._meta.pk.column],
+        )
+
+        for name, kind, definition in constraints:
+            if kind == "p":
+                definition = _unique_definition(
+                    "PRIMARY KEY", [Match._meta.pk.column] + key
+                )
+            elif kind == "u":
+                definition = _unique_definition("UNIQUE", _unique_columns(name) + key)
+
+            cursor.execute(
+                f"ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}"
+            )
+
+        for definition in indexes:
+            cursor.execute(definition.replace(" ON ONLY ", " ON ", 1))
+
+        cursor.execute(f"ANALYZE {quote(TABLE)}")
+
+
+def _unique_columns(name: str) -> list[str]:
+    """
+    Returns the columns of a unique constraint of the match model
+
+    Parameters
+    ----------
+    name : str
+        The constraint name
+
+    Returns
+    -------
+    list[str]
+        The constraint columns, without the partition key
+    """
+
+    constraint = next(
+        constraint
+        for constraint in Match._meta.constraints
+        if isinstance(constraint, models.UniqueConstraint) and constraint.name == name
+    )
+
+    return [Match._meta.get_field(field).column for field in constraint.fields]
+
+
+def _unique_definition(kind: str, columns: list[str]) -> str:
+    """
+    Returns the definition of a primary key or unique constraint
+
+    Parameters
+    ----------
+    kind : str
+        `PRIMARY KEY` or `UNIQUE`
+    columns : list[str]
+        The constraint columns
+
+    Returns
+    -------
+    str
+        The constraint definition
+    """
+
+    quote = connection.ops.quote_name
+
+    return f"{kind} ({', '.join(map(quote, columns))})"
@@ -0,0 +1,222 @@
+import cProfile
+import json
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from django.db import connection
+
+
+class StageProfile:
+    """
+    The profile of a seed stage, accumulated over every time the stage runs
+
+    Attributes
+    ----------
+    name : str
+        The stage name
+    wall_time : float
+        The elapsed wall-clock seconds
+    cpu_time : float
+        The elapsed CPU seconds of the process
+    peak_memory : int
+        The peak of traced memory allocations in bytes
+    rows : int
+        The number of processed rows
+    queries : int
+        The number of executed SQL queries
+    profiler : cProfile.Profile
+        The profiler of the function calls of the stage
+
+    Properties
+    ----------
+    rows_per_second : float
+        The number of processed rows per wall-clock second
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initializes the stage profile
+
+        Parameters
+        ----------
+        name : str
+            The stage name
+        """
+
+        self.name = name
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_memory = 0
+        self.rows = 0
+        self.queries = 0
+        self.profiler = cProfile.Profile()
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        The number of processed rows per wall-clock second
+        """
+
+        return self.rows / self.wall_time if self.wall_time else 0.0
+
+    def to_dict(self) -> dict:
+        """
+        Returns the stage profile as a dictionary
+        """
+
+        return {
+            "stage": self.name,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_memory": self.peak_memory,
+            "rows": self.rows,
+            "rows_per_second": self.rows_per_second,
+            "queries": self.queries,
+        }
+
+
+class SeedProfiler:
+    """
+    The seed profiler, which records the wall time, CPU time, peak
+    memory, throughput and SQL query count of every seed stage
+
+    Attributes
+    ----------
+    enabled : bool
+        True if the stages are profiled, False otherwise
+    output_dir : Optional[Path]
+        The directory of the cProfile and JSON reports, if any
+    stages : dict[str, StageProfile]
+        The profiles of the stages, in running order
+
+    Methods
+    -------
+    stage(name)
+        Profiles a stage
+    summary()
+        Returns the summary table of the stages
+    write_reports()
+        Writes the cProfile stats of every stage and the JSON report
+    """
+
+    def __init__(self, enabled: bool = False, output_dir: Optional[Path] = None):
+        """
+        Initializes the seed profiler
+
+        Parameters
+        ----------
+        enabled : bool
+            True if the stages are profiled, False otherwise
+        output_dir : Optional[Path]
+            The directory of the cProfile and JSON reports, if any
+        """
+
+        self.enabled = enabled
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.stages: dict[str, StageProfile] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageProfile]:
+        """
+        Profiles a stage, accumulating into its profile if it already ran
+
+        Parameters
+        ----------
+        name : str
+            The stage name
+
+        Yields
+        ------
+        StageProfile
+            The profile of the stage, whose rows are set by the caller
+        """
+
+        profile = self.stages.get(name) or StageProfile(name)
+
+        if not self.enabled:
+            yield profile
+
+            return
+
+        self.stages[name] = profile
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+
+            return execute(sql, params, many, context)
+
+        started_tracing = not tracemalloc.is_tracing()
+
+        if started_tracing:
+            tracemalloc.start()
+
+        tracemalloc.reset_peak()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+
+        if self.output_dir:
+            profile.profiler.enable()
+
+        try:
+            with connection.execute_wrapper(count_queries):
+                yield profile
+        finally:
+            if self.output_dir:
+                profile.profiler.disable()
+
+            profile.wall_time += time.perf_counter() - wall_started
+            profile.cpu_time += time.process_time() - cpu_started
+            profile.peak_memory = max(
+                profile.peak_memory, tracemalloc.get_traced_memory()[1]
+            )
+            profile.queries += queries
+
+            if started_tracing:
+                tracemalloc.stop()
+
+    def summary(self) -> list[str]:
+        """
+        Returns the summary table of the stages
+
+        Returns
+        -------
+        list[str]
+            The lines of the summary table
+        """
+
+        lines = [
+            f"{'stage':<12}{'wall (s)':>10}{'cpu (s)':>10}"
+            f"{'peak (MiB)':>12}{'rows':>10}{'rows/s':>12}{'queries':>9}"
+        ]
+
+        for profile in self.stages.values():
+            lines.append(
+                f"{profile.name:<12}{profile.wall_time:>10.3f}{profile.cpu_time:>10.3f}"
+                f"{profile.peak_memory / 2**20:>12.1f}{profile.rows:>10}"
+                f"{profile.rows_per_second:>12.0f}{profile.queries:>9}"
+            )
+
+        return lines
+
+    def write_reports(self) -> None:
+        """
+        Writes the cProfile stats of every stage as `<stage>.pstats`
+        and the profiles of all stages as `seed_matches.json`
+        """
+
+        if not self.output_dir:
+            return
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        for profile in self.stages.values():
+            profile.profiler.dump_stats(self.output_dir / f"{profile.name}.pstats")
+
+        report = [profile.to_dict() for profile in self.stages.values()]
+        (self.output_dir / "seed_matches.json").write_text(json.dumps(report, indent=2))
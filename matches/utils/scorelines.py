@@ -0,0 +1,221 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_GOALS = 10
+TOTAL_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+CACHE_SIZE = 4096
+
+
+def poisson_probabilities(rates: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """
+    Returns the Poisson probabilities of 0 to `max_goals` goals for every
+    rate, with the probability of more goals added to the last one, built
+    with the recurrence p(k) = p(k - 1) * rate / k, which holds for a rate of 0
+
+    Parameters
+    ----------
+    rates : np.ndarray
+        The expected goals
+    max_goals : int
+        The number of goals of the last probability, which is `max_goals` or more
+
+    Returns
+    -------
+    np.ndarray
+        The probabilities, of shape (rates, max_goals + 1)
+    """
+
+    rates = np.asarray(rates, dtype=np.float64)[:, None]
+    ratios = rates / np.arange(1, max_goals + 1)
+    probabilities = np.exp(-rates) * np.cumprod(
+        np.hstack([np.ones_like(rates), ratios]), axis=1
+    )
+    probabilities[:, -1] += 1 - probabilities.sum(axis=1)
+
+    return probabilities
+
+
+def scoreline_matrices(
+    proj_score1: np.ndarray, proj_score2: np.ndarray, max_goals: int = MAX_GOALS
+) -> np.ndarray:
+    """
+    Returns the scoreline probabilities of matches, the goals of the
+    teams being independent Poisson variables of their projected scores
+
+    Parameters
+    ----------
+    proj_score1 : np.ndarray
+        The projected goals of the home teams
+    proj_score2 : np.ndarray
+        The projected goals of the away teams
+    max_goals : int
+        The number of goals of the last row and column, which are `max_goals` or more
+
+    Returns
+    -------
+    np.ndarray
+        The probability of every scoreline, of shape (matches, home goals, away goals)
+    """
+
+    return (
+        poisson_probabilities(proj_score1, max_goals)[:, :, None]
+        * poisson_probabilities(proj_score2, max_goals)[:, None, :]
+    )
+
+
+def scoreline_markets(matrices: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Returns the probabilities of the markets derived from the scoreline
+    probabilities of matches: the results, the over/under total goals
+    lines, both teams to score and the clean sheets
+
+    Parameters
+    ----------
+    matrices : np.ndarray
+        The scoreline probabilities, of shape (matches, home goals, away goals)
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        The probabilities of every market, by market name
+    """
+
+    goals = np.arange(matrices.shape[1])
+    totals = goals[:, None] + goals[None, :]
+    margins = goals[:, None] - goals[None, :]
+    lines = np.array(TOTAL_LINES)
+    overs = np.einsum(
+        "mij,lij->ml", matrices, (totals > lines[:, None, None]).astype(np.float64)
+    )
+
+    markets = {
+        "home_win": (matrices * (margins > 0)).sum(axis=(1, 2)),
+        "draw": np.trace(matrices, axis1=1, axis2=2),
+        "away_win": (matrices * (margins < 0)).sum(axis=(1, 2)),
+        "both_teams_score": matrices[:, 1:, 1:].sum(axis=(1, 2)),
+        "home_clean_sheet": matrices[:, :, 0].sum(axis=1),
+        "away_clean_sheet": matrices[:, 0, :].sum(axis=1),
+    }
+
+    for index, line in enumerate(TOTAL_LINES):
+        markets[f"over_{line}"] = overs[:, index]
+        markets[f"under_{line}"] = 1 - overs[:, index]
+
+    return markets
+
+
+class ScorelineCache:
+    """
+    The least recently used cache of the scoreline probabilities, keyed by
+    the projected scores, so that the matrices of fixtures whose projections
+    did not change are not computed again. Its memory is bounded by `maxsize`
+    matrices of (`MAX_GOALS` + 1)² floats, 968 bytes each. A lock guards
+    the entries and counters, shared by the threads of a worker, and the
+    missing matrices are computed outside of it
+
+    Attributes
+    ----------
+    maxsize : int
+        The maximum number of cached matrices
+    hits : int
+        The number of matrices read from the cache
+    misses : int
+        The number of computed matrices
+
+    Methods
+    -------
+    matrices(proj_score1, proj_score2)
+        Returns the scoreline probabilities of matches
+    clear()
+        Empties the cache
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE) -> None:
+        """
+        Initializes the scoreline cache
+
+        Parameters
+        ----------
+        maxsize : int
+            The maximum number of cached matrices
+        """
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._matrices: OrderedDict[tuple[float, float], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of cached matrices
+        """
+
+        return len(self._matrices)
+
+    def matrices(self, proj_score1: np.ndarray, proj_score2: np.ndarray) -> np.ndarray:
+        """
+        Returns the scoreline probabilities of matches, computing the ones
+        that are not cached in a single vectorized call
+
+        Parameters
+        ----------
+        proj_score1 : np.ndarray
+            The projected goals of the home teams
+        proj_score2 : np.ndarray
+            The projected goals of the away teams
+
+        Returns
+        -------
+        np.ndarray
+            The probability of every scoreline, of shape (matches, home goals, away goals)
+        """
+
+        keys = list(
+            zip(np.asarray(proj_score1).tolist(), np.asarray(proj_score2).tolist())
+        )
+        matrices = np.empty((len(keys), MAX_GOALS + 1, MAX_GOALS + 1))
+        missing: dict[tuple[float, float], list[int]] = {}
+
+        with self._lock:
+            for index, key in enumerate(keys):
+                cached = self._matrices.get(key)
+
+                if cached is None:
+                    missing.setdefault(key, []).append(index)
+                else:
+                    self._matrices.move_to_end(key)
+                    matrices[index] = cached
+                    self.hits += 1
+
+        if missing:
+            computed = scoreline_matrices(*np.array(list(missing)).T)
+
+            with self._lock:
+                self.misses += len(missing)
+
+                for key, matrix in zip(missing, computed):
+                    # A copy, so that an evicted matrix does not keep the batch alive
+                    matrices[missing[key]] = matrix
+                    self._matrices[key] = matrix.copy()
+                    self._matrices.move_to_end(key)
+
+                while len(self._matrices) > self.maxsize:
+                    self._matrices.popitem(last=False)
+
+        return matrices
+
+    def clear(self) -> None:
+        """
+        Empties the cache
+        """
+
+        with self._lock:
+            self._matrices.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+scoreline_cache = ScorelineCache()
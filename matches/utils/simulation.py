@@ -0,0 +1,369 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import Q
+
+from matches.constants import MatchFields
+from matches.models import Match, SeasonProjection
+
+SIMULATIONS = 10_000
+BATCH_SIZE = 2_500
+RELEGATION_SPOTS = 3
+SIMULATION_FIELDS = [
+    MatchFields.TEAM1,
+    MatchFields.TEAM2,
+    MatchFields.PROB1,
+    MatchFields.PROBTIE,
+    MatchFields.PROB2,
+    MatchFields.SCORE1,
+    MatchFields.SCORE2,
+]
+
+# The columns of a projection row, named after the keys of the response
+PROJECTION_VALUES = {
+    "team_id": "team_id",
+    "team": "team__name",
+    "points": "points",
+    "expected_points": "expected_points",
+    "expected_position": "expected_position",
+    "title": "title",
+    "relegation": "relegation",
+}
+
+
+def simulate_season(
+    arrays: dict[str, np.ndarray],
+    simulations: int = SIMULATIONS,
+    seed: Any = 0,
+    relegation_spots: int = RELEGATION_SPOTS,
+) -> dict[str, np.ndarray]:
+    """
+    Simulates the remaining fixtures of a league season many times and
+    returns the projected final standing of every team. The results of all
+    the fixtures of a batch of seasons are drawn at once from their forecast
+    probabilities, and the points are added to the teams with a product by
+    the fixture-team incidence matrices. Teams level on points are ranked
+    by their current goal difference, then at random
+
+    Parameters
+    ----------
+    arrays : dict[str, np.ndarray]
+        The arrays of the simulation fields of the matches of the league season
+    simulations : int
+        The number of simulated seasons
+    seed : Any
+        The seed of the random generator, an integer or a `SeedSequence`
+    relegation_spots : int
+        The number of relegated teams
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        The ids, current points, expected points, expected positions and
+        title and relegation probabilities of the teams
+    """
+
+    teams, codes = np.unique(
+        np.concatenate([arrays[MatchFields.TEAM1], arrays[MatchFields.TEAM2]]),
+        return_inverse=True,
+    )
+    home, away = np.split(codes, 2)
+    size = len(teams)
+    score1 = arrays[MatchFields.SCORE1]
+    score2 = arrays[MatchFields.SCORE2]
+    played = ~(np.isnan(score1) | np.isnan(score2))
+
+    results = np.sign(score1[played] - score2[played]).astype(np.intp)
+    points = np.bincount(
+        home[played], weights=np.choose(results + 1, [0, 1, 3]), minlength=size
+    ) + np.bincount(
+        away[played], weights=np.choose(results + 1, [3, 1, 0]), minlength=size
+    )
+    goal_difference = np.bincount(
+        home[played], weights=score1[played] - score2[played], minlength=size
+    ) + np.bincount(
+        away[played], weights=score2[played] - score1[played], minlength=size
+    )
+
+    # A fraction below one point that orders the teams by goal difference,
+    # the teams level on goal difference too being ordered at random
+    tiebreak = np.unique(goal_difference, return_inverse=True)[1] / size
+
+    remaining = ~played
+    fixtures = int(remaining.sum())
+    forecasts = np.stack(
+        [
+            arrays[MatchFields.PROB1][remaining],
+            arrays[MatchFields.PROBTIE][remaining],
+            arrays[MatchFields.PROB2][remaining],
+        ]
+    )
+    thresholds = np.cumsum(forecasts / forecasts.sum(axis=0), axis=0)[:2]
+    home_teams = np.zeros((fixtures, size), dtype=np.float32)
+    home_teams[np.arange(fixtures), home[remaining]] = 1
+    away_teams = np.zeros((fixtures, size), dtype=np.float32)
+    away_teams[np.arange(fixtures), away[remaining]] = 1
+
+    rng = np.random.default_rng(seed)
+    point_sums = np.zeros(size)
+    position_counts = np.zeros(size * size, dtype=np.int64)
+
+    for start in range(0, simulations, BATCH_SIZE):
+        batch = min(BATCH_SIZE, simulations - start)
+        uniforms = rng.random((batch, fixtures), dtype=np.float32)
+        home_wins = uniforms < thresholds[0]
+        ties = (uniforms < thresholds[1]) & ~home_wins
+        home_points = 3 * home_wins + ties
+        away_points = 3 * ~(home_wins | ties) + ties
+
+        season_points = (
+            points
+            + home_points.astype(np.float32) @ home_teams
+            + away_points.astype(np.float32) @ away_teams
+        )
+        ranking = np.argsort(
+            -(season_points + tiebreak + rng.random((batch, size)) / size**2),
+            axis=1,
+        )
+        point_sums += season_points.sum(axis=0)
+        position_counts += np.bincount(
+            (ranking * size + np.arange(size)).ravel(), minlength=size * size
+        )
+
+    positions = position_counts.reshape(size, size) / max(simulations, 1)
+
+    return {
+        "team_id": teams,
+        "points": points.astype(np.int64),
+        "expected_points": point_sums / max(simulations, 1),
+        "expected_position": positions @ np.arange(1, size + 1),
+        "title": positions[:, 0],
+        "relegation": positions[:, size - min(relegation_spots, size) :].sum(axis=1),
+    }
+
+
+def remaining_league_seasons() -> list[tuple[int, int]]:
+    """
+    Returns the league seasons with remaining fixtures
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        The league ids and seasons
+    """
+
+    return list(
+        Match.objects.filter(Q(score1__isnull=True) | Q(score2__isnull=True))
+        .order_by("league_id", MatchFields.SEASON)
+        .values_list("league_id", MatchFields.SEASON)
+        .distinct()
+    )
+
+
+def project_seasons(
+    league_seasons: Optional[list[tuple[int, int]]] = None,
+    simulations: int = SIMULATIONS,
+    seed: int = 0,
+    workers: int = 1,
+) -> int:
+    """
+    Simulates league seasons and stores their projections, replacing the
+    stored ones. Every league season draws from its own random stream,
+    spawned from the seed and its key, so that the projections do not
+    depend on the number of workers or the order of the league seasons
+
+    Parameters
+    ----------
+    league_seasons : Optional[list[tuple[int, int]]]
+        The league ids and seasons, the ones with remaining fixtures if None
+    simulations : int
+        The number of simulated seasons
+    seed : int
+        The seed of the simulations
+    workers : int
+        The number of worker processes, which simulate a league season each
+
+    Returns
+    -------
+    int
+        The number of stored projections
+    """
+
+    if league_seasons is None:
+        league_seasons = remaining_league_seasons()
+
+    season_arrays = [
+        Match.objects.filter(league_id=league_id, season=season).to_arrays(
+            SIMULATION_FIELDS
+        )
+        for league_id, season in league_seasons
+    ]
+    seeds = [
+        np.random.SeedSequence([seed, league_id, season])
+        for league_id, season in league_seasons
+    ]
+
+    if workers > 1 and len(league_seasons) > 1:
+        # The forked workers must not share the sockets of the connections
+        connections.close_all()
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(league_seasons)),
+            mp_context=multiprocessing.get_context("fork"),
+        ) as executor:
+            projections = list(
+                executor.map(
+                    simulate_season,
+                    season_arrays,
+                    [simulations] * len(seeds),
+                    seeds,
+                )
+            )
+    else:
+        projections = [
+            simulate_season(arrays, simulations, season_seed)
+            for arrays, season_seed in zip(season_arrays, seeds)
+        ]
+
+    rows = [
+        SeasonProjection(
+            league_id=league_id,
+            season=season,
+            simulations=simulations,
+            **{field: value.tolist() for field, value in zip(projection, row)},
+        )
+        for (league_id, season), projection in zip(league_seasons, projections)
+        for row in zip(*projection.values())
+    ]
+
+    with transaction.atomic():
+        for league_id, season in league_seasons:
+            SeasonProjection.objects.filter(league_id=league_id, season=season).delete()
+
+        # An upsert, as concurrent projections of a season insert the same keys
+        SeasonProjection.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["league", "season", "team"],
+            update_fields=[
+                "simulations",
+                *[
+                    field
+                    for field in PROJECTION_VALUES
+                    if field not in ("team_id", "team")
+                ],
+            ],
+        )
+
+    return len(rows)
+
+
+def clear_projections() -> None:
+    """
+    Removes the stored projections, which the seeded matches invalidate
+    """
+
+    SeasonProjection.objects.all().delete()
+
+
+class SeasonProjectionHandler:
+    """
+    The season projection handler, which reads the projected final standing
+    of a league season from the projections stored by `simulate_seasons`,
+    without simulating it within the request
+
+    Attributes
+    ----------
+    league_id : int
+        The id of the league
+    season : Optional[str]
+        The season, the latest one with remaining fixtures if None
+    errors : list[str]
+        The list of errors
+    projections : list[dict[str, Any]]
+        The projections of the teams, by expected position
+
+    Properties
+    ----------
+    invalid : bool
+        True if there are errors, False otherwise
+
+    Methods
+    -------
+    validate_data()
+        Validates the season
+    fetch()
+        Fetches the stored projections
+    """
+
+    def __init__(self, league_id: int, season: Optional[str] = None) -> None:
+        """
+        Initializes the season projection handler
+
+        Parameters
+        ----------
+        league_id : int
+            The id of the league
+        season : Optional[str]
+            The season, the latest one with remaining fixtures if None
+        """
+
+        self.league_id = league_id
+        self.season = season
+        self.errors: list[str] = []
+        self.projections: list[dict[str, Any]] = []
+        self._season: Optional[int] = None
+
+    @property
+    def invalid(self) -> bool:
+        """
+        True if there are errors, False otherwise
+        """
+
+        return len(self.errors) > 0
+
+    def validate_data(self) -> None:
+        """
+        Validates the season, which must have remaining fixtures
+        """
+
+        remaining = Match.objects.filter(
+            Q(score1__isnull=True) | Q(score2__isnull=True), league_id=self.league_id
+        )
+
+        if self.season:
+            if self.season.isdigit():
+                remaining = remaining.filter(season=int(self.season))
+            else:
+                self.errors.append("Season must be a year.")
+
+                return
+
+        self._season = (
+            remaining.order_by(f"-{MatchFields.SEASON}")
+            .values_list(MatchFields.SEASON, flat=True)
+            .first()
+        )
+
+        if self._season is None:
+            self.errors.append("There are no remaining fixtures to simulate.")
+
+    def fetch(self) -> None:
+        """
+        Fetches the stored projections of the season, none if it is not
+        projected yet
+        """
+
+        self.season = self._season
+        self.projections = [
+            {key: row[value] for key, value in PROJECTION_VALUES.items()}
+            for row in SeasonProjection.objects.filter(
+                league_id=self.league_id, season=self._season
+            )
+            .order_by("expected_position", "team_id")
+            .values(*PROJECTION_VALUES.values())
+        ]
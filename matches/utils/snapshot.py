@@ -0,0 +1,328 @@
+import json
+import os
+import tempfile
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from matches.constants import MatchFields
+from matches.utils.columnar import (
+    MATCH_COLUMNS,
+    content_version,
+    current_version,
+    publish_version,
+    read_match_columns,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+except ImportError:
+    pa = None
+
+try:
+    import pyarrow.parquet
+
+    SNAPSHOT_FORMAT = "parquet"
+except ImportError:
+    SNAPSHOT_FORMAT = "feather"
+
+ROW_GROUP_SIZE = 16 * 1024
+MANIFEST_FILE = "manifest.json"
+NAME_COLUMNS = [MatchFields.LEAGUE, MatchFields.TEAM1, MatchFields.TEAM2]
+
+
+class MatchSnapshot:
+    """
+    The columnar snapshot of the table `matches`, written as Parquet, or as
+    Arrow IPC (Feather) files if pyarrow has no Parquet support, partitioned
+    by season and league and versioned by the hash of its content
+
+    Attributes
+    ----------
+    snapshot_dir : Path
+        The directory of the snapshot versions
+
+    Properties
+    ----------
+    current_version : Optional[str]
+        The version of the current snapshot, None if there is none
+
+    Methods
+    -------
+    write(match_df)
+        Writes the stored matches as the current snapshot
+    load(columns, seasons, leagues, version)
+        Reads the matches of some seasons and leagues from a snapshot
+    """
+
+    def __init__(self, snapshot_dir: Optional[Path] = None) -> None:
+        """
+        Initializes the match snapshot
+
+        Parameters
+        ----------
+        snapshot_dir : Optional[Path]
+            The directory of the snapshot versions, defaults to `MATCH_SNAPSHOT_DIR`
+
+        Raises
+        ------
+        ImportError
+            If pyarrow is not installed
+        """
+
+        if pa is None:
+            raise ImportError("The match snapshot requires pyarrow")
+
+        self.snapshot_dir = Path(snapshot_dir or settings.MATCH_SNAPSHOT_DIR)
+
+    @property
+    def current_version(self) -> Optional[str]:
+        """
+        The version of the current snapshot, None if there is none
+        """
+
+        return current_version(self.snapshot_dir)
+
+    def write(self, match_df: Optional[pd.DataFrame] = None) -> str:
+        """
+        Writes the stored matches as the current snapshot. An unchanged
+        content keeps its version, and only the current and the previous
+        versions are kept for the readers of the latter
+
+        Parameters
+        ----------
+        match_df : Optional[pd.DataFrame]
+            The matches read by `read_match_columns`, read if None
+
+        Returns
+        -------
+        str
+            The version of the snapshot
+        """
+
+        if match_df is None:
+            match_df = read_match_columns()
+
+        version = content_version(match_df)
+        version_dir = self.snapshot_dir / version
+
+        if not version_dir.exists():
+            self._write_version(match_df, version_dir)
+
+        publish_version(self.snapshot_dir, version)
+
+        return version
+
+    def load(
+        self,
+        columns: Optional[list[str]] = None,
+        seasons: Optional[Iterable[int]] = None,
+        leagues: Optional[Iterable[str]] = None,
+        version: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Reads the matches of some seasons and leagues from a snapshot,
+        opening only their files, memory-mapped, and decoding only
+        the requested columns
+
+        Parameters
+        ----------
+        columns : Optional[list[str]]
+            The columns to read, all of them if None
+        seasons : Optional[Iterable[int]]
+            The seasons to read, all of them if None
+        leagues : Optional[Iterable[str]]
+            The names of the leagues to read, all of them if None
+        version : Optional[str]
+            The version to read, the current one if None
+
+        Returns
+        -------
+        pd.DataFrame
+            The matches, sorted by date within every season and league
+
+        Raises
+        ------
+        LookupError
+            If there is no snapshot
+        """
+
+        version = version or self.current_version
+
+        if version is None:
+            raise LookupError(f"There is no match snapshot in {self.snapshot_dir}")
+
+        version_dir = self.snapshot_dir / version
+        manifest = json.loads((version_dir / MANIFEST_FILE).read_text())
+        seasons = None if seasons is None else {int(season) for season in seasons}
+        leagues = None if leagues is None else set(leagues)
+
+        files = [
+            str(version_dir / part["path"])
+            for part in manifest["parts"]
+            if (seasons is None or part[MatchFields.SEASON] in seasons)
+            and (leagues is None or not leagues.isdisjoint(part["leagues"]))
+        ]
+        dataset = ds.dataset(
+            files,
+            format=self._file_format(manifest["format"]),
+            partitioning=ds.partitioning(
+                pa.schema([(MatchFields.SEASON, pa.int16())]), flavor="hive"
+            ),
+            partition_base_dir=str(version_dir),
+            filesystem=fs.LocalFileSystem(use_mmap=True),
+        )
+        # The row groups of the other leagues are skipped by their statistics
+        table = dataset.to_table(
+            columns=columns or manifest["columns"],
+            filter=(
+                None
+                if leagues is None
+                else ds.field(MatchFields.LEAGUE).isin(sorted(leagues))
+            ),
+        )
+
+        return table.to_pandas()
+
+    def _write_version(self, match_df: pd.DataFrame, version_dir: Path) -> None:
+        """
+        Writes a snapshot version into a temporary directory that is renamed
+        into place. Every season is written to its own file, sorted by league
+        so that the row groups of other leagues can be skipped by their
+        statistics, and the manifest lists the leagues of every file
+
+        Parameters
+        ----------
+        match_df : pd.DataFrame
+            The matches of the snapshot
+        version_dir : Path
+            The directory of the version
+        """
+
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        staging_dir = Path(tempfile.mkdtemp(dir=self.snapshot_dir, prefix="."))
+        table = pa.Table.from_pandas(
+            match_df.drop(columns=MatchFields.SEASON), preserve_index=False
+        )
+
+        if SNAPSHOT_FORMAT == "parquet":
+            # Parquet encodes the names with dictionaries of its own
+            table = table.cast(
+                pa.schema(
+                    [
+                        pa.field(field.name, pa.string())
+                        if field.name in NAME_COLUMNS
+                        else field
+                        for field in table.schema
+                    ],
+                    metadata=table.schema.metadata,
+                )
+            )
+
+        # The rows are sorted by season, league and date, so every season is a
+        # run of rows whose row groups span a few leagues each
+        seasons = match_df[MatchFields.SEASON].to_numpy()
+        starts = np.flatnonzero(np.diff(seasons, prepend=-1))
+        parts = []
+
+        for start, end in zip(starts, np.append(starts[1:], len(match_df))):
+            path = Path(f"{MatchFields.SEASON}={seasons[start]}")
+            path /= f"part-0.{SNAPSHOT_FORMAT}"
+            (staging_dir / path).parent.mkdir()
+
+            with self._writer(staging_dir / path, table.schema) as writer:
+                self._write_table(writer, table.slice(start, end - start))
+
+            parts.append(
+                {
+                    MatchFields.SEASON: int(seasons[start]),
+                    "leagues": match_df[MatchFields.LEAGUE]
+                    .iloc[start:end]
+                    .unique()
+                    .tolist(),
+                    "path": path.as_posix(),
+                }
+            )
+
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "rows": len(match_df),
+            "columns": MATCH_COLUMNS,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "parts": parts,
+        }
+        (staging_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+        os.replace(staging_dir, version_dir)
+
+    @staticmethod
+    def _writer(path: Path, schema: "pa.Schema") -> Any:
+        """
+        Opens the Parquet or Arrow IPC writer of a snapshot file
+
+        Parameters
+        ----------
+        path : Path
+            The snapshot file
+        schema : pa.Schema
+            The schema of the matches
+
+        Returns
+        -------
+        Any
+            The writer, as a context manager
+        """
+
+        if SNAPSHOT_FORMAT == "parquet":
+            return pyarrow.parquet.ParquetWriter(path, schema)
+
+        return pa.ipc.new_file(path, schema)
+
+    @staticmethod
+    def _write_table(writer: Any, table: "pa.Table") -> None:
+        """
+        Writes the matches of a season to a snapshot file,
+        in row groups or record batches of `ROW_GROUP_SIZE`
+
+        Parameters
+        ----------
+        writer : Any
+            The Parquet or Arrow IPC writer
+        table : pa.Table
+            The matches of the season
+        """
+
+        if SNAPSHOT_FORMAT == "parquet":
+            writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+        else:
+            writer.write_table(table, max_chunksize=ROW_GROUP_SIZE)
+
+    @staticmethod
+    def _file_format(snapshot_format: str) -> "ds.FileFormat":
+        """
+        Returns the dataset format of the snapshot files
+
+        Parameters
+        ----------
+        snapshot_format : str
+            `parquet` or `feather`
+
+        Returns
+        -------
+        ds.FileFormat
+            The file format, which reads the names as dictionaries
+        """
+
+        if snapshot_format == "parquet":
+            return ds.ParquetFileFormat(
+                read_options=ds.ParquetReadOptions(dictionary_columns=NAME_COLUMNS)
+            )
+
+        return ds.IpcFileFormat()
@@ -0,0 +1,236 @@
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from django.db import connection, transaction
+
+from matches.models import Match, Standing
+
+STANDING_TABLE = Standing._meta.db_table
+MATCH_TABLE = Match._meta.db_table
+LEAGUE_SEASON_CHUNK_SIZE = 500
+
+# The columns of a standing row, named after the keys of the response
+STANDING_VALUES = {
+    "team_id": "team_id",
+    "team": "team__name",
+    "played": "played",
+    "wins": "wins",
+    "draws": "draws",
+    "losses": "losses",
+    "goals_for": "goals_for",
+    "goals_against": "goals_against",
+    "goal_difference": "goal_difference",
+    "points": "points",
+}
+STANDING_ORDER = ["-points", "-goal_difference", "-goals_for", "team__name"]
+
+
+def rebuild_standings(seasons: Optional[Iterable[int]] = None) -> int:
+    """
+    Rebuilds the standings of all the league seasons, or of some
+    seasons, from the matches with a single set-based statement
+
+    Parameters
+    ----------
+    seasons : Optional[Iterable[int]]
+        The seasons to rebuild, all of them if None
+
+    Returns
+    -------
+    int
+        The number of rebuilt standings
+    """
+
+    if seasons is None:
+        return _refresh_standings("", [])
+
+    seasons = sorted(set(seasons))
+
+    if not seasons:
+        return 0
+
+    return _refresh_standings(
+        f"season IN ({', '.join(['%s'] * len(seasons))})", seasons
+    )
+
+
+def update_standings(league_seasons: Iterable[tuple[int, int]]) -> int:
+    """
+    Updates the standings of the league seasons of changed matches,
+    recomputing only their rows instead of the whole table
+
+    Parameters
+    ----------
+    league_seasons : Iterable[tuple[int, int]]
+        The league ids and seasons of the changed matches
+
+    Returns
+    -------
+    int
+        The number of updated standings
+    """
+
+    league_seasons = sorted(set(league_seasons))
+    updated = 0
+
+    # In chunks, as SQLite limits the depth of the conditions
+    with transaction.atomic():
+        for start in range(0, len(league_seasons), LEAGUE_SEASON_CHUNK_SIZE):
+            chunk = league_seasons[start : start + LEAGUE_SEASON_CHUNK_SIZE]
+            updated += _refresh_standings(
+                " OR ".join(["(league_id = %s AND season = %s)"] * len(chunk)),
+                [value for league_season in chunk for value in league_season],
+            )
+
+    return updated
+
+
+def _refresh_standings(condition: str, params: list[int]) -> int:
+    """
+    Replaces the standings of the league seasons that match a condition
+    with the ones aggregated from their matches, every match counting
+    once for its home team and once for its away team. The teams of
+    matches that are not played yet have a standing without points
+
+    Parameters
+    ----------
+    condition : str
+        The SQL condition on the league ids and seasons, all of them if empty
+    params : list[int]
+        The parameters of the condition
+
+    Returns
+    -------
+    int
+        The number of inserted standings
+    """
+
+    quote = connection.ops.quote_name
+    where = f"WHERE {condition}" if condition else ""
+    sides = " UNION ALL ".join(
+        f"SELECT league_id, season, {team}_id AS team_id, {scored} AS scored, "
+        f"{conceded} AS conceded FROM {quote(MATCH_TABLE)} {where}"
+        for team, scored, conceded in [
+            ("team1", "score1", "score2"),
+            ("team2", "score2", "score1"),
+        ]
+    )
+    played = "scored IS NOT NULL AND conceded IS NOT NULL"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {quote(STANDING_TABLE)} {where}", params)
+        cursor.execute(
+            f"INSERT INTO {quote(STANDING_TABLE)} (league_id, season, team_id, "
+            "played, wins, draws, losses, goals_for, goals_against, "
+            "goal_difference, points) "
+            "SELECT league_id, season, team_id, "
+            f"SUM(CASE WHEN {played} THEN 1 ELSE 0 END), "
+            "SUM(CASE WHEN scored > conceded THEN 1 ELSE 0 END), "
+            "SUM(CASE WHEN scored = conceded THEN 1 ELSE 0 END), "
+            "SUM(CASE WHEN scored < conceded THEN 1 ELSE 0 END), "
+            f"SUM(CASE WHEN {played} THEN scored ELSE 0 END), "
+            f"SUM(CASE WHEN {played} THEN conceded ELSE 0 END), "
+            f"SUM(CASE WHEN {played} THEN scored - conceded ELSE 0 END), "
+            "SUM(CASE WHEN scored > conceded THEN 3 "
+            "WHEN scored = conceded THEN 1 ELSE 0 END) "
+            f"FROM ({sides}) sides GROUP BY league_id, season, team_id",
+            params * 2,
+        )
+
+        return cursor.rowcount
+
+
+class StandingHandler:
+    """
+    The standing handler, which reads the league table of a league season
+    from the materialized standings in a single indexed query
+
+    Attributes
+    ----------
+    league_id : int
+        The id of the league
+    season : Optional[str]
+        The season, the latest one of the league if None
+    errors : list[str]
+        The list of errors
+    standings : list[dict[str, Any]]
+        The standings, from the first team
+
+    Properties
+    ----------
+    invalid : bool
+        True if there are errors, False otherwise
+
+    Methods
+    -------
+    validate_data()
+        Validates the season
+    fetch()
+        Fetches the standings
+    """
+
+    def __init__(self, league_id: int, season: Optional[str] = None) -> None:
+        """
+        Initializes the standing handler
+
+        Parameters
+        ----------
+        league_id : int
+            The id of the league
+        season : Optional[str]
+            The season, the latest one of the league if None
+        """
+
+        self.league_id = league_id
+        self.season = season
+        self.errors: list[str] = []
+        self.standings: list[dict[str, Any]] = []
+        self._season: Optional[int] = None
+
+    @property
+    def invalid(self) -> bool:
+        """
+        True if there are errors, False otherwise
+        """
+
+        return len(self.errors) > 0
+
+    def validate_data(self) -> None:
+        """
+        Validates the season
+        """
+
+        if not self.season:
+            self._season = (
+                Standing.objects.filter(league_id=self.league_id)
+                .order_by("-season")
+                .values_list("season", flat=True)
+                .first()
+            )
+        elif self.season.isdigit():
+            self._season = int(self.season)
+        else:
+            self.errors.append("Season must be a year.")
+
+            return
+
+        if self._season is None:
+            self.errors.append("There are no standings for this league.")
+
+    def fetch(self) -> None:
+        """
+        Fetches the standings of the league season, in table order
+        """
+
+        self.season = self._season
+        self.standings = [
+            {key: row[value] for key, value in STANDING_VALUES.items()}
+            for row in Standing.objects.filter(
+                league_id=self.league_id, season=self._season
+            )
+            .order_by(*STANDING_ORDER)
+            .values(*STANDING_VALUES.values())
+        ]
+
+        for position, standing in enumerate(self.standings, start=1):
+            standing["position"] = position
@@ -0,0 +1,258 @@
+import hashlib
+import re
+from typing import Optional
+
+from django.db import connection, transaction
+
+from matches.models import Match
+
+LIVE_TABLE = Match._meta.db_table
+STAGING_TABLE = f"{LIVE_TABLE}_staging"
+PREVIOUS_TABLE = f"{LIVE_TABLE}_previous"
+
+INDEX_DEFINITION = re.compile(r"^(CREATE (?:UNIQUE )?INDEX )\S+( ON )\S+( .*)$", re.S)
+
+
+def create_staging_table() -> None:
+    """
+    Creates an empty staging table with the columns of the live table
+    and without its indexes, so that it can be bulk loaded cheaply
+    """
+
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {quote(STAGING_TABLE)}")
+
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"CREATE TABLE {quote(STAGING_TABLE)} (LIKE {quote(LIVE_TABLE)} "
+                "INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING GENERATED)"
+            )
+
+            return
+
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [LIVE_TABLE],
+        )
+        definition = cursor.fetchone()[0]
+
+        cursor.execute(
+            re.sub(
+                rf'^CREATE TABLE\s+(["`]?){LIVE_TABLE}\1',
+                f"CREATE TABLE {quote(STAGING_TABLE)}",
+                definition,
+                count=1,
+            )
+        )
+
+
+def build_staging_indexes() -> None:
+    """
+    Builds the constraints and indexes of the live table on the loaded
+    staging table. PostgreSQL index names are schema-wide, so they are
+    built under staging aliases and renamed when the tables are swapped.
+    SQLite cannot rename indexes, so there they are built by the swap
+    """
+
+    if connection.vendor != "postgresql":
+        return
+
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass ORDER BY contype = 'f'",
+            [LIVE_TABLE],
+        )
+        constraints = cursor.fetchall()
+
+        cursor.execute(
+            "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) "
+            "FROM pg_index WHERE indrelid = %s::regclass AND indexrelid NOT IN "
+            "(SELECT conindid FROM pg_constraint WHERE conrelid = %s::regclass)",
+            [LIVE_TABLE, LIVE_TABLE],
+        )
+        indexes = cursor.fetchall()
+
+        for name, kind, definition in constraints:
+            if kind in ("p", "u", "x"):
+                name = _alias(name, "staging")
+
+            cursor.execute(
+                f"ALTER TABLE {quote(STAGING_TABLE)} "
+                f"ADD CONSTRAINT {quote(name)} {definition}"
+            )
+
+        for name, definition in indexes:
+            cursor.execute(
+                INDEX_DEFINITION.sub(
+                    rf"\g<1>{quote(_alias(name, 'staging'))}\g<2>"
+                    rf"{quote(STAGING_TABLE)}\g<3>",
+                    definition,
+                )
+            )
+
+        cursor.execute(f"ANALYZE {quote(STAGING_TABLE)}")
+
+
+def swap_staging_table() -> None:
+    """
+    Atomically replaces the live table with the staging table,
+    keeping the replaced table as the previous table for a rollback
+    """
+
+    quote = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {quote(PREVIOUS_TABLE)}")
+
+        indexes = _indexes(cursor, LIVE_TABLE)
+
+        cursor.execute(
+            f"ALTER TABLE {quote(LIVE_TABLE)} RENAME TO {quote(PREVIOUS_TABLE)}"
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote(STAGING_TABLE)} RENAME TO {quote(LIVE_TABLE)}"
+        )
+
+        if connection.vendor == "postgresql":
+            for name, constraint in indexes:
+                _rename_index(
+                    cursor, PREVIOUS_TABLE, name, constraint, _alias(name, "previous")
+                )
+                _rename_index(
+                    cursor, LIVE_TABLE, _alias(name, "staging"), constraint, name
+                )
+        else:
+            for name, definition in indexes:
+                cursor.execute(f"DROP INDEX {quote(name)}")
+                cursor.execute(definition)
+
+            cursor.execute(f"ANALYZE {quote(LIVE_TABLE)}")
+
+
+def restore_previous_table() -> None:
+    """
+    Atomically swaps the previous table back in as the live table
+
+    Raises
+    ------
+    LookupError
+        If there is no previous table
+    """
+
+    quote = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if PREVIOUS_TABLE not in connection.introspection.table_names(cursor):
+            raise LookupError(f"There is no `{PREVIOUS_TABLE}` table to restore")
+
+        cursor.execute(f"DROP TABLE IF EXISTS {quote(STAGING_TABLE)}")
+        cursor.execute(
+            f"ALTER TABLE {quote(PREVIOUS_TABLE)} RENAME TO {quote(STAGING_TABLE)}"
+        )
+
+        if connection.vendor == "postgresql":
+            for name, constraint in _indexes(cursor, LIVE_TABLE):
+                _rename_index(
+                    cursor,
+                    STAGING_TABLE,
+                    _alias(name, "previous"),
+                    constraint,
+                    _alias(name, "staging"),
+                )
+
+        swap_staging_table()
+
+
+def _indexes(cursor, table: str) -> list[tuple]:
+    """
+    Returns the indexes of a table. On PostgreSQL these are the index
+    names with the constraint each one backs, if any, and on SQLite
+    the index names with the statement that creates each one
+
+    Parameters
+    ----------
+    cursor : CursorWrapper
+        The database cursor
+    table : str
+        The table
+
+    Returns
+    -------
+    list[tuple]
+        The indexes of the table
+    """
+
+    if connection.vendor == "postgresql":
+        cursor.execute(
+            "SELECT index.relname, con.conname FROM pg_index "
+            "JOIN pg_class index ON index.oid = pg_index.indexrelid "
+            "LEFT JOIN pg_constraint con ON con.conindid = pg_index.indexrelid "
+            "AND con.conrelid = pg_index.indrelid "
+            "WHERE pg_index.indrelid = %s::regclass",
+            [table],
+        )
+    else:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL",
+            [table],
+        )
+
+    return cursor.fetchall()
+
+
+def _rename_index(
+    cursor, table: str, name: str, constraint: Optional[str], new_name: str
+) -> None:
+    """
+    Renames a PostgreSQL index, through its constraint if it backs one
+
+    Parameters
+    ----------
+    cursor : CursorWrapper
+        The database cursor
+    table : str
+        The table of the index
+    name : str
+        The current name of the index
+    constraint : Optional[str]
+        The constraint backed by the index, if any
+    new_name : str
+        The new name of the index
+    """
+
+    quote = connection.ops.quote_name
+
+    if constraint:
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} "
+            f"RENAME CONSTRAINT {quote(name)} TO {quote(new_name)}"
+        )
+    else:
+        cursor.execute(f"ALTER INDEX {quote(name)} RENAME TO {quote(new_name)}")
+
+
+def _alias(name: str, tag: str) -> str:
+    """
+    Returns a deterministic alias of an index name that
+    fits the PostgreSQL identifier length limit
+
+    Parameters
+    ----------
+    name : str
+        The index name
+    tag : str
+        The tag of the table that holds the aliased index
+
+    Returns
+    -------
+    str
+        The alias
+    """
+
+    return f"{tag}_{hashlib.md5(name.encode()).hexdigest()[:16]}"
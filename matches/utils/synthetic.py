@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from django.db import connection
+
+from matches.constants import MatchFields
+from matches.models import Match
+from matches.utils.loaders import cast_match_types, copy_matches, insert_matches
+from matches.utils.names import MatchNameResolver
+from matches.utils.partitions import create_season_partitions, is_partitioned
+
+LEAGUES = 20
+TEAMS_PER_LEAGUE = 20
+
+
+def synthetic_match_df(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a projected match DataFrame with the shape of the
+    SPI data, with a unique natural key for every row and the
+    latest tenth of the matches not played yet
+
+    Parameters
+    ----------
+    rows : int
+        The number of matches
+    seed : int
+        The seed of the random generator
+
+    Returns
+    -------
+    pd.DataFrame
+        The synthetic match DataFrame
+    """
+
+    rng = np.random.default_rng(seed)
+    index = np.arange(rows)
+
+    league = index % LEAGUES
+    date = pd.Timestamp("2000-08-01") + pd.to_timedelta(index // LEAGUES, unit="D")
+    home = rng.integers(0, TEAMS_PER_LEAGUE, rows)
+    away = (home + rng.integers(1, TEAMS_PER_LEAGUE, rows)) % TEAMS_PER_LEAGUE
+
+    probabilities = rng.dirichlet([4.0, 3.0, 2.5], rows)
+    # The upcoming matches, which have no scores yet, are the latest ones
+    played = index < rows * 0.9
+
+    return pd.DataFrame(
+        {
+            MatchFields.SEASON: date.year,
+            MatchFields.DATE: date.strftime("%Y-%m-%d"),
+            MatchFields.LEAGUE: [f"League {number}" for number in league],
+            MatchFields.TEAM1: [f"Team {lg}-{team}" for lg, team in zip(league, home)],
+            MatchFields.TEAM2: [f"Team {lg}-{team}" for lg, team in zip(league, away)],
+            MatchFields.SPI1: rng.uniform(20, 95, rows).round(2),
+            MatchFields.SPI2: rng.uniform(20, 95, rows).round(2),
+            MatchFields.PROB1: probabilities[:, 0].round(4),
+            MatchFields.PROB2: probabilities[:, 1].round(4),
+            MatchFields.PROBTIE: probabilities[:, 2].round(4),
+            MatchFields.PROJ_SCORE1: rng.uniform(0.3, 3.0, rows).round(2),
+            MatchFields.PROJ_SCORE2: rng.uniform(0.3, 3.0, rows).round(2),
+            MatchFields.SCORE1: np.where(played, rng.poisson(1.5, rows), np.nan),
+            MatchFields.SCORE2: np.where(played, rng.poisson(1.2, rows), np.nan),
+        }
+    )
+
+
+def load_synthetic_matches(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Replaces the stored matches with synthetic matches, truncating the
+    table on PostgreSQL so that the dead rows of earlier loads do not
+    count, and loading them with the fastest raw loader of the backend
+
+    Parameters
+    ----------
+    rows : int
+        The number of matches
+    seed : int
+        The seed of the random generator
+
+    Returns
+    -------
+    pd.DataFrame
+        The loaded match DataFrame, with league and team ids
+    """
+
+    match_df = MatchNameResolver().resolve(
+        cast_match_types(synthetic_match_df(rows, seed))
+    )
+
+    if connection.vendor == "postgresql":
+        if is_partitioned():
+            create_season_partitions(match_df[MatchFields.SEASON].unique())
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"TRUNCATE {connection.ops.quote_name(Match._meta.db_table)}"
+            )
+
+        copy_matches(match_df)
+    else:
+        Match.objects.all().delete()
+        insert_matches(match_df)
+
+    return match_df
@@ -0,0 +1,412 @@
+from collections.abc import Iterable
+from io import BytesIO
+from typing import Any, Optional
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from matches.constants import MatchFields
+from matches.models import Match, Team, TeamTrend
+
+FORM_MATCHES = 5
+TREND_FIELDS = [
+    MatchFields.DATE,
+    MatchFields.TEAM1,
+    MatchFields.TEAM2,
+    MatchFields.SPI1,
+    MatchFields.SPI2,
+    MatchFields.PROB1,
+    MatchFields.PROBTIE,
+    MatchFields.PROB2,
+    MatchFields.SCORE1,
+    MatchFields.SCORE2,
+]
+
+# The series of the home and away rows, by the fields of the home and away teams
+SIDE_SERIES = {
+    "date": (MatchFields.DATE, MatchFields.DATE),
+    "opponent_id": (MatchFields.TEAM2, MatchFields.TEAM1),
+    "spi": (MatchFields.SPI1, MatchFields.SPI2),
+    "opponent_spi": (MatchFields.SPI2, MatchFields.SPI1),
+    "goals_for": (MatchFields.SCORE1, MatchFields.SCORE2),
+    "goals_against": (MatchFields.SCORE2, MatchFields.SCORE1),
+    "win": (MatchFields.PROB1, MatchFields.PROB2),
+    "tie": (MatchFields.PROBTIE, MatchFields.PROBTIE),
+}
+
+# The sums over the last played matches, by the series they are rolled from
+FORM_SERIES = {
+    "form_points": "points",
+    "form_goals_for": "goals_for",
+    "form_goals_against": "goals_against",
+    "form_gap": "gap",
+}
+
+
+def compute_team_trends(
+    arrays: dict[str, np.ndarray], window: int = FORM_MATCHES
+) -> dict[int, dict[str, np.ndarray]]:
+    """
+    Computes the dated series of every team of the matches. Every match is
+    split into a home and an away row, the rows are sorted by team then
+    date, and the form of every row is the sum of the points, goals and
+    gap between the points and the expected points of the `window` last
+    played matches of the team, taken from differences of cumulative sums.
+    The rows of unplayed matches keep the form of the last played one
+
+    Parameters
+    ----------
+    arrays : dict[str, np.ndarray]
+        The arrays of the trend fields of the matches, ordered by date and id
+    window : int
+        The number of played matches of the form
+
+    Returns
+    -------
+    dict[int, dict[str, np.ndarray]]
+        The series of every team, by team id
+    """
+
+    matches = len(arrays[MatchFields.DATE])
+    team = np.concatenate([arrays[MatchFields.TEAM1], arrays[MatchFields.TEAM2]])
+    # The match index breaks the ties of a date, in the order of the matches
+    order = np.lexsort(
+        (np.tile(np.arange(matches), 2), np.tile(arrays[MatchFields.DATE], 2), team)
+    )
+    team = team[order]
+    series = {
+        name: np.concatenate([arrays[home], arrays[away]])[order]
+        for name, (home, away) in SIDE_SERIES.items()
+    }
+    series["home"] = order < matches
+
+    goals_for = series["goals_for"]
+    goals_against = series["goals_against"]
+    played = ~(np.isnan(goals_for) | np.isnan(goals_against))
+    series["points"] = np.where(
+        played, 3.0 * (goals_for > goals_against) + (goals_for == goals_against), np.nan
+    )
+    series["expected_points"] = 3 * series.pop("win") + series.pop("tie")
+    series["gap"] = series["points"] - series["expected_points"]
+
+    # The windows of the played rows, which do not reach the previous team
+    played_rows = np.flatnonzero(played)
+    played_teams = team[played_rows]
+    positions = np.arange(len(played_rows))
+    starts = np.maximum(
+        positions - window + 1, np.searchsorted(played_teams, played_teams)
+    )
+
+    # The last played row of the team up to every row, -1 if there is none
+    played_before = np.cumsum(played)
+    team_starts = np.searchsorted(team, team)
+    last_played = np.where(
+        played_before - (played_before - played)[team_starts] > 0,
+        played_before - 1,
+        -1,
+    )
+
+    for form, rolled in FORM_SERIES.items():
+        sums = np.concatenate([[0.0], np.cumsum(series[rolled][played_rows])])
+        forms = sums[positions + 1] - sums[starts]
+        series[form] = np.where(
+            last_played >= 0, forms[np.maximum(last_played, 0)], np.nan
+        )
+
+    teams, boundaries = np.unique(team, return_index=True)
+
+    return {
+        team_id: {name: values[start:end] for name, values in series.items()}
+        for team_id, start, end in zip(
+            teams.tolist(),
+            boundaries,
+            np.append(boundaries[1:], len(team)),
+        )
+    }
+
+
+def league_season_teams(league_seasons: Iterable[tuple[int, int]]) -> set[int]:
+    """
+    Returns the teams of the matches of league seasons. The matches of
+    their leagues and seasons are read with two `IN` conditions instead
+    of a condition per league season, and narrowed down to the league
+    seasons with their keys
+
+    Parameters
+    ----------
+    league_seasons : Iterable[tuple[int, int]]
+        The league ids and seasons
+
+    Returns
+    -------
+    set[int]
+        The team ids
+    """
+
+    league_seasons = np.array(sorted(set(league_seasons)), dtype=np.int64)
+
+    if not len(league_seasons):
+        return set()
+
+    leagues, seasons = league_seasons.T
+    matches = np.array(
+        Match.objects.filter(
+            league_id__in=np.unique(leagues).tolist(),
+            season__in=np.unique(seasons).tolist(),
+        ).values_list(
+            "league_id", MatchFields.SEASON, MatchFields.TEAM1, MatchFields.TEAM2
+        ),
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    rows = np.isin((matches[:, 0] << 16) | matches[:, 1], (leagues << 16) | seasons)
+
+    return set(np.unique(matches[rows, 2:]).tolist())
+
+
+def refresh_team_trends(
+    teams: Optional[Iterable[int]] = None,
+    arrays: Optional[dict[str, np.ndarray]] = None,
+    window: int = FORM_MATCHES,
+) -> int:
+    """
+    Replaces the stored trends of all the teams, or of some teams,
+    with the ones of their matches
+
+    Parameters
+    ----------
+    teams : Optional[Iterable[int]]
+        The ids of the teams to refresh, all of them if None
+    arrays : Optional[dict[str, np.ndarray]]
+        The arrays of the trend fields of the matches, ordered by date
+        and id, read with `to_arrays` if None
+    window : int
+        The number of played matches of the form
+
+    Returns
+    -------
+    int
+        The number of refreshed trends
+    """
+
+    if teams is not None:
+        teams = np.array(sorted(set(teams)), dtype=np.int64)
+
+        if not len(teams):
+            return 0
+
+    if arrays is None:
+        matches = Match.objects.order_by(MatchFields.DATE, "id")
+
+        if teams is not None:
+            matches = matches.filter(
+                Q(team1_id__in=teams.tolist()) | Q(team2_id__in=teams.tolist())
+            )
+
+        arrays = matches.to_arrays(TREND_FIELDS)
+    elif teams is not None:
+        rows = np.isin(arrays[MatchFields.TEAM1], teams) | np.isin(
+            arrays[MatchFields.TEAM2], teams
+        )
+        arrays = {field: values[rows] for field, values in arrays.items()}
+
+    team_trends = compute_team_trends(arrays, window)
+
+    if teams is not None:
+        # The arrays only hold the matches of the opponents against the teams
+        team_trends = {
+            team_id: team_trends[team_id]
+            for team_id in teams.tolist()
+            if team_id in team_trends
+        }
+
+    trends = [
+        TeamTrend(
+            team_id=team_id,
+            window=window,
+            matches=len(series["date"]),
+            series=pack_series(series),
+        )
+        for team_id, series in team_trends.items()
+    ]
+
+    with transaction.atomic():
+        if teams is None:
+            TeamTrend.objects.all().delete()
+        else:
+            TeamTrend.objects.filter(team_id__in=teams.tolist()).delete()
+
+        TeamTrend.objects.bulk_create(trends, batch_size=100)
+
+    return len(trends)
+
+
+def pack_series(series: dict[str, np.ndarray]) -> bytes:
+    """
+    Packs the series of a team into an uncompressed NumPy archive, with
+    the values as 32-bit floats
+
+    Parameters
+    ----------
+    series : dict[str, np.ndarray]
+        The series of the team
+
+    Returns
+    -------
+    bytes
+        The archive
+    """
+
+    buffer = BytesIO()
+    np.savez(
+        buffer,
+        **{
+            name: values.astype(np.float32) if values.dtype.kind == "f" else values
+            for name, values in series.items()
+        },
+    )
+
+    return buffer.getvalue()
+
+
+def unpack_series(archive: bytes) -> dict[str, np.ndarray]:
+    """
+    Unpacks the series of a team from its NumPy archive
+
+    Parameters
+    ----------
+    archive : bytes
+        The archive
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        The series of the team
+    """
+
+    with np.load(BytesIO(archive)) as arrays:
+        return {name: arrays[name] for name in arrays.files}
+
+
+def chart_series(series: dict[str, np.ndarray]) -> dict[str, list[Any]]:
+    """
+    Converts the series of a team into JSON lists, with ISO dates,
+    opponent names, rounded values and missing values as None
+
+    Parameters
+    ----------
+    series : dict[str, np.ndarray]
+        The series of the team
+
+    Returns
+    -------
+    dict[str, list[Any]]
+        The lists of the series, by series name
+    """
+
+    opponent_ids = series["opponent_id"].tolist()
+    names = dict(
+        Team.objects.filter(id__in=set(opponent_ids)).values_list("id", "name")
+    )
+    chart: dict[str, list[Any]] = {
+        "date": np.datetime_as_string(series["date"], unit="D").tolist(),
+        "home": series["home"].tolist(),
+        "opponent": [names.get(team_id) for team_id in opponent_ids],
+    }
+
+    for name, values in series.items():
+        if values.dtype.kind == "f":
+            values = np.round(values.astype(np.float64), 4)
+            chart[name] = np.where(np.isnan(values), None, values).tolist()
+
+    return chart
+
+
+class TeamTrendHandler:
+    """
+    The team trend handler, which reads the precomputed series of a team
+    in a single lookup and converts it into chart-ready lists
+
+    Attributes
+    ----------
+    team_id : int
+        The id of the team
+    last : Optional[str]
+        The number of latest matches of the series, all of them if None
+    errors : list[str]
+        The list of errors
+    window : Optional[int]
+        The number of played matches of the form
+    series : dict[str, list[Any]]
+        The series of the team, by series name
+
+    Properties
+    ----------
+    invalid : bool
+        True if there are errors, False otherwise
+
+    Methods
+    -------
+    validate_data()
+        Validates the number of latest matches
+    fetch()
+        Fetches the series
+    """
+
+    def __init__(self, team_id: int, last: Optional[str] = None) -> None:
+        """
+        Initializes the team trend handler
+
+        Parameters
+        ----------
+        team_id : int
+            The id of the team
+        last : Optional[str]
+            The number of latest matches of the series, all of them if None
+        """
+
+        self.team_id = team_id
+        self.last = last
+        self.errors: list[str] = []
+        self.window: Optional[int] = None
+        self.series: dict[str, list[Any]] = {}
+
+    @property
+    def invalid(self) -> bool:
+        """
+        True if there are errors, False otherwise
+        """
+
+        return len(self.errors) > 0
+
+    def validate_data(self) -> None:
+        """
+        Validates the number of latest matches
+        """
+
+        if self.last is not None and (not self.last.isdigit() or int(self.last) < 1):
+            self.errors.append("Last must be a positive integer.")
+
+    def fetch(self) -> None:
+        """
+        Fetches the series of the team, or its latest matches
+        """
+
+        trend = (
+            TeamTrend.objects.filter(team_id=self.team_id)
+            .values("window", "series")
+            .first()
+        )
+
+        if trend is None:
+            return
+
+        series = unpack_series(bytes(trend["series"]))
+
+        if self.last is not None:
+            series = {
+                name: values[-int(self.last) :] for name, values in series.items()
+            }
+
+        self.window = trend["window"]
+        self.series = chart_series(series)
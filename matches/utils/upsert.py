@@ -0,0 +1,184 @@
+import pandas as pd
+from django.db import transaction
+
+from matches.constants import MatchFields
+from matches.models import Match
+from matches.utils.loaders import cast_match_types, match_instances
+from matches.utils.partitions import is_partitioned
+
+
+class MatchUpsertHandler:
+    """
+    The match upsert handler
+
+    Attributes
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+    new_df : pd.DataFrame
+        The matches that are not stored yet
+    changed_df : pd.DataFrame
+        The stored matches whose values changed, with their ids
+    unchanged : int
+        The number of stored matches whose values did not change
+    league_seasons : set[tuple[int, int]]
+        The league ids and seasons of the new and changed matches, before
+        and after a change of season
+    pairs : set[tuple[int, int]]
+        The lower and higher team ids of the new and changed matches
+
+    Properties
+    ----------
+    inserted : int
+        The number of matches to insert
+    updated : int
+        The number of matches to update
+
+    Methods
+    -------
+    compute_changes()
+        Splits the match data into new, changed and unchanged matches
+    save()
+        Inserts the new matches and updates the changed ones
+    """
+
+    def __init__(self, match_df: pd.DataFrame) -> None:
+        """
+        Initializes the match upsert handler
+
+        Parameters
+        ----------
+        match_df : pd.DataFrame
+            The projected match DataFrame
+        """
+
+        self.match_df = self._normalize(match_df)
+        self.new_df = self.match_df.iloc[0:0]
+        self.changed_df = self.match_df.iloc[0:0]
+        self.unchanged = 0
+        self.league_seasons: set[tuple[int, int]] = set()
+        self.pairs: set[tuple[int, int]] = set()
+
+    @property
+    def inserted(self) -> int:
+        """
+        The number of matches to insert
+        """
+
+        return len(self.new_df)
+
+    @property
+    def updated(self) -> int:
+        """
+        The number of matches to update
+        """
+
+        return len(self.changed_df)
+
+    @staticmethod
+    def _normalize(match_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Casts the match data to the types returned by the database
+        and keeps the last row of every duplicated natural key
+
+        Parameters
+        ----------
+        match_df : pd.DataFrame
+            The projected match DataFrame
+
+        Returns
+        -------
+        pd.DataFrame
+            The normalized match DataFrame
+        """
+
+        match_df = cast_match_types(match_df).assign(
+            **{MatchFields.DATE: pd.to_datetime(match_df[MatchFields.DATE]).dt.date}
+        )
+
+        return match_df.drop_duplicates(
+            subset=MatchFields.natural_key(), keep="last"
+        ).reset_index(drop=True)
+
+    def compute_changes(self) -> None:
+        """
+        Splits the match data into new, changed and unchanged matches
+        by comparing it with the stored values of the same natural keys
+        """
+
+        stored_df = cast_match_types(
+            pd.DataFrame.from_records(
+                Match.objects.values_list("id", *MatchFields.field_list()),
+                columns=["id", *MatchFields.field_list()],
+            )
+        )
+
+        merged_df = self.match_df.merge(
+            stored_df,
+            how="left",
+            on=MatchFields.natural_key(),
+            suffixes=("", "_stored"),
+            indicator=True,
+        )
+
+        is_new = merged_df["_merge"] == "left_only"
+        is_changed = pd.Series(False, index=merged_df.index)
+
+        for field in MatchFields.value_list():
+            incoming = merged_df[field]
+            stored = merged_df[f"{field}_stored"]
+            # Comparing a missing score with a present one gives NA, which is a change
+            differs = (incoming != stored).fillna(True)
+            is_changed |= differs & ~(incoming.isna() & stored.isna())
+
+        is_changed &= ~is_new
+
+        self.new_df = merged_df.loc[is_new, MatchFields.field_list()]
+        self.changed_df = merged_df.loc[
+            is_changed, ["id", *MatchFields.field_list()]
+        ].astype({"id": int})
+        self.unchanged = int((~is_new & ~is_changed).sum())
+
+        touched_df = merged_df.loc[is_new | is_changed]
+        self.league_seasons = set(
+            zip(
+                touched_df[MatchFields.LEAGUE].astype(int).tolist(),
+                touched_df[MatchFields.SEASON].astype(int).tolist(),
+            )
+        ) | set(
+            zip(
+                self.changed_df[MatchFields.LEAGUE].astype(int).tolist(),
+                merged_df.loc[is_changed, f"{MatchFields.SEASON}_stored"]
+                .astype(int)
+                .tolist(),
+            )
+        )
+        self.pairs = {
+            (min(team1, team2), max(team1, team2))
+            for team1, team2 in zip(
+                touched_df[MatchFields.TEAM1].astype(int).tolist(),
+                touched_df[MatchFields.TEAM2].astype(int).tolist(),
+            )
+        }
+
+    def save(self) -> None:
+        """
+        Inserts the new matches and updates the changed ones. On a table
+        partitioned by season, the natural key includes the season
+        """
+
+        unique_fields = MatchFields.natural_key()
+
+        if is_partitioned():
+            unique_fields.append(MatchFields.SEASON)
+
+        with transaction.atomic():
+            Match.objects.bulk_create(
+                match_instances(self.new_df),
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=MatchFields.value_list(),
+            )
+            Match.objects.bulk_update(
+                match_instances(self.changed_df), MatchFields.value_list()
+            )
@@ -0,0 +1,262 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from matches.constants import MatchFields
+from matches.models import Match
+
+PROBABILITY_TOLERANCE = 0.01
+SPI_RANGE = (0.0, 100.0)
+SEASON_RANGE = (1000, 9999)
+
+NAME_FIELDS = [MatchFields.LEAGUE, MatchFields.TEAM1, MatchFields.TEAM2]
+NUMERIC_FIELDS = [
+    MatchFields.SPI1,
+    MatchFields.SPI2,
+    MatchFields.PROB1,
+    MatchFields.PROB2,
+    MatchFields.PROBTIE,
+    MatchFields.PROJ_SCORE1,
+    MatchFields.PROJ_SCORE2,
+    MatchFields.SCORE1,
+    MatchFields.SCORE2,
+]
+
+
+class MatchValidator:
+    """
+    The match validator, which checks every column of the projected
+    match DataFrame in bulk and splits it into valid and rejected rows
+
+    Attributes
+    ----------
+    match_df : pd.DataFrame
+        The projected match DataFrame
+    valid_df : pd.DataFrame
+        The valid matches
+    rejected_df : pd.DataFrame
+        The rejected matches, with the reasons in a `reason` column
+    seen_keys : np.ndarray
+        The sorted hashes of the natural keys of the matches validated
+        before, like the ones of the earlier chunks of a stream
+    valid_keys : np.ndarray
+        The hashes of the natural keys of the valid matches
+
+    Properties
+    ----------
+    rejected : int
+        The number of rejected matches
+
+    Methods
+    -------
+    validate()
+        Splits the matches into valid and rejected ones
+    write_rejected(path, append)
+        Writes the rejected matches with their reasons to a CSV file
+    """
+
+    def __init__(
+        self, match_df: pd.DataFrame, seen_keys: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Initializes the match validator
+
+        Parameters
+        ----------
+        match_df : pd.DataFrame
+            The projected match DataFrame
+        seen_keys : Optional[np.ndarray]
+            The sorted hashes of the natural keys of the matches validated
+            before, none if None
+        """
+
+        self.match_df = match_df
+        self.valid_df = match_df
+        self.rejected_df = match_df.iloc[0:0].assign(reason="")
+        self.seen_keys = (
+            np.empty(0, dtype=np.uint64) if seen_keys is None else seen_keys
+        )
+        self.valid_keys = np.empty(0, dtype=np.uint64)
+        self._keys = np.empty(0, dtype=np.uint64)
+
+    @property
+    def rejected(self) -> int:
+        """
+        The number of rejected matches
+        """
+
+        return len(self.rejected_df)
+
+    def validate(self) -> None:
+        """
+        Splits the matches into valid and rejected ones, where every
+        rule is evaluated for all the rows at once and the reasons are
+        only joined for the rejected rows
+        """
+
+        failures = self._failures()
+        failed = np.vstack([mask.to_numpy(dtype=bool) for _, mask in failures])
+        rejected = failed.any(axis=0)
+
+        reasons = [
+            "; ".join(
+                reason for (reason, _), fails in zip(failures, row_failures) if fails
+            )
+            for row_failures in failed[:, rejected].T
+        ]
+
+        self.valid_df = self.match_df[~rejected]
+        self.rejected_df = self.match_df[rejected].assign(reason=reasons)
+        self.valid_keys = self._keys[~rejected]
+
+    def write_rejected(self, path: Path, append: bool = False) -> None:
+        """
+        Writes the rejected matches with their reasons to a CSV file
+
+        Parameters
+        ----------
+        path : Path
+            The CSV file
+        append : bool
+            True to append to the file, False to overwrite it
+        """
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.rejected_df.to_csv(
+            path,
+            mode="a" if append else "w",
+            header=not append or not path.exists(),
+            index=False,
+        )
+
+    def _failures(self) -> list[tuple[str, pd.Series]]:
+        """
+        Returns the rules of the match fields with the rows that fail them
+
+        Returns
+        -------
+        list[tuple[str, pd.Series]]
+            The reason of every rule with the mask of the failing rows
+        """
+
+        match_df = self.match_df
+        failures = []
+
+        for field in MatchFields.field_list():
+            if not Match._meta.get_field(field).null:
+                failures.append((f"missing {field}", match_df[field].isna()))
+
+        present = match_df.notna()
+
+        dates = pd.to_datetime(
+            match_df[MatchFields.DATE], format="%Y-%m-%d", errors="coerce"
+        )
+        failures.append(("invalid date", dates.isna() & present[MatchFields.DATE]))
+
+        seasons = pd.to_numeric(match_df[MatchFields.SEASON], errors="coerce")
+        failures.append(
+            (
+                "invalid season",
+                (seasons.isna() | (seasons % 1 != 0) | ~seasons.between(*SEASON_RANGE))
+                & present[MatchFields.SEASON],
+            )
+        )
+
+        for field in NAME_FIELDS:
+            related_model = Match._meta.get_field(field).related_model
+            max_length = related_model._meta.get_field("name").max_length
+            codes, names = pd.factorize(match_df[field])
+            # Missing names get the code -1, which indexes the appended 0
+            lengths = np.append([len(str(name)) for name in names], 0)
+
+            failures.append(
+                (
+                    f"{field} longer than {max_length} characters",
+                    pd.Series(lengths[codes] > max_length, index=match_df.index),
+                )
+            )
+
+        failures.append(
+            (
+                "same team on both sides",
+                match_df[MatchFields.TEAM1].eq(match_df[MatchFields.TEAM2])
+                & present[MatchFields.TEAM1],
+            )
+        )
+
+        numbers = {
+            field: pd.to_numeric(match_df[field], errors="coerce")
+            for field in NUMERIC_FIELDS
+        }
+
+        for field, values in numbers.items():
+            failures.append((f"non-numeric {field}", values.isna() & present[field]))
+
+        for field in [MatchFields.SPI1, MatchFields.SPI2]:
+            failures.append(
+                (
+                    f"{field} out of range",
+                    ~numbers[field].between(*SPI_RANGE) & present[field],
+                )
+            )
+
+        probabilities = [MatchFields.PROB1, MatchFields.PROB2, MatchFields.PROBTIE]
+
+        for field in probabilities:
+            failures.append(
+                (
+                    f"{field} out of range",
+                    ~numbers[field].between(0, 1) & present[field],
+                )
+            )
+
+        total = sum(numbers[field] for field in probabilities)
+        failures.append(
+            (
+                "probabilities do not sum to 1",
+                (total - 1).abs().gt(PROBABILITY_TOLERANCE),
+            )
+        )
+
+        for field in [
+            MatchFields.PROJ_SCORE1,
+            MatchFields.PROJ_SCORE2,
+            MatchFields.SCORE1,
+            MatchFields.SCORE2,
+        ]:
+            failures.append((f"negative {field}", numbers[field].lt(0)))
+
+        for field in [MatchFields.SCORE1, MatchFields.SCORE2]:
+            failures.append(
+                (
+                    f"non-integer {field}",
+                    (numbers[field] % 1 != 0) & numbers[field].notna(),
+                )
+            )
+
+        # The later copies of a natural key and the copies of the matches
+        # validated before, so that the first copy is kept whether the
+        # matches are validated at once or in chunks
+        key_df = match_df[MatchFields.natural_key()].assign(**{MatchFields.DATE: dates})
+        self._keys = pd.util.hash_pandas_object(key_df, index=False).to_numpy()
+        seen = np.zeros(len(key_df), dtype=bool)
+
+        if len(self.seen_keys):
+            positions = np.minimum(
+                np.searchsorted(self.seen_keys, self._keys), len(self.seen_keys) - 1
+            )
+            seen = self.seen_keys[positions] == self._keys
+
+        failures.append(
+            (
+                "duplicated match",
+                (key_df.duplicated(keep="first") | seen)
+                & present[MatchFields.natural_key()].all(axis=1),
+            )
+        )
+
+        return failures
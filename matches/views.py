@@ -0,0 +1,402 @@
+import numpy as np
+from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import require_http_methods
+
+from matches.models import League, Match, Team
+from matches.utils.arrays import match_arrays
+from matches.utils.calibration import CalibrationHandler
+from matches.utils.export import MatchExportHandler
+from matches.utils.head_to_head import HeadToHeadHandler
+from matches.utils.history import TeamMatchHistoryHandler
+from matches.utils.scorelines import MAX_GOALS, scoreline_cache, scoreline_markets
+from matches.utils.simulation import SeasonProjectionHandler
+from matches.utils.standings import StandingHandler
+from matches.utils.trends import TeamTrendHandler
+
+
+@login_required(login_url="sign-in")
+@require_http_methods(["GET"])
+def team_matches(request: HttpRequest, team_id: int) -> HttpResponse:
+    """
+    The team match history endpoint, which returns a page of the home and
+    away matches of a team from the latest, as JSON or, for HTMX requests,
+    as rows followed by a button that loads the next page
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request object
+    team_id : int
+        The id of the team
+
+    Returns
+    -------
+    HttpResponse
+        The page of matches and the cursor of the next one
+    """
+
+    team = get_object_or_404(Team, id=team_id)
+
+    history_handler = TeamMatchHistoryHandler(
+        team_id=team.id,
+        league=request.GET.get("league"),
+        season=request.GET.get("season"),
+        side=request.GET.get("side"),
+        cursor=request.GET.get("cursor"),
+        limit=request.GET.get("limit"),
+    )
+
+    history_handler.validate_data()
+
+    if history_handler.invalid:
+        if request.htmx:
+            return render(
+                request,
+                "form-errors.html",
+                {"errors": history_handler.errors},
+                status=400,
+            )
+
+        return JsonResponse({"errors": history_handler.errors}, status=400)
+
+    history_handler.fetch()
+
+    if request.htmx:
+        query = request.GET.copy()
+        query["cursor"] = history_handler.next_cursor or ""
+
+        return render(
+            request,
+            "matches/team-matches.html",
+            {
+                "team": team,
+                "matches": history_handler.matches,
+                "next_query": query.urlencode() if history_handler.next_cursor else "",
+            },
+        )
+
+    return JsonResponse(
+        {
+            "team": {"id": team.id, "name": team.name},
+            "matches": history_handler.matches,
+            "next_cursor": history_handler.next_cursor,
+        }
+    )
+
+
+@login_required(login_url="sign-in")
+@require_http_methods(["GET"])
+def export_matches(request: HttpRequest) -> HttpResponse:
+    """
+    The match export endpoint, which streams the filtered matches as a CSV
+    or NDJSON attachment, optionally gzipped, without holding them in memory
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request object
+
+    Returns
+    -------
+    HttpResponse
+        The streamed export
+    """
+
+    export_handler = MatchExportHandler(
+        export_format=request.GET.get("format", "csv"),
+        compress=request.GET.get("gzip") in ("1", "true"),
+        league=request.GET.get("league"),
+        season=request.GET.get("season"),
+        team=request.GET.get("team"),
+        fields=request.GET.get("fields"),
+    )
+
+    export_handler.validate_data()
+
+    if export_handler.invalid:
+        return JsonResponse({"errors": export_handler.errors}, status=400)
+
+    return StreamingHttpResponse(
+        export_handler.stream(),
+        content_type=export_handler.content_type,
+        headers={
+            "Content-Disposition": (f'attachment; filename="{export_handler.filename}"')
+        },
+    )
+
+
+@login_required(login_url="sign-in")
+@require_http_methods(["GET"])
+def calibrations(request: HttpRequest) -> HttpResponse:
+    """
+    The calibration endpoint, which returns the precomputed Brier score,
+    log-loss, ranked probability score and reliability bins of the forecast
+    probabilities of all the played matches or of a league, season or team
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request object
+
+    Returns
+    -------
+    HttpResponse
+        The calibrations as JSON
+    """
+
+    calibration_handler = CalibrationHandler(
+        scope=request.GET.get("scope"),
+        league=request.GET.get("league"),
+        season=request.GET.get("season"),
+        team=request.GET.get("team"),
+    )
+
+    calibration_handler.validate_data()
+
+    if calibration_handler.invalid:
+        return JsonResponse({"errors": calibration_handler.errors}, status=400)
+
+    calibration_handler.fetch()
+
+    return JsonResponse({"calibrations": calibration_handler.calibrations})
+
+
+@login_required(login_url="sign-in")
+@require_http_methods(["GET"])
+def league_projections(request: HttpRequest, league_id: int) -> HttpResponse:
+    """
+    The league projection endpoint, which returns the expected points and
+    position and the title and relegation odds of every team of a league
+    season, simulated from its remaining fixtures by `simulate_seasons`
+    and stored until the next seed
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request object
+    league_id : int
+        The id of the league
+
+    Returns
+    -------
+    HttpResponse
+        The projections as JSON, or a 404 response if the season is not
+        projected yet
+    """
+
+    league = get_object_or_404(League, id=league_id)
+
+    projection_handler = SeasonProjectionHandler(
+        league_id=league.id, season=request.GET.get("season")
+    )
+
+    projection_handler.validate_data()
+
+    if projection_handler.invalid:
+        return JsonResponse({"errors": projection_handler.errors}, status=400)
+
+    projection_handler.fetch()
+
+    if not projection_handler.projections:
+        return JsonResponse(
+            {"errors": ["The season is not projected yet."]}, status=404
+        )
+
+    return JsonResponse(
+        {
+            "league": {"id": league.id, "name": league.name},
+            "season": projection_handler.season,
+            "projections": projection_handler.projections,
+        }
+    )
+
+
+@login_required(login_url="sign-in")
+@require_http_methods(["GET"])
+def league_standings(request: HttpRequest, league_id: int) -> HttpResponse:
+    """
+    The league standing endpoint, which returns the table of a league
+    season from the standings materialized when the matches are seeded
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request object
+    league_id : int
+        The id of the league
+
+    Returns
+    -------
+    HttpResponse
+        The standings as JSON
+    """
+
+    league = get_object_or_404(League, id=league_id)
+
+    standing_handler = StandingHandler(
+        league_id=league.id, season=request.GET.get("season")
+    )
+
+    standing_handler.validate_data()
+
+    if standing_handler.invalid:
+        return JsonResponse({"errors": standing_handler.errors}, status=400)
+
+    standing_handler.fetch()
+
+    return JsonResponse(
+        {
+            "league": {"id": league.id, "name": league.name},
+            "season": standing_handler.season,
+            "standings": standing_handler.standings,
+        }
+    )
+
+
+@login_required(login_url="sign-in")
+@require_http_methods(["GET"])
+def match_scorelines(request: HttpRequest, match_id: int) -> HttpResponse:
+    """
+    The match scoreline endpoint, which returns the probability of every
+    scoreline of a match, from the Poisson distributions of its projected
+    scores, and the probabilities of the markets derived from them. The
+    match is read from the match array cache of the worker, if any
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request object
+    match_id : int
+        The id of the match
+
+    Returns
+    -------
+    HttpResponse
+        The scoreline matrix, by home then away goals, and the markets as JSON
+    """
+
+    try:
+        match = match_arrays().match(match_id)
+    except LookupError:
+        match = None
+
+    if match is None:
+        # Without an array cache, or for a match it does not hold yet
+        match = get_object_or_404(
+            Match.objects.values(
+                "id", "date", "team1__name", "team2__name", "proj_score1", "proj_score2"
+            ),
+            id=match_id,
+        )
+        match["team1"] = match.pop("team1__name")
+        match["team2"] = match.pop("team2__name")
+
+    matrices = scoreline_cache.matrices(
+        np.array([match["proj_score1"]]), np.array([match["proj_score2"]])
+    )
+
+    return JsonResponse(
+        {
+            "match": {
+                "id": match["id"],
+                "date": match["date"],
+                "team1": match["team1"],
+                "team2": match["team2"],
+                "proj_score1": match["proj_score1"],
+                "proj_score2": match["proj_score2"],
+            },
+            "max_goals": MAX_GOALS,
+            "matrix": matrices[0].tolist(),
+            "markets": {
+                market: float(values[0])
+                for market, values in scoreline_markets(matrices).items()
+            },
+        }
+    )
+
+
+@login_required(login_url="sign-in")
+@require_http_methods(["GET"])
+def team_trend(request: HttpRequest, team_id: int) -> HttpResponse:
+    """
+    The team trend endpoint, which returns the dated SPI series of a team
+    with its rolling form, precomputed when the matches are seeded, as
+    parallel lists ready to be charted
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request object
+    team_id : int
+        The id of the team
+
+    Returns
+    -------
+    HttpResponse
+        The series as JSON
+    """
+
+    team = get_object_or_404(Team, id=team_id)
+
+    trend_handler = TeamTrendHandler(team_id=team.id, last=request.GET.get("last"))
+
+    trend_handler.validate_data()
+
+    if trend_handler.invalid:
+        return JsonResponse({"errors": trend_handler.errors}, status=400)
+
+    trend_handler.fetch()
+
+    return JsonResponse(
+        {
+            "team": {"id": team.id, "name": team.name},
+            "window": trend_handler.window,
+            "series": trend_handler.series,
+        }
+    )
+
+
+@login_required(login_url="sign-in")
+@require_http_methods(["GET"])
+def head_to_head(request: HttpRequest, team_id: int, opponent_id: int) -> HttpResponse:
+    """
+    The head-to-head endpoint, which returns the record of a team against
+    an opponent, precomputed for every pair of teams that met when the
+    matches are seeded
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request object
+    team_id : int
+        The id of the team
+    opponent_id : int
+        The id of the opponent
+
+    Returns
+    -------
+    HttpResponse
+        The record as JSON, null if the teams never met
+    """
+
+    team = get_object_or_404(Team, id=team_id)
+    opponent = get_object_or_404(Team, id=opponent_id)
+
+    head_to_head_handler = HeadToHeadHandler(team_id=team.id, opponent_id=opponent.id)
+
+    head_to_head_handler.validate_data()
+
+    if head_to_head_handler.invalid:
+        return JsonResponse({"errors": head_to_head_handler.errors}, status=400)
+
+    head_to_head_handler.fetch()
+
+    return JsonResponse(
+        {
+            "team": {"id": team.id, "name": team.name},
+            "opponent": {"id": opponent.id, "name": opponent.name},
+            "head_to_head": head_to_head_handler.head_to_head,
+        }
+    )
@@ -106,3 +106,8 @@ STORAGES = {
 }
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+MATCH_DATA_CACHE_DIR = BASE_DIR / ".cache" / "matches"
+MATCH_DATA_REJECTED_FILE = BASE_DIR / ".cache" / "rejected_matches.csv"
+MATCH_SNAPSHOT_DIR = BASE_DIR / ".cache" / "snapshots"
+MATCH_ARRAY_CACHE_DIR = BASE_DIR / ".cache" / "arrays"
@@ -5,4 +5,5 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("base.urls")),
     path("", include("auth.urls")),
+    path("", include("matches.urls")),
 ]
@@ -1,8 +1,17 @@
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
 import pandas as pd
 import pytest
+from django.contrib.auth.models import User
 from django.test import Client
 
+from matches.constants import MatchFields
 from matches.management.commands.seed_matches import Command
+from matches.utils.loaders import cast_match_types
+from matches.utils.names import MatchNameResolver
 
 
 @pytest.fixture
@@ -14,6 +23,17 @@ def client() -> Client:
     return Client()
 
 
+@pytest.fixture
+def signed_in_client(client: Client, db: None) -> Client:
+    """
+    Signed in client fixture
+    """
+
+    client.force_login(User.objects.create_user(username="username"))
+
+    return client
+
+
 @pytest.fixture
 def seed_matches_command() -> Command:
     """
@@ -108,3 +128,114 @@ def match_df() -> pd.DataFrame:
             },
         ]
     )
+
+
+@pytest.fixture
+def resolved_match_df(db, match_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Projected match DataFrame fixture with compact types and the ids
+    of its leagues and teams, which are created in the database
+    """
+
+    return MatchNameResolver().resolve(
+        cast_match_types(match_df[MatchFields.field_list()])
+    )
+
+
+class MatchDataRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the match data server, which
+    answers conditional requests like the SPI server
+    """
+
+    def do_GET(self) -> None:
+        """
+        Serves the match data, or a 304 if the client has the current copy
+        """
+
+        server = self.server
+        server.requests.append(dict(self.headers))
+
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(server.body)))
+        self.send_header("ETag", server.etag)
+        self.send_header("Last-Modified", "Sun, 15 Oct 2017 12:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def log_message(self, *args) -> None:
+        """
+        Silences the request logs
+        """
+
+
+@pytest.fixture
+def match_data_server(match_df: pd.DataFrame) -> Iterator[ThreadingHTTPServer]:
+    """
+    Local stand-in of the SPI server fixture, serving the match DataFrame
+    """
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MatchDataRequestHandler)
+    server.body = match_df.to_csv(index=False).encode()
+    server.etag = '"v1"'
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_port}/spi_matches.csv"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def match_data_cache_dir(settings, tmp_path: Path) -> Path:
+    """
+    Match data cache directory fixture, isolated for every test
+    """
+
+    settings.MATCH_DATA_CACHE_DIR = tmp_path / "cache"
+
+    return settings.MATCH_DATA_CACHE_DIR
+
+
+@pytest.fixture(autouse=True)
+def match_snapshot_dir(settings, tmp_path: Path) -> Path:
+    """
+    Match snapshot directory fixture, isolated for every test
+    """
+
+    settings.MATCH_SNAPSHOT_DIR = tmp_path / "snapshots"
+
+    return settings.MATCH_SNAPSHOT_DIR
+
+
+@pytest.fixture(autouse=True)
+def match_array_cache_dir(settings, tmp_path: Path) -> Path:
+    """
+    Match array cache directory fixture, isolated for every test
+    """
+
+    settings.MATCH_ARRAY_CACHE_DIR = tmp_path / "arrays"
+
+    return settings.MATCH_ARRAY_CACHE_DIR
+
+
+@pytest.fixture(autouse=True)
+def match_data_rejected_file(settings, tmp_path: Path) -> Path:
+    """
+    Rejected match data file fixture, isolated for every test
+    """
+
+    settings.MATCH_DATA_REJECTED_FILE = tmp_path / "rejected_matches.csv"
+
+    return settings.MATCH_DATA_REJECTED_FILE
@@ -1,11 +1,65 @@
-from unittest.mock import Mock, patch
+import gzip
+import json
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.server import ThreadingHTTPServer
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import Optional
+from unittest.mock import MagicMock, Mock, patch
 
+import numpy as np
 import pandas as pd
 import pytest
-from django.core.management.base import CommandError
+from django.core.management import call_command
+from django.core.management.base import CommandError, OutputWrapper
+from django.db import connection
+from django.db.models import Q
+from django.test import Client
+from django.urls import reverse, reverse_lazy
 
+from matches.constants import MatchFields
 from matches.management.commands.seed_matches import Command
-from matches.models import Match
+from matches.models import (
+    Calibration,
+    HeadToHead,
+    League,
+    Match,
+    SeasonProjection,
+    Standing,
+    Team,
+    TeamTrend,
+)
+from matches.utils.arrays import MatchArrayCache, match_arrays
+from matches.utils.calibration import compute_calibrations
+from matches.utils.download import MatchDataCache
+from matches.utils.export import MatchExportHandler
+from matches.utils.head_to_head import compute_head_to_heads
+from matches.utils.history import TeamMatchHistoryHandler
+from matches.utils.loaders import (
+    bulk_create_matches,
+    copy_matches,
+    insert_matches,
+    match_instances,
+    match_rows,
+)
+from matches.utils.names import MatchNameResolver
+from matches.utils.parallel import partition_matches
+from matches.utils.partitions import is_partitioned, season_partitions
+from matches.utils.scorelines import (
+    ScorelineCache,
+    poisson_probabilities,
+    scoreline_markets,
+    scoreline_matrices,
+)
+from matches.utils.simulation import project_seasons, simulate_season
+from matches.utils.snapshot import MatchSnapshot
+from matches.utils.standings import rebuild_standings, update_standings
+from matches.utils.synthetic import load_synthetic_matches
+from matches.utils.trends import compute_team_trends, league_season_teams
+from matches.utils.upsert import MatchUpsertHandler
+from matches.utils.validation import MatchValidator
 
 
 def test_seed_matches_call_methods(seed_matches_command: Command):
@@ -16,23 +70,80 @@ def test_seed_matches_call_methods(seed_matches_command: Command):
 
     download_match_data_mock = Mock()
     extract_columns_mock = Mock()
+    validate_match_data_mock = Mock()
+    resolve_names_mock = Mock()
     generate_match_instances_mock = Mock()
     save_match_instances_mock = Mock()
 
     seed_matches_command._download_match_data = download_match_data_mock
     seed_matches_command._extract_columns = extract_columns_mock
+    seed_matches_command._validate_match_data = validate_match_data_mock
+    seed_matches_command._resolve_names = resolve_names_mock
     seed_matches_command._generate_match_instances = generate_match_instances_mock
     seed_matches_command._save_match_instances = save_match_instances_mock
+    seed_matches_command._fetch_match_data = Mock(return_value=True)
+    seed_matches_command._match_df = pd.DataFrame()
     seed_matches_command._match_instances = []
 
-    seed_matches_command.handle()
+    with patch(
+        "matches.management.commands.seed_matches.is_partitioned", return_value=False
+    ), patch.object(Command, "_refresh_summaries"):
+        seed_matches_command.handle(loader="orm")
 
     download_match_data_mock.assert_called_once()
     extract_columns_mock.assert_called_once()
+    validate_match_data_mock.assert_called_once()
+    resolve_names_mock.assert_called_once()
     generate_match_instances_mock.assert_called_once()
     save_match_instances_mock.assert_called_once()
 
 
+@pytest.mark.parametrize("loader", ["copy", "sqlite"])
+def test_seed_matches_call_methods_raw_loader(
+    seed_matches_command: Command, loader: str
+):
+    """
+    Tests the handle method of the seed_matches command with a raw loader
+    and expects that the data is loaded without generating instances
+    """
+
+    generate_match_instances_mock = Mock()
+    bulk_load_mock = MagicMock()
+    save_match_data_mock = Mock(return_value=0)
+
+    seed_matches_command._fetch_match_data = Mock(return_value=True)
+    seed_matches_command._download_match_data = Mock()
+    seed_matches_command._extract_columns = Mock()
+    seed_matches_command._validate_match_data = Mock()
+    seed_matches_command._resolve_names = Mock()
+    seed_matches_command._generate_match_instances = generate_match_instances_mock
+    seed_matches_command._bulk_load = bulk_load_mock
+    seed_matches_command._save_match_data = save_match_data_mock
+    seed_matches_command._match_df = pd.DataFrame()
+
+    with patch.object(Command, "_resolve_loader", return_value=loader), patch(
+        "matches.management.commands.seed_matches.is_partitioned", return_value=False
+    ), patch.object(Command, "_refresh_summaries"):
+        seed_matches_command.handle(loader=loader)
+
+    generate_match_instances_mock.assert_not_called()
+    bulk_load_mock.assert_called_once()
+    save_match_data_mock.assert_called_once()
+
+
+@pytest.mark.skipif(
+    connection.vendor == "postgresql", reason="The copy loader is available"
+)
+def test_seed_matches_copy_loader_requires_postgresql(seed_matches_command: Command):
+    """
+    Tests the handle method of the seed_matches command with the copy
+    loader on a backend other than PostgreSQL and expects that an error is raised
+    """
+
+    with pytest.raises(CommandError, match="The copy loader requires PostgreSQL"):
+        seed_matches_command.handle(loader="copy")
+
+
 def test_seed_matches_download_match_data_error(seed_matches_command: Command):
     """
     Tests the _download_match_data method of the
@@ -122,9 +233,1803 @@ def test_seed_matches_save_match_instances(
     seed_matches_command._match_df = match_df
 
     seed_matches_command._extract_columns()
+    seed_matches_command._resolve_names()
     seed_matches_command._generate_match_instances()
 
     seed_matches_command._match_instances[0].save()
     seed_matches_command._save_match_instances()
 
     assert Match.objects.count() == len(seed_matches_command._match_instances)
+
+
+@pytest.mark.django_db
+def test_seed_matches_in_chunks(seed_matches_command: Command, match_df: pd.DataFrame):
+    """
+    Tests the handle method of the seed_matches command with a chunk size
+    and expects that every chunk is saved and its throughput is reported
+    """
+
+    chunks = [match_df.iloc[:2], match_df.iloc[2:]]
+    stdout = StringIO()
+    seed_matches_command.stdout = OutputWrapper(stdout)
+    seed_matches_command._fetch_match_data = Mock(return_value=True)
+
+    with patch("pandas.read_csv") as read_csv_mock:
+        read_csv_mock.return_value = iter(chunks)
+
+        seed_matches_command.handle(chunk_size=2)
+
+    output = stdout.getvalue()
+
+    assert read_csv_mock.call_args.kwargs["chunksize"] == 2
+    assert Match.objects.count() == len(match_df)
+    assert "Chunk 1: saved 2 matches" in output
+    assert "Chunk 2: saved 1 matches" in output
+
+
+def test_seed_matches_in_chunks_invalid_size(seed_matches_command: Command):
+    """
+    Tests the handle method of the seed_matches command with
+    a non-positive chunk size and expects that an error is raised
+    """
+
+    with pytest.raises(CommandError, match="The chunk size must be a positive"):
+        seed_matches_command.handle(chunk_size=0)
+
+
+@pytest.mark.django_db
+def test_match_upsert_handler_compute_changes(resolved_match_df: pd.DataFrame):
+    """
+    Tests the compute_changes method of the match upsert handler
+    and expects that the matches are split into new, changed and unchanged
+    """
+
+    stored_df = MatchUpsertHandler(resolved_match_df.iloc[:2]).match_df
+
+    Match.objects.bulk_create(match_instances(stored_df))
+
+    match_df = resolved_match_df.copy()
+    match_df.loc[1, "score2"] = 5.0
+
+    upsert_handler = MatchUpsertHandler(match_df)
+    upsert_handler.compute_changes()
+
+    assert upsert_handler.inserted == 1
+    assert upsert_handler.updated == 1
+    assert upsert_handler.unchanged == 1
+    assert upsert_handler.new_df["team1"].to_list() == [
+        Team.objects.get(name="Strasbourg").id
+    ]
+    assert upsert_handler.changed_df["team1"].to_list() == [
+        Team.objects.get(name="Real Betis").id
+    ]
+    assert upsert_handler.league_seasons == {
+        (League.objects.get(name="Spanish Primera Division").id, 2017),
+        (League.objects.get(name="French Ligue 1").id, 2017),
+    }
+    assert upsert_handler.pairs == {
+        tuple(
+            sorted(
+                Team.objects.filter(name__in=["Real Betis", "Valencia"]).values_list(
+                    "id", flat=True
+                )
+            )
+        ),
+        tuple(
+            sorted(
+                Team.objects.filter(name__in=["Strasbourg", "Marseille"]).values_list(
+                    "id", flat=True
+                )
+            )
+        ),
+    }
+
+
+@pytest.mark.django_db
+def test_match_upsert_handler_save(resolved_match_df: pd.DataFrame):
+    """
+    Tests the save method of the match upsert handler
+    and expects that the new and changed matches are stored
+    """
+
+    match_df = resolved_match_df.copy()
+    match_df.loc[2, ["score1", "score2"]] = None
+
+    upsert_handler = MatchUpsertHandler(match_df)
+    upsert_handler.compute_changes()
+    upsert_handler.save()
+
+    match_df.loc[2, ["score1", "score2"]] = [1.0, 0.0]
+
+    upsert_handler = MatchUpsertHandler(match_df)
+    upsert_handler.compute_changes()
+    upsert_handler.save()
+
+    match = Match.objects.get(team1__name="Strasbourg")
+
+    assert Match.objects.count() == len(match_df)
+    assert upsert_handler.updated == 1
+    assert (match.score1, match.score2) == (1.0, 0.0)
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="Requires SQLite")
+@pytest.mark.django_db
+def test_seed_matches_sqlite_loader(
+    seed_matches_command: Command, match_df: pd.DataFrame
+):
+    """
+    Tests the sqlite loader of the seed_matches command and expects
+    that the matches are replaced and the indexes are rebuilt
+    """
+
+    seed_matches_command._loader = "sqlite"
+    seed_matches_command._match_df = match_df
+
+    seed_matches_command._extract_columns()
+    seed_matches_command._resolve_names()
+    seed_matches_command._match_df.loc[2, ["score1", "score2"]] = None
+
+    indexes_sql = "SELECT name FROM sqlite_master WHERE type = 'index' ORDER BY name"
+
+    with connection.cursor() as cursor:
+        indexes = cursor.execute(indexes_sql).fetchall()
+
+    for _ in range(2):
+        with seed_matches_command._bulk_load():
+            seed_matches_command._save_match_data()
+
+    with connection.cursor() as cursor:
+        rebuilt_indexes = cursor.execute(indexes_sql).fetchall()
+
+    assert Match.objects.count() == len(match_df)
+    assert Match.objects.filter(score1__isnull=True).count() == 1
+    assert rebuilt_indexes == indexes
+
+
+def test_match_rows(resolved_match_df: pd.DataFrame):
+    """
+    Tests the match_rows function and expects that the rows hold
+    the values the match fields save, with missing values as None
+    """
+
+    match_df = resolved_match_df.copy()
+    match_df.loc[2, ["score1", "score2"]] = None
+
+    rows = match_rows(match_df)
+
+    assert rows[0] == (
+        2017,
+        date(2017, 10, 15),
+        League.objects.get(name="Italy Serie A").id,
+        Team.objects.get(name="Internazionale").id,
+        Team.objects.get(name="AC Milan").id,
+        78.3,
+        71.94,
+        0.5266,
+        0.2279,
+        0.2455,
+        1.84,
+        1.14,
+        3,
+        2,
+    )
+    assert rows[2][-2:] == (None, None)
+
+
+@pytest.mark.django_db
+def test_seed_matches_raw_loader(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with the raw loader and expects
+    that the matches are saved as the ORM would save them
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.loc[2, ["score1", "score2"]] = None
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), loader="raw", stdout=StringIO())
+
+    match = Match.objects.get(team1__name="Internazionale")
+
+    assert Match.objects.count() == len(match_df)
+    assert Match.objects.filter(score1__isnull=True).count() == 1
+    assert (match.season, match.date, match.score1) == (2017, date(2017, 10, 15), 3)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "loader",
+    [
+        bulk_create_matches,
+        insert_matches,
+        pytest.param(
+            copy_matches,
+            marks=pytest.mark.skipif(
+                connection.vendor != "postgresql", reason="Requires PostgreSQL"
+            ),
+        ),
+    ],
+)
+def test_match_loaders(resolved_match_df: pd.DataFrame, loader: Callable):
+    """
+    Tests the loaders of the seed_matches command and expects that
+    the matches are saved with their missing scores, through the
+    execute wrappers of the connection
+    """
+
+    match_df = resolved_match_df.copy()
+    match_df.loc[2, ["score1", "score2"]] = None
+    statements = []
+
+    def record_statement(execute, sql, params, many, context):
+        statements.append(sql)
+
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record_statement):
+        loaded = loader(match_df)
+
+    assert loaded == len(match_df)
+    assert any("matches" in statement for statement in statements)
+    assert Match.objects.count() == len(match_df)
+    assert Match.objects.filter(score1__isnull=True).count() == 1
+
+
+@pytest.mark.django_db
+def test_benchmark_loaders():
+    """
+    Tests the benchmark_loaders command and expects that
+    the timings are reported and no matches are kept
+    """
+
+    stdout = StringIO()
+
+    call_command("benchmark_loaders", rows=50, stdout=stdout)
+
+    assert "orm" in stdout.getvalue()
+    assert not Match.objects.exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_matches_table():
+    """
+    Tests the benchmark_matches_table command and expects that the table
+    size and team query latency are reported and no matches are kept
+    """
+
+    stdout = StringIO()
+
+    call_command("benchmark_matches_table", rows=200, repeat=2, stdout=stdout)
+
+    assert "bytes per row" in stdout.getvalue()
+    assert "team query" in stdout.getvalue()
+    assert not Match.objects.exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_match_arrays():
+    """
+    Tests the benchmark_match_arrays command and expects that
+    the timings are reported and no matches are kept
+    """
+
+    stdout = StringIO()
+
+    call_command("benchmark_match_arrays", rows=50, repeat=1, stdout=stdout)
+
+    assert "to_arrays" in stdout.getvalue()
+    assert not Match.objects.exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_match_queries():
+    """
+    Tests the benchmark_match_queries command and expects that the plans
+    and timings are reported and the indexes and no matches are kept
+    """
+
+    stdout = StringIO()
+
+    call_command("benchmark_match_queries", rows=200, repeat=1, stdout=stdout)
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Match._meta.db_table
+        )
+
+    assert "without indexes" in stdout.getvalue()
+    assert "unplayed" in stdout.getvalue()
+    assert {index.name for index in Match._meta.indexes} <= constraints.keys()
+    assert not Match.objects.exists()
+
+
+def test_match_data_cache_conditional_fetch(
+    match_data_server: ThreadingHTTPServer, match_data_cache_dir: Path
+):
+    """
+    Tests the fetch method of the match data cache twice and expects that
+    the second request is conditional and answered with a 304
+    """
+
+    match_data_cache = MatchDataCache(match_data_server.url, match_data_cache_dir)
+    match_data_cache.fetch()
+
+    assert match_data_cache.changed
+    assert match_data_cache.path.read_bytes() == match_data_server.body
+
+    match_data_cache.mark_seeded()
+
+    match_data_cache = MatchDataCache(match_data_server.url, match_data_cache_dir)
+    match_data_cache.fetch()
+
+    assert not match_data_cache.changed
+    assert match_data_server.requests[1]["If-None-Match"] == match_data_server.etag
+    assert "If-Modified-Since" in match_data_server.requests[1]
+
+    match_data_cache = MatchDataCache(
+        match_data_server.url, match_data_cache_dir, database="other"
+    )
+    match_data_cache.fetch()
+
+    assert match_data_cache.changed
+
+
+def test_match_data_cache_corrupted_copy(
+    match_data_server: ThreadingHTTPServer, match_data_cache_dir: Path
+):
+    """
+    Tests the fetch method of the match data cache with a corrupted
+    cached copy and expects that it is downloaded unconditionally
+    """
+
+    match_data_cache = MatchDataCache(match_data_server.url, match_data_cache_dir)
+    match_data_cache.fetch()
+    match_data_cache.path.write_bytes(b"corrupted")
+
+    match_data_cache = MatchDataCache(match_data_server.url, match_data_cache_dir)
+    match_data_cache.fetch()
+
+    assert "If-None-Match" not in match_data_server.requests[1]
+    assert match_data_cache.path.read_bytes() == match_data_server.body
+
+
+@pytest.mark.django_db
+def test_seed_matches_not_modified(match_data_server: ThreadingHTTPServer):
+    """
+    Tests the seed_matches command against an unchanged source and expects
+    that a run is skipped while the matches are stored, but not once they
+    are deleted
+    """
+
+    call_command("seed_matches", source=match_data_server.url, stdout=StringIO())
+    matches = Match.objects.count()
+
+    stdout = StringIO()
+    call_command("seed_matches", source=match_data_server.url, stdout=stdout)
+
+    assert "not modified" in stdout.getvalue()
+    assert Match.objects.count() == matches
+
+    Match.objects.all().delete()
+
+    stdout = StringIO()
+    call_command("seed_matches", source=match_data_server.url, stdout=stdout)
+
+    assert "not modified" not in stdout.getvalue()
+    assert Match.objects.count() == matches
+
+
+@pytest.mark.django_db
+def test_seed_matches_local_gzip_source(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with a local gzipped
+    source and expects that the matches are seeded
+    """
+
+    source = tmp_path / "spi_matches.csv.gz"
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), stdout=StringIO())
+
+    assert Match.objects.count() == len(match_df)
+
+
+@pytest.mark.django_db
+def test_seed_matches_swap_and_rollback(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with a table swap twice and then a rollback
+    and expects that the live table is replaced, keeps its constraints and
+    that the replaced table is restored
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, "matches")
+
+    call_command("seed_matches", source=str(source), swap=True, stdout=StringIO())
+
+    match_df.iloc[:2].to_csv(source, index=False)
+    call_command("seed_matches", source=str(source), swap=True, stdout=StringIO())
+
+    with connection.cursor() as cursor:
+        swapped_constraints = connection.introspection.get_constraints(
+            cursor, "matches"
+        )
+        tables = connection.introspection.table_names(cursor)
+
+    assert Match.objects.count() == 2
+    assert "matches_previous" in tables
+    assert "matches_staging" not in tables
+    assert "matches_natural_key" in swapped_constraints
+    assert swapped_constraints.keys() == constraints.keys()
+
+    call_command("seed_matches", rollback=True, stdout=StringIO())
+
+    assert Match.objects.count() == len(match_df)
+    assert Standing.objects.count() == 2 * len(match_df)
+    assert HeadToHead.objects.count() == len(match_df)
+
+    stdout = StringIO()
+    call_command("seed_matches", source=str(source), swap=True, stdout=stdout)
+
+    assert "not modified" not in stdout.getvalue()
+    assert Match.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_seed_matches_rollback_without_previous_table():
+    """
+    Tests the seed_matches command with a rollback before any
+    table swap and expects that an error is raised
+    """
+
+    with pytest.raises(CommandError, match="There is no `matches_previous` table"):
+        call_command("seed_matches", rollback=True)
+
+
+def test_seed_matches_profiler_per_command():
+    """
+    Tests the profiler of the seed_matches command and expects that every
+    command has its own disabled profiler before it is handled
+    """
+
+    first, second = Command(), Command()
+
+    with first._stage("fetch"):
+        pass
+
+    assert first._profiler is not second._profiler
+    assert not first._profiler.enabled
+    assert first._profiler.stages == {}
+
+
+@pytest.mark.django_db
+def test_seed_matches_profile(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with profiling and expects that every
+    stage is summarized and its cProfile stats and JSON report are written
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+    stdout = StringIO()
+
+    call_command(
+        "seed_matches",
+        source=str(source),
+        loader="orm",
+        profile_dir=tmp_path / "profile",
+        stdout=stdout,
+    )
+
+    report = json.loads((tmp_path / "profile" / "seed_matches.json").read_text())
+    stages = [stage["stage"] for stage in report]
+
+    assert stages == [
+        "fetch",
+        "read",
+        "extract",
+        "validate",
+        "resolve",
+        "generate",
+        "save",
+        "standings",
+        "summarize",
+        "trends",
+        "head_to_head",
+        "calibrate",
+    ]
+    assert report[stages.index("save")]["rows"] == len(match_df)
+    assert report[stages.index("save")]["queries"] > 0
+    assert (tmp_path / "profile" / "save.pstats").exists()
+    assert "rows/s" in stdout.getvalue()
+
+
+def test_partition_matches(match_df: pd.DataFrame):
+    """
+    Tests the partition_matches function and expects that the matches
+    are split into balanced partitions of whole seasons and leagues
+    """
+
+    match_df = pd.concat([match_df, match_df.iloc[:1]], ignore_index=True)
+
+    partitions = partition_matches(match_df, 2)
+
+    assert sorted(len(partition) for partition in partitions) == [2, 2]
+    assert pd.concat(partitions).sort_index().equals(match_df)
+    assert all(partition["league"].nunique() <= 2 for partition in partitions)
+
+
+@pytest.mark.django_db
+def test_seed_matches_seasons(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with a season and expects
+    that only the matches of that season are replaced
+    """
+
+    next_season_df = match_df.assign(
+        season=2018,
+        date=(pd.to_datetime(match_df["date"]) + pd.DateOffset(years=1)).dt.strftime(
+            "%Y-%m-%d"
+        ),
+    )
+    source = tmp_path / "spi_matches.csv"
+    pd.concat([match_df, next_season_df]).to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), stdout=StringIO())
+
+    pd.concat([match_df.iloc[:1], next_season_df.iloc[:1]]).to_csv(source, index=False)
+    call_command("seed_matches", source=str(source), seasons=[2018], stdout=StringIO())
+
+    assert Match.objects.filter(season=2017).count() == len(match_df)
+    assert Match.objects.filter(season=2018).count() == 1
+
+
+@pytest.mark.django_db
+def test_seed_matches_seasons_then_all(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with a season followed by a seed of
+    all the seasons of the same data and expects that the latter is not
+    skipped as already seeded
+    """
+
+    next_season_df = match_df.assign(
+        season=2018,
+        date=(pd.to_datetime(match_df["date"]) + pd.DateOffset(years=1)).dt.strftime(
+            "%Y-%m-%d"
+        ),
+    )
+    source = tmp_path / "spi_matches.csv"
+    pd.concat([match_df, next_season_df]).to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), seasons=[2018], stdout=StringIO())
+
+    assert Match.objects.filter(season=2017).count() == 0
+
+    stdout = StringIO()
+    call_command("seed_matches", source=str(source), stdout=stdout)
+
+    assert "not modified" not in stdout.getvalue()
+    assert Match.objects.filter(season=2017).count() == len(match_df)
+    assert Match.objects.filter(season=2018).count() == len(match_df)
+
+    stdout = StringIO()
+    call_command("seed_matches", source=str(source), stdout=stdout)
+
+    assert "not modified" in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_seed_matches_seasons_with_swap():
+    """
+    Tests the seed_matches command with a season and a table
+    swap and expects that an error is raised
+    """
+
+    with pytest.raises(CommandError, match="Seeding seasons cannot be combined"):
+        call_command("seed_matches", seasons=[2017], swap=True)
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="Requires PostgreSQL")
+@pytest.mark.django_db
+def test_partition_matches_command(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the partition_matches command and expects that the table is
+    partitioned by season, that seeding creates the partitions of new
+    seasons and truncates only the reseeded ones, that queries by season
+    are pruned to their partition and that the partitioning is undone
+    """
+
+    next_season_df = match_df.assign(season=2018, date="2018-08-11")
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), stdout=StringIO())
+    call_command("partition_matches", stdout=StringIO())
+
+    assert is_partitioned()
+    assert season_partitions() == ["matches_2017"]
+
+    with pytest.raises(CommandError, match="already partitioned"):
+        call_command("partition_matches")
+
+    with pytest.raises(CommandError, match="not supported on a table partitioned"):
+        call_command("seed_matches", swap=True)
+
+    next_season_df.iloc[:1].to_csv(source, index=False)
+    call_command("seed_matches", source=str(source), seasons=[2018], stdout=StringIO())
+
+    plan = Match.objects.filter(season=2018).explain()
+
+    assert season_partitions() == ["matches_2017", "matches_2018"]
+    assert Match.objects.filter(season=2017).count() == len(match_df)
+    assert Match.objects.filter(season=2018).count() == 1
+    assert "matches_2018" in plan and "matches_2017" not in plan
+
+    call_command("partition_matches", undo=True, stdout=StringIO())
+
+    assert not is_partitioned()
+    assert Match.objects.count() == len(match_df) + 1
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="Requires SQLite")
+def test_partition_matches_command_requires_postgresql():
+    """
+    Tests the partition_matches command on SQLite
+    and expects that an error is raised
+    """
+
+    with pytest.raises(CommandError, match="requires PostgreSQL"):
+        call_command("partition_matches")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_seed_matches_workers(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with several workers and expects that
+    the matches are loaded in parallel on PostgreSQL and serially otherwise
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+    stdout = StringIO()
+
+    call_command("seed_matches", source=str(source), workers=2, stdout=stdout)
+
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        cursor.execute("DROP TABLE IF EXISTS matches_previous")
+
+    assert Match.objects.count() == len(match_df)
+    assert "matches_staging" not in tables
+    assert ("loading serially" in stdout.getvalue()) == (
+        connection.vendor != "postgresql"
+    )
+
+
+def test_match_validator_validate(match_df: pd.DataFrame):
+    """
+    Tests the validate method of the match validator with invalid
+    matches and expects that they are rejected with their reasons
+    """
+
+    match_df = pd.concat([match_df] * 2, ignore_index=True)[MatchFields.field_list()]
+    match_df.loc[1, "season"] = 20171
+    match_df.loc[2, "score2"] = 1.5
+    match_df.loc[3, "date"] = "2017-13-45"
+    match_df.loc[4, ["prob1", "score1"]] = [0.9, -1.0]
+    match_df.loc[5, "team2"] = "A" * 51
+    match_df.loc[5, "spi1"] = None
+
+    validator = MatchValidator(match_df)
+    validator.validate()
+
+    assert len(validator.valid_df) == 1
+    assert validator.rejected == 5
+    assert validator.rejected_df["reason"].to_list() == [
+        "invalid season",
+        "non-integer score2",
+        "invalid date",
+        "probabilities do not sum to 1; negative score1; duplicated match",
+        "missing spi1; team2 longer than 50 characters",
+    ]
+
+
+@pytest.mark.django_db
+def test_seed_matches_rejected_file(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with an invalid match and expects that
+    the valid matches are seeded and the invalid one is quarantined
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    rejected_file = tmp_path / "rejected.csv"
+    match_df.loc[1, "probtie"] = 1.5
+    match_df.to_csv(source, index=False)
+
+    call_command(
+        "seed_matches",
+        source=str(source),
+        rejected_file=rejected_file,
+        stdout=StringIO(),
+    )
+
+    rejected_df = pd.read_csv(rejected_file)
+
+    assert Match.objects.count() == len(match_df) - 1
+    assert rejected_df["team1"].to_list() == ["Real Betis"]
+    assert rejected_df["reason"].to_list() == [
+        "probtie out of range; probabilities do not sum to 1"
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("incremental", [False, True])
+def test_seed_matches_duplicated_match(
+    match_df: pd.DataFrame, tmp_path: Path, incremental: bool
+):
+    """
+    Tests the seed_matches command with a duplicated match and expects
+    that its first copy is seeded and the later one quarantined
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    rejected_file = tmp_path / "rejected.csv"
+    match_df = pd.concat([match_df, match_df.iloc[[0]]], ignore_index=True)
+    match_df.loc[3, "score1"] = 4.0
+    match_df.to_csv(source, index=False)
+
+    call_command(
+        "seed_matches",
+        source=str(source),
+        loader="orm",
+        incremental=incremental,
+        rejected_file=rejected_file,
+        stdout=StringIO(),
+    )
+
+    rejected_df = pd.read_csv(rejected_file)
+
+    assert Match.objects.count() == len(match_df) - 1
+    assert Match.objects.get(team1__name="Internazionale").score1 == 3
+    assert rejected_df["score1"].to_list() == [4]
+    assert rejected_df["reason"].to_list() == ["duplicated match"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_seed_matches_duplicated_match_in_chunks(
+    match_df: pd.DataFrame, tmp_path: Path, chunk_size: Optional[int]
+):
+    """
+    Tests the seed_matches command at once and in chunks with a match
+    duplicated across the boundary of the chunks and expects that its
+    first copy is seeded either way
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    rejected_file = tmp_path / "rejected.csv"
+    match_df = pd.concat([match_df, match_df.iloc[[0]]], ignore_index=True)
+    match_df.loc[3, "score1"] = 4.0
+    match_df.to_csv(source, index=False)
+
+    call_command(
+        "seed_matches",
+        source=str(source),
+        loader="orm",
+        chunk_size=chunk_size,
+        rejected_file=rejected_file,
+        stdout=StringIO(),
+    )
+
+    rejected_df = pd.read_csv(rejected_file)
+
+    assert Match.objects.count() == len(match_df) - 1
+    assert Match.objects.get(team1__name="Internazionale").score1 == 3
+    assert rejected_df["score1"].to_list() == [4]
+    assert rejected_df["reason"].to_list() == ["duplicated match"]
+
+
+@pytest.mark.django_db
+def test_match_name_resolver_resolve(match_df: pd.DataFrame, django_assert_num_queries):
+    """
+    Tests the resolve method of the match name resolver and expects that the
+    names are replaced with ids, creating only the leagues and teams not stored
+    """
+
+    League.objects.create(name="Italy Serie A")
+    resolver = MatchNameResolver()
+
+    resolved_df = resolver.resolve(match_df[MatchFields.field_list()])
+
+    with django_assert_num_queries(0):
+        resolver.resolve(match_df[MatchFields.field_list()])
+
+    assert League.objects.count() == 3
+    assert Team.objects.count() == 6
+    assert resolved_df["league"].iloc[0] == League.objects.get(name="Italy Serie A").id
+    assert resolved_df["team2"].iloc[0] == Team.objects.get(name="AC Milan").id
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("side, team_field", [(None, None), ("away", "team2")])
+def test_team_match_history_handler_fetch(side: str, team_field: str):
+    """
+    Tests the fetch method of the team match history handler through every
+    page and expects the matches of the team from the latest, each once
+    """
+
+    match_df = load_synthetic_matches(4000)
+    team = int(match_df["team1"].iloc[0])
+    team_matches = Match.objects.filter(
+        Q(**{team_field: team}) if team_field else Q(team1=team) | Q(team2=team)
+    )
+    expected = list(team_matches.order_by("-date", "-id").values_list("id", flat=True))
+    fetched = []
+    cursor = None
+
+    while True:
+        history_handler = TeamMatchHistoryHandler(
+            team_id=team, side=side, cursor=cursor, limit="3"
+        )
+        history_handler.validate_data()
+        history_handler.fetch()
+
+        fetched.extend(match["id"] for match in history_handler.matches)
+        cursor = history_handler.next_cursor
+
+        if cursor is None:
+            break
+
+        assert len(history_handler.matches) == 3
+
+    assert len(expected) > 3
+    assert fetched == expected
+
+
+@pytest.mark.parametrize(
+    "params, errors",
+    [
+        ({"season": "2017/18"}, ["Season must be a year."]),
+        (
+            {"league": "Serie A", "side": "both"},
+            ["League must be an id.", "Side must be home or away."],
+        ),
+        (
+            {"limit": "0", "cursor": "bm90LWEtY3Vyc29y"},
+            ["Limit must be between 1 and 100.", "Invalid cursor."],
+        ),
+    ],
+)
+def test_team_match_history_handler_validate_data(params: dict, errors: list[str]):
+    """
+    Tests the validate_data method of the team match history
+    handler and expects the errors to be set correctly
+    """
+
+    history_handler = TeamMatchHistoryHandler(team_id=1, **params)
+
+    history_handler.validate_data()
+
+    assert history_handler.errors == errors
+    assert history_handler.invalid
+
+
+@pytest.mark.django_db
+def test_team_matches_view(signed_in_client: Client, resolved_match_df: pd.DataFrame):
+    """
+    Tests the team matches view and expects a page of JSON matches, HTMX
+    rows with a button for the next page, and errors for invalid filters
+    """
+
+    bulk_create_matches(resolved_match_df)
+    team = Team.objects.get(name="Internazionale")
+    url = reverse("team-matches", args=[team.id])
+
+    response = signed_in_client.get(url, {"season": 2017})
+    body = response.json()
+
+    assert response.status_code == 200
+    assert body["team"] == {"id": team.id, "name": "Internazionale"}
+    assert body["matches"][0]["team2"] == "AC Milan"
+    assert body["matches"][0]["date"] == "2017-10-15"
+    assert body["next_cursor"] is None
+
+    Match.objects.create(
+        season=2017,
+        date=date(2018, 1, 8),
+        league=League.objects.get(name="Italy Serie A"),
+        team1=Team.objects.get(name="AC Milan"),
+        team2=team,
+        spi1=70.0,
+        spi2=75.0,
+        prob1=0.4,
+        prob2=0.35,
+        probtie=0.25,
+        proj_score1=1.4,
+        proj_score2=1.3,
+    )
+
+    response = signed_in_client.get(url, {"limit": 1}, HTTP_HX_REQUEST="true")
+
+    assert response.status_code == 200
+    assert "2018-01-08" in response.content.decode()
+    assert "More matches" in response.content.decode()
+    assert signed_in_client.get(url, {"season": "x"}).status_code == 400
+    assert signed_in_client.get(reverse("team-matches", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("export_format, compress", [("csv", False), ("ndjson", True)])
+def test_match_export_handler_stream(
+    resolved_match_df: pd.DataFrame, export_format: str, compress: bool
+):
+    """
+    Tests the stream method of the match export handler and expects
+    that the filtered matches are exported with the names of their
+    league and teams, in chunks of the database iterator
+    """
+
+    bulk_create_matches(resolved_match_df)
+    team = Team.objects.get(name="Valencia")
+    export_handler = MatchExportHandler(
+        export_format=export_format,
+        compress=compress,
+        team=str(team.id),
+        fields="date,team1,team2,score2",
+    )
+
+    export_handler.validate_data()
+
+    with patch("matches.utils.export.CHUNK_SIZE", 1):
+        content = b"".join(export_handler.stream())
+
+    if compress:
+        content = gzip.decompress(content)
+
+    exported_df = (
+        pd.read_csv(BytesIO(content))
+        if export_format == "csv"
+        else pd.read_json(BytesIO(content), lines=True, convert_dates=False)
+    )
+
+    assert exported_df.to_dict("records") == [
+        {"date": "2017-10-15", "team1": "Real Betis", "team2": "Valencia", "score2": 6}
+    ]
+
+
+def test_match_export_handler_validate_data():
+    """
+    Tests the validate_data method of the match export handler
+    and expects the errors to be set correctly
+    """
+
+    export_handler = MatchExportHandler(
+        export_format="xlsx", season="2017/18", fields="date,adj_score1"
+    )
+
+    export_handler.validate_data()
+
+    assert export_handler.errors == [
+        "Format must be csv or ndjson.",
+        "Season must be a year.",
+        "Unknown fields: adj_score1.",
+    ]
+
+
+@pytest.mark.django_db
+def test_export_matches(
+    signed_in_client: Client, resolved_match_df: pd.DataFrame, tmp_path: Path
+):
+    """
+    Tests the export endpoint and the export_matches command and expects
+    that the matches are streamed as an attachment and written to a file
+    """
+
+    bulk_create_matches(resolved_match_df)
+    output = tmp_path / "matches.csv.gz"
+
+    response = signed_in_client.get(
+        reverse("export-matches"), {"season": 2017, "gzip": 1}
+    )
+    call_command("export_matches", gzip=True, output=output, stdout=StringIO())
+
+    content = gzip.decompress(b"".join(response.streaming_content))
+
+    assert response.status_code == 200
+    assert response["Content-Disposition"] == 'attachment; filename="matches.csv.gz"'
+    assert content == gzip.decompress(output.read_bytes())
+    assert pd.read_csv(BytesIO(content)).columns.to_list() == MatchFields.field_list()
+    assert len(pd.read_csv(BytesIO(content))) == len(resolved_match_df)
+    assert (
+        signed_in_client.get(reverse("export-matches"), {"format": "xml"}).status_code
+        == 400
+    )
+
+
+@pytest.mark.django_db
+def test_export_matches_stdout(resolved_match_df: pd.DataFrame):
+    """
+    Tests the export_matches command without an output file and expects
+    that the export is written through the output of the command
+    """
+
+    bulk_create_matches(resolved_match_df)
+    stdout = StringIO()
+
+    call_command("export_matches", format="ndjson", stdout=stdout)
+
+    assert len(stdout.getvalue().splitlines()) == len(resolved_match_df)
+
+    with pytest.raises(CommandError, match="binary"):
+        call_command("export_matches", gzip=True, stdout=StringIO())
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        reverse_lazy("team-matches", args=[1]),
+        reverse_lazy("export-matches"),
+        reverse_lazy("calibrations"),
+        reverse_lazy("league-projections", args=[1]),
+        reverse_lazy("league-standings", args=[1]),
+        reverse_lazy("match-scorelines", args=[1]),
+        reverse_lazy("team-trend", args=[1]),
+        reverse_lazy("head-to-head", args=[1, 2]),
+    ],
+)
+def test_match_views_sign_in_required(client: Client, url: str):
+    """
+    Tests the match endpoints without a signed in user and expects
+    a redirection to the sign in page
+    """
+
+    response = client.get(url)
+
+    assert response.status_code == 302
+    assert response.url.startswith(reverse("sign-in"))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("snapshot_format", ["parquet", "feather"])
+def test_match_snapshot(
+    resolved_match_df: pd.DataFrame, tmp_path: Path, snapshot_format: str
+):
+    """
+    Tests the write and load methods of the match snapshot and expects
+    that the matches are read back by season, league and column, that an
+    unchanged content keeps its version and that only the current and the
+    previous versions are kept
+    """
+
+    pytest.importorskip("pyarrow")
+    bulk_create_matches(resolved_match_df)
+
+    with patch("matches.utils.snapshot.SNAPSHOT_FORMAT", snapshot_format):
+        snapshot = MatchSnapshot(tmp_path / "snapshots")
+        version = snapshot.write()
+
+        assert snapshot.write() == version
+        assert snapshot.current_version == version
+
+        snapshot_df = snapshot.load()
+        league_df = snapshot.load(
+            columns=["team1", "score2"], seasons=[2017], leagues=["Italy Serie A"]
+        )
+
+        Match.objects.filter(team1__name="Strasbourg").update(score2=None)
+        second_version = snapshot.write()
+        Match.objects.filter(team1__name="Strasbourg").delete()
+        third_version = snapshot.write()
+
+    assert len(snapshot_df) == len(resolved_match_df)
+    assert snapshot_df["season"].unique().tolist() == [2017]
+    assert sorted(snapshot_df["team1"]) == [
+        "Internazionale",
+        "Real Betis",
+        "Strasbourg",
+    ]
+    assert league_df.to_dict("records") == [{"team1": "Internazionale", "score2": 2}]
+    assert snapshot.load(version=second_version)["score2"].isna().sum() == 1
+    assert len(snapshot.load()) == len(resolved_match_df) - 1
+    assert sorted(path.name for path in snapshot.snapshot_dir.iterdir()) == sorted(
+        ["CURRENT", second_version, third_version]
+    )
+
+
+@pytest.mark.django_db
+def test_seed_matches_snapshot(match_df: pd.DataFrame, tmp_path: Path, settings):
+    """
+    Tests the seed_matches command with a snapshot and expects that the
+    seeded matches are written, or that an error is raised without pyarrow
+    """
+
+    pytest.importorskip("pyarrow")
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    with patch("matches.utils.snapshot.pa", None):
+        with pytest.raises(CommandError, match="requires pyarrow"):
+            call_command("seed_matches", source=str(source), snapshot=True)
+
+    call_command("seed_matches", source=str(source), snapshot=True, stdout=StringIO())
+
+    assert len(MatchSnapshot().load()) == len(match_df)
+    assert (settings.MATCH_SNAPSHOT_DIR / "CURRENT").exists()
+
+
+@pytest.mark.django_db
+def test_match_array_cache(resolved_match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the write and open methods of the match array cache and expects
+    that the names are decoded from their codes, that the arrays are
+    read-only memory maps and that a new generation is picked up without
+    reopening an unchanged one
+    """
+
+    bulk_create_matches(resolved_match_df)
+    array_cache = MatchArrayCache(tmp_path / "arrays")
+
+    with pytest.raises(LookupError):
+        array_cache.open()
+
+    version = array_cache.write()
+    arrays = array_cache.open()
+    team1 = [arrays.teams[code] for code in arrays["team1"]]
+    inter = team1.index("Internazionale")
+
+    assert array_cache.open() is arrays
+    assert arrays.version == version
+    assert len(arrays) == len(resolved_match_df)
+    assert sorted(team1) == ["Internazionale", "Real Betis", "Strasbourg"]
+    assert arrays["league"][inter] == arrays.league_code("Italy Serie A")
+    assert arrays["team1"][inter] == arrays.team_code("Internazionale")
+    assert arrays["score2"][inter] == 2
+    assert arrays.played.all()
+    assert not arrays["score1"].flags.writeable
+    assert arrays.match(arrays["id"][inter])["team2"] == "AC Milan"
+    assert arrays.match(0) is None
+
+    Match.objects.filter(team1__name="Strasbourg").update(score1=None, score2=None)
+    second_version = array_cache.write()
+    second_arrays = array_cache.open()
+
+    assert second_arrays.version == second_version != version
+    assert second_arrays.played.sum() == len(resolved_match_df) - 1
+    assert arrays.played.all()
+
+    with patch("matches.utils.arrays.MATCH_COLUMNS", ["id"]):
+        with pytest.raises(ValueError, match="encoded columns"):
+            MatchArrayCache(tmp_path / "other").write()
+
+
+@pytest.mark.django_db
+def test_seed_matches_arrays(match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the seed_matches command with the array cache and expects
+    that the seeded matches are written to the current generation
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), arrays=True, stdout=StringIO())
+
+    arrays = match_arrays()
+
+    assert len(arrays) == len(match_df)
+    assert sorted(arrays.leagues) == sorted(match_df["league"].unique())
+    assert match_arrays() is arrays
+
+
+@pytest.mark.django_db
+def test_match_scorelines_arrays(
+    signed_in_client: Client, match_df: pd.DataFrame, tmp_path: Path
+):
+    """
+    Tests the match scoreline endpoint with the array cache and expects
+    that the match is read from the current generation, which the next
+    seed replaces even without the arrays option
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), arrays=True, stdout=StringIO())
+
+    match = Match.objects.get(team1__name="Internazionale")
+    url = reverse("match-scorelines", args=[match.id])
+    # Not written to the array cache, so the match is still read from it
+    Match.objects.filter(id=match.id).update(proj_score1=0.5)
+
+    assert signed_in_client.get(url).json()["match"]["proj_score1"] == 1.84
+
+    version = match_arrays().version
+    match_df.loc[match_df["team1"] == "Internazionale", "proj_score1"] = 2.5
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), stdout=StringIO())
+
+    match = Match.objects.get(team1__name="Internazionale")
+    response = signed_in_client.get(reverse("match-scorelines", args=[match.id]))
+
+    assert match_arrays().version != version
+    assert response.json()["match"] == {
+        "id": match.id,
+        "date": "2017-10-15",
+        "team1": "Internazionale",
+        "team2": "AC Milan",
+        "proj_score1": 2.5,
+        "proj_score2": 1.14,
+    }
+
+
+@pytest.mark.django_db
+def test_match_queryset_to_arrays(resolved_match_df: pd.DataFrame):
+    """
+    Tests the to_arrays and to_frame methods of the match QuerySet and
+    expects typed arrays in the order of the QuerySet, with the foreign
+    keys as ids and the missing scores as NaN
+    """
+
+    bulk_create_matches(resolved_match_df)
+    Match.objects.filter(team1__name="Strasbourg").update(score1=None)
+    matches = Match.objects.order_by("date", "id")
+
+    arrays = matches.to_arrays(["date", "league", "spi1", "score1"], chunk_size=2)
+    match_frame = matches.filter(season=2017).to_frame(chunk_size=2)
+
+    assert arrays["date"].dtype == "datetime64[D]"
+    assert arrays["league"].dtype == "int16"
+    assert arrays["score1"].dtype == "float64"
+    assert arrays["date"].tolist() == list(matches.values_list("date", flat=True))
+    assert arrays["league"].tolist() == list(
+        matches.values_list("league_id", flat=True)
+    )
+    assert np.isnan(arrays["score1"]).sum() == 1
+    assert len(match_frame) == len(resolved_match_df)
+    assert match_frame.columns.tolist() == ["id", *MatchFields.field_list()]
+    assert match_frame["team1"].dtype == "int32"
+    assert len(matches.none().to_arrays()["id"]) == 0
+
+
+def test_compute_calibrations():
+    """
+    Tests the compute_calibrations function and expects the Brier score,
+    log-loss, ranked probability score and reliability bins of all the
+    matches and of every league, season and team
+    """
+
+    arrays = {
+        "season": np.array([2017, 2018]),
+        "league": np.array([1, 1]),
+        "team1": np.array([1, 2]),
+        "team2": np.array([2, 3]),
+        "prob1": np.array([0.5, 0.2]),
+        "probtie": np.array([0.3, 0.3]),
+        "prob2": np.array([0.2, 0.5]),
+        "score1": np.array([2.0, 1.0]),
+        "score2": np.array([1.0, 1.0]),
+    }
+
+    calibrations = {
+        (calibration.scope, calibration.season, calibration.team_id): calibration
+        for calibration in compute_calibrations(arrays)
+    }
+    overall = calibrations[("all", None, None)]
+    bins = {row["lower"]: row for row in overall.reliability if row["forecasts"]}
+
+    assert len(calibrations) == 1 + 1 + 2 + 3
+    assert overall.matches == 2
+    assert overall.brier == pytest.approx((0.38 + 0.78) / 2)
+    assert overall.log_loss == pytest.approx(-(np.log(0.5) + np.log(0.3)) / 2)
+    assert overall.rps == pytest.approx(0.145)
+    assert calibrations[("league", None, None)].league_id == 1
+    assert calibrations[("season", 2018, None)].brier == pytest.approx(0.78)
+    assert calibrations[("team", None, 2)].matches == 2
+    assert calibrations[("team", None, 3)].rps == pytest.approx(0.145)
+    assert list(bins) == [0.2, 0.3, 0.5]
+    assert bins[0.3] == pytest.approx(
+        {"lower": 0.3, "upper": 0.4, "forecasts": 2, "forecast": 0.3, "observed": 0.5}
+    )
+    assert bins[0.2]["observed"] == 0
+
+
+@pytest.mark.django_db
+def test_calibrations(signed_in_client: Client, match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the calibration endpoint and expects that the calibrations
+    are refreshed by the seed_matches command and filtered by scope
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), stdout=StringIO())
+
+    response = signed_in_client.get(reverse("calibrations"), {"scope": "league"})
+    calibrations = response.json()["calibrations"]
+    played = Match.objects.filter(score1__isnull=False, score2__isnull=False)
+
+    assert response.status_code == 200
+    assert len(calibrations) == played.values("league").distinct().count()
+    assert sum(calibration["matches"] for calibration in calibrations) == len(played)
+    assert Calibration.objects.get(scope="all").matches == len(played)
+    assert (
+        signed_in_client.get(reverse("calibrations"), {"scope": "x"}).status_code == 400
+    )
+
+
+def test_simulate_season():
+    """
+    Tests the simulate_season function and expects that the projections
+    follow the current points and the forecasts of the remaining fixtures
+    and are reproducible from the seed
+    """
+
+    arrays = {
+        "team1": np.array([1, 2, 3, 1, 2, 3]),
+        "team2": np.array([2, 3, 1, 3, 1, 2]),
+        "prob1": np.array([0.5, 0.5, 0.5, 1.0, 0.2, 0.4]),
+        "probtie": np.array([0.3, 0.3, 0.3, 0.0, 0.3, 0.2]),
+        "prob2": np.array([0.2, 0.2, 0.2, 0.0, 0.5, 0.4]),
+        "score1": np.array([2.0, 1.0, 0.0, np.nan, np.nan, np.nan]),
+        "score2": np.array([0.0, 1.0, 1.0, np.nan, np.nan, np.nan]),
+    }
+
+    projection = simulate_season(arrays, simulations=5000, seed=1, relegation_spots=1)
+
+    assert projection["team_id"].tolist() == [1, 2, 3]
+    assert projection["points"].tolist() == [6, 1, 1]
+    assert projection["expected_points"][0] == pytest.approx(
+        6 + 3 + 0.3 + 3 * 0.5, abs=0.1
+    )
+    assert projection["title"][0] == 1
+    assert projection["title"].sum() == pytest.approx(1)
+    assert projection["relegation"].sum() == pytest.approx(1)
+    assert projection["expected_position"].sum() == pytest.approx(6)
+    assert np.array_equal(
+        simulate_season(arrays, simulations=5000, seed=1)["relegation"],
+        simulate_season(arrays, simulations=5000, seed=1)["relegation"],
+    )
+
+
+@pytest.mark.django_db
+def test_league_projections(signed_in_client: Client, resolved_match_df: pd.DataFrame):
+    """
+    Tests the league projection endpoint and expects that it only reads
+    the stored projections of the league season, without simulating it
+    """
+
+    bulk_create_matches(resolved_match_df)
+    Match.objects.filter(team1__name="Strasbourg").update(score1=None, score2=None)
+    league = League.objects.get(name="French Ligue 1")
+    url = reverse("league-projections", args=[league.id])
+
+    assert signed_in_client.get(url).status_code == 404
+    assert not SeasonProjection.objects.exists()
+
+    project_seasons()
+    project_seasons()
+    response = signed_in_client.get(url)
+    projections = {row["team"]: row for row in response.json()["projections"]}
+
+    assert response.status_code == 200
+    assert response.json()["season"] == 2017
+    assert SeasonProjection.objects.count() == 2
+    assert projections["Strasbourg"]["points"] == 0
+    assert projections["Strasbourg"]["title"] == pytest.approx(
+        0.213 + 0.2377 / 2, abs=0.03
+    )
+    assert signed_in_client.get(url).json() == response.json()
+    assert signed_in_client.get(url, {"season": "x"}).status_code == 400
+    assert signed_in_client.get(url, {"season": 2016}).status_code == 400
+    assert (
+        signed_in_client.get(reverse("league-projections", args=[0])).status_code == 404
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_simulate_seasons(resolved_match_df: pd.DataFrame):
+    """
+    Tests the simulate_seasons command and expects that the projections
+    of every league season with remaining fixtures do not depend on the
+    number of workers
+    """
+
+    bulk_create_matches(resolved_match_df)
+    Match.objects.exclude(team1__name="Internazionale").update(score1=None, score2=None)
+
+    call_command("simulate_seasons", simulations=1000, stdout=StringIO())
+    serial = list(SeasonProjection.objects.order_by("team_id").values("title"))
+    call_command("simulate_seasons", simulations=1000, workers=2, stdout=StringIO())
+
+    assert SeasonProjection.objects.count() == 4
+    assert list(SeasonProjection.objects.order_by("team_id").values("title")) == serial
+
+    with pytest.raises(CommandError, match="positive"):
+        call_command("simulate_seasons", simulations=0)
+
+
+def test_scoreline_markets():
+    """
+    Tests the scoreline functions and expects that the matrices are the
+    products of the Poisson probabilities of the projected scores, with the
+    tail in the last goals, and that the markets are derived from them
+    """
+
+    matrices = scoreline_matrices(np.array([1.5, 0.0]), np.array([1.0, 2.0]))
+    markets = scoreline_markets(matrices)
+    total = poisson_probabilities(np.array([2.5]))[0]
+
+    assert matrices.shape == (2, 11, 11)
+    assert matrices.sum(axis=(1, 2)) == pytest.approx([1, 1])
+    assert matrices[0, 0, 0] == pytest.approx(np.exp(-2.5))
+    assert matrices[0, 2, 1] == pytest.approx(np.exp(-1.5) * 1.5**2 / 2 * np.exp(-1))
+    assert matrices[1, 0].sum() == pytest.approx(1)
+    assert markets["over_2.5"][0] == pytest.approx(1 - total[:3].sum())
+    assert markets["both_teams_score"][0] == pytest.approx(
+        (1 - np.exp(-1.5)) * (1 - np.exp(-1))
+    )
+    assert markets["home_clean_sheet"][0] == pytest.approx(np.exp(-1))
+    assert markets["home_win"] + markets["draw"] + markets["away_win"] == (
+        pytest.approx([1, 1])
+    )
+    assert markets["home_win"][1] == 0
+
+
+def test_scoreline_cache():
+    """
+    Tests the scoreline cache and expects that only the matrices of new
+    projected scores are computed and that the least recently used
+    matrices are evicted
+    """
+
+    scoreline_cache = ScorelineCache(maxsize=2)
+
+    first = scoreline_cache.matrices(
+        np.array([1.5, 1.5, 0.5]), np.array([1.0, 1.0, 2.0])
+    )
+    second = scoreline_cache.matrices(np.array([1.5, 2.0]), np.array([1.0, 1.0]))
+
+    assert np.array_equal(first[0], first[1])
+    assert np.array_equal(first[0], second[0])
+    assert scoreline_cache.misses == 3
+    assert scoreline_cache.hits == 1
+    assert len(scoreline_cache) == 2
+
+    scoreline_cache.matrices(np.array([0.5]), np.array([2.0]))
+
+    assert scoreline_cache.misses == 4
+
+
+def test_scoreline_cache_threads():
+    """
+    Tests the scoreline cache from concurrent threads and expects that
+    every matrix is counted once and that the cache stays bounded
+    """
+
+    scoreline_cache = ScorelineCache(maxsize=8)
+    rates = np.arange(0, 4, 0.25)
+
+    def read_matrices(offset: int) -> None:
+        for shift in range(50):
+            scoreline_cache.matrices(
+                np.roll(rates, offset + shift), np.roll(rates, offset - shift)
+            )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(read_matrices, range(8)))
+
+    assert scoreline_cache.hits + scoreline_cache.misses == 8 * 50 * len(rates)
+    assert len(scoreline_cache) == 8
+
+
+@pytest.mark.django_db
+def test_match_scorelines(signed_in_client: Client, resolved_match_df: pd.DataFrame):
+    """
+    Tests the match scoreline endpoint and expects the scoreline
+    matrix and the markets of the match
+    """
+
+    bulk_create_matches(resolved_match_df)
+    match = Match.objects.get(team1__name="Internazionale")
+
+    response = signed_in_client.get(reverse("match-scorelines", args=[match.id]))
+    scorelines = response.json()
+
+    assert response.status_code == 200
+    assert scorelines["match"]["team2"] == "AC Milan"
+    assert len(scorelines["matrix"]) == scorelines["max_goals"] + 1
+    assert scorelines["matrix"][0][0] == pytest.approx(np.exp(-1.84 - 1.14))
+    assert scorelines["markets"]["under_0.5"] == pytest.approx(np.exp(-1.84 - 1.14))
+    assert (
+        signed_in_client.get(reverse("match-scorelines", args=[0])).status_code == 404
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_standings(resolved_match_df: pd.DataFrame):
+    """
+    Tests the rebuild_standings and update_standings functions and expects
+    the points, results and goals of every team, the teams of unplayed
+    matches included, and that an update only replaces its league seasons
+    """
+
+    bulk_create_matches(resolved_match_df)
+    Match.objects.filter(team1__name="Strasbourg").update(score1=None, score2=None)
+
+    assert rebuild_standings() == 6
+    assert rebuild_standings([2016]) == 0
+
+    winner = Standing.objects.get(team__name="Internazionale")
+    loser = Standing.objects.get(team__name="AC Milan")
+    unplayed = Standing.objects.get(team__name="Strasbourg")
+
+    assert (winner.played, winner.wins, winner.points) == (1, 1, 3)
+    assert (winner.goals_for, winner.goals_against, winner.goal_difference) == (
+        3,
+        2,
+        1,
+    )
+    assert (loser.losses, loser.points, loser.goal_difference) == (1, 0, -1)
+    assert (unplayed.played, unplayed.points) == (0, 0)
+
+    Match.objects.filter(team1__name="Strasbourg").update(score1=1, score2=1)
+    Match.objects.filter(team1__name="Internazionale").update(score1=0)
+
+    assert update_standings([(unplayed.league_id, 2017)]) == 2
+    assert Standing.objects.get(team__name="Strasbourg").draws == 1
+    assert Standing.objects.get(team__name="Internazionale").points == 3
+
+    league_seasons = Match.objects.values_list("league_id", "season").distinct()
+
+    with patch("matches.utils.standings.LEAGUE_SEASON_CHUNK_SIZE", 1):
+        assert update_standings([*league_seasons, (0, 2017)]) == 6
+
+    assert Standing.objects.get(team__name="Internazionale").points == 0
+
+
+@pytest.mark.django_db
+def test_league_standings(
+    signed_in_client: Client, match_df: pd.DataFrame, tmp_path: Path
+):
+    """
+    Tests the league standing endpoint and expects the table of the league
+    season, refreshed by full and incremental runs of the seed_matches command
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), stdout=StringIO())
+
+    league = League.objects.get(name="Italy Serie A")
+    url = reverse("league-standings", args=[league.id])
+    response = signed_in_client.get(url)
+
+    assert response.status_code == 200
+    assert response.json()["season"] == 2017
+    assert [row["team"] for row in response.json()["standings"]] == [
+        "Internazionale",
+        "AC Milan",
+    ]
+
+    match_df.loc[match_df["team1"] == "Internazionale", "score2"] = 4.0
+    match_df.to_csv(source, index=False)
+
+    call_command(
+        "seed_matches", source=str(source), incremental=True, stdout=StringIO()
+    )
+
+    standings = signed_in_client.get(url).json()["standings"]
+
+    assert [row["team"] for row in standings] == ["AC Milan", "Internazionale"]
+    assert standings[0]["position"] == 1
+    assert standings[0]["points"] == 3
+    assert signed_in_client.get(url, {"season": "x"}).status_code == 400
+    assert signed_in_client.get(url, {"season": 2016}).json()["standings"] == []
+    assert (
+        signed_in_client.get(reverse("league-standings", args=[0])).status_code == 404
+    )
+
+
+def test_compute_team_trends():
+    """
+    Tests the compute_team_trends function and expects the home and away
+    rows of every team by date, with the form of its last played matches
+    carried over its unplayed ones
+    """
+
+    arrays = {
+        "date": np.array(
+            ["2020-01-01", "2020-01-08", "2020-01-15", "2020-01-22"],
+            dtype="datetime64[D]",
+        ),
+        "team1": np.array([1, 2, 1, 3]),
+        "team2": np.array([2, 1, 3, 1]),
+        "spi1": np.array([80.0, 70.0, 81.0, 60.0]),
+        "spi2": np.array([70.0, 79.0, 60.0, 82.0]),
+        "prob1": np.array([0.6, 0.3, 0.7, 0.2]),
+        "probtie": np.array([0.2, 0.3, 0.2, 0.2]),
+        "prob2": np.array([0.2, 0.4, 0.1, 0.6]),
+        "score1": np.array([2.0, 1.0, 0.0, np.nan]),
+        "score2": np.array([0.0, 1.0, 1.0, np.nan]),
+    }
+
+    trends = compute_team_trends(arrays, window=2)
+    series = trends[1]
+
+    assert sorted(trends) == [1, 2, 3]
+    assert series["home"].tolist() == [True, False, True, False]
+    assert series["spi"].tolist() == [80.0, 79.0, 81.0, 82.0]
+    assert series["opponent_id"].tolist() == [2, 2, 3, 3]
+    assert series["form_points"].tolist() == [3, 4, 1, 1]
+    assert series["form_goals_for"].tolist() == [2, 3, 1, 1]
+    assert series["form_gap"][0] == pytest.approx(3 - 3 * 0.6 - 0.2)
+    assert np.isnan(series["points"][3])
+    assert trends[3]["form_points"].tolist() == [3, 3]
+
+
+@pytest.mark.django_db
+def test_league_season_teams(resolved_match_df: pd.DataFrame):
+    """
+    Tests the league_season_teams function and expects the teams of the
+    matches of the league seasons only, not the ones of their other
+    pairs of leagues and seasons
+    """
+
+    bulk_create_matches(resolved_match_df)
+    Match.objects.filter(team1__name="Strasbourg").update(season=2016)
+    serie_a = League.objects.get(name="Italy Serie A")
+    ligue_1 = League.objects.get(name="French Ligue 1")
+
+    assert league_season_teams([(serie_a.id, 2017), (ligue_1.id, 2017)]) == set(
+        Team.objects.filter(name__in=["Internazionale", "AC Milan"]).values_list(
+            "id", flat=True
+        )
+    )
+    assert league_season_teams([(serie_a.id, 2016), (ligue_1.id, 2017)]) == set()
+    assert league_season_teams([]) == set()
+
+
+@pytest.mark.django_db
+def test_team_trend(signed_in_client: Client, match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the team trend endpoint and expects the series of the team,
+    refreshed by full and incremental runs of the seed_matches command
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), stdout=StringIO())
+
+    team = Team.objects.get(name="Internazionale")
+    url = reverse("team-trend", args=[team.id])
+    response = signed_in_client.get(url)
+    series = response.json()["series"]
+
+    assert response.status_code == 200
+    assert TeamTrend.objects.count() == 6
+    assert response.json()["window"] == 5
+    assert series["date"] == ["2017-10-15"]
+    assert series["opponent"] == ["AC Milan"]
+    assert series["spi"] == [78.3]
+    assert series["form_points"] == [3]
+
+    match_df.loc[match_df["team1"] == "Internazionale", "score2"] = 4.0
+    match_df.to_csv(source, index=False)
+
+    call_command(
+        "seed_matches", source=str(source), incremental=True, stdout=StringIO()
+    )
+
+    assert signed_in_client.get(url).json()["series"]["form_points"] == [0]
+    assert signed_in_client.get(url, {"last": "1"}).json()["series"]["date"] == [
+        "2017-10-15"
+    ]
+    assert signed_in_client.get(url, {"last": "0"}).status_code == 400
+    assert signed_in_client.get(reverse("team-trend", args=[0])).status_code == 404
+
+
+def test_compute_head_to_heads():
+    """
+    Tests the compute_head_to_heads function and expects the records of the
+    pairs from the point of view of the team with the lower id, whichever
+    team is at home, with the latest meetings first
+    """
+
+    arrays = {
+        "date": np.array(
+            ["2020-01-01", "2020-02-01", "2020-03-01", "2020-04-01"],
+            dtype="datetime64[D]",
+        ),
+        "team1": np.array([1, 2, 1, 3]),
+        "team2": np.array([2, 1, 3, 1]),
+        "prob1": np.array([0.5, 0.4, 0.6, 0.3]),
+        "probtie": np.array([0.3, 0.3, 0.2, 0.3]),
+        "prob2": np.array([0.2, 0.3, 0.2, 0.4]),
+        "score1": np.array([2.0, 1.0, 0.0, 2.0]),
+        "score2": np.array([0.0, 1.0, 0.0, 1.0]),
+    }
+
+    head_to_heads = compute_head_to_heads(arrays, last_meetings=1)
+    first, second = head_to_heads
+
+    assert [(record.team1_id, record.team2_id) for record in head_to_heads] == [
+        (1, 2),
+        (1, 3),
+    ]
+    assert (first.matches, first.wins1, first.draws, first.wins2) == (2, 1, 1, 0)
+    assert (first.goals1, first.goals2) == (3, 1)
+    assert first.prob1 == pytest.approx((0.5 + 0.3) / 2)
+    assert first.prob2 == pytest.approx((0.2 + 0.4) / 2)
+    assert (second.wins1, second.draws, second.wins2) == (0, 1, 1)
+    assert second.last_meetings == [
+        {"date": "2020-04-01", "team1_id": 3, "team2_id": 1, "score1": 2, "score2": 1}
+    ]
+    assert (
+        compute_head_to_heads({field: values[:0] for field, values in arrays.items()})
+        == []
+    )
+
+
+@pytest.mark.django_db
+def test_head_to_head(signed_in_client: Client, match_df: pd.DataFrame, tmp_path: Path):
+    """
+    Tests the head-to-head endpoint and expects the record of the team
+    against the opponent, refreshed by full and incremental runs of the
+    seed_matches command
+    """
+
+    source = tmp_path / "spi_matches.csv"
+    match_df.to_csv(source, index=False)
+
+    call_command("seed_matches", source=str(source), stdout=StringIO())
+
+    team = Team.objects.get(name="AC Milan")
+    opponent = Team.objects.get(name="Internazionale")
+    url = reverse("head-to-head", args=[team.id, opponent.id])
+    record = signed_in_client.get(url).json()["head_to_head"]
+
+    assert HeadToHead.objects.count() == 3
+    assert (record["matches"], record["wins"], record["losses"]) == (1, 0, 1)
+    assert (record["goals_for"], record["goals_against"]) == (2, 3)
+    assert record["prob_win"] == pytest.approx(0.2279)
+    assert record["last_meetings"][0]["date"] == "2017-10-15"
+
+    match_df.loc[match_df["team1"] == "Internazionale", "score2"] = 4.0
+    match_df.to_csv(source, index=False)
+
+    call_command(
+        "seed_matches", source=str(source), incremental=True, stdout=StringIO()
+    )
+
+    assert signed_in_client.get(url).json()["head_to_head"]["wins"] == 1
+    assert (
+        signed_in_client.get(
+            reverse("head-to-head", args=[opponent.id, team.id])
+        ).json()["head_to_head"]["losses"]
+        == 1
+    )
+    assert (
+        signed_in_client.get(
+            reverse(
+                "head-to-head", args=[team.id, Team.objects.get(name="Valencia").id]
+            )
+        ).json()["head_to_head"]
+        is None
+    )
+    assert (
+        signed_in_client.get(
+            reverse("head-to-head", args=[team.id, team.id])
+        ).status_code
+        == 400
+    )
+    assert (
+        signed_in_client.get(reverse("head-to-head", args=[team.id, 0])).status_code
+        == 404
+    )